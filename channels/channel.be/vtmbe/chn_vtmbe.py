@@ -694,10 +694,8 @@ class Channel(chn_class.Channel):
         json = JsonHelper(data)
         json_items = json.get_value("response", "items")
         count = json.get_value("response", "total")
-        for i in range(100, count, 100):
-            url = "%s&from=%s" % (self.mainListUri, i)
-            Logger.debug("Retrieving more items from: %s", url)
-            more_data = UriHandler.open(url, proxy=self.proxy)
+        urls = ("%s&from=%s" % (self.mainListUri, i) for i in range(100, count, 100))
+        for more_data in self._fetch_pages(urls):
             more_json = JsonHelper(more_data)
             more_items = more_json.get_value("response", "items")
             if more_items:
@@ -105,7 +105,7 @@ class Channel(chn_class.Channel):
         url = "http://il.srgssr.ch/integrationlayer/1.0/ue/srf/assetSet/listByAssetGroup/%s.json" % (result_set["id"],)
         item = MediaItem(result_set["title"], url)
         item.description = result_set.get("description", "")
-        item.httpHeaders = self.httpHeaders
+        item.HttpHeaders = self.httpHeaders
 
         # the 0005 seems to be a quality thing: 0001, 0003, 0004, 0005
         # http://www.srf.ch/webservice/picture/videogroup/c60026b7-2ed0-0001-b4b1-1f801a6355d0/0005
@@ -139,7 +139,7 @@ class Channel(chn_class.Channel):
         url = "http://il.srgssr.ch/integrationlayer/1.0/ue/srf/assetSet/listByAssetGroup/%s.json?pageSize=100" % (result_set["id"],)
         item = MediaItem(result_set["title"], url)
         item.description = result_set.get("description", "")
-        item.httpHeaders = self.httpHeaders
+        item.HttpHeaders = self.httpHeaders
         item.thumb = self.__get_nested_value(result_set, "Image", "ImageRepresentations", "ImageRepresentation", 0, "url")
         item.complete = True
         return item
@@ -193,7 +193,7 @@ class Channel(chn_class.Channel):
         # 2015-01-20 22:17:59"
         date_time = DateHelper.get_date_from_string(date_value, "%Y-%m-%d %H:%M:%S")
         item.set_date(*date_time[0:6])
-        item.httpHeaders = self.httpHeaders
+        item.HttpHeaders = self.httpHeaders
         item.complete = False
         return item
 
@@ -245,7 +245,7 @@ class Channel(chn_class.Channel):
         # 2015-01-20T22:17:59"
         date_time = DateHelper.get_date_from_string(date_value, "%Y-%m-%dT%H:%M:%S")
         item.set_date(*date_time[0:6])
-        item.httpHeaders = self.httpHeaders
+        item.HttpHeaders = self.httpHeaders
         item.complete = False
         return item
 
@@ -209,11 +209,10 @@ class Channel(chn_class.Channel):
         Logger.info("Performing Pre-Processing")
         items = []
 
-        json_data = Regexer.do_regex(r'("staticpages":\s*{[^<]+),\s*"translations":', data)[0]
-        # We need to put it in a JSON envelop as we are taking JSON from the 'middle'
-        return_data = "{{{0}}}".format(json_data)
-        Logger.trace("Found Json:\n%s", return_data)
-        return JsonHelper(return_data), items
+        # The "staticpages" are followed by other keys of the same state object (like "page"), so
+        # take all of them from the 'middle' of that object.
+        json_data = JsonHelper.extract_embedded(data, '"staticpages":', members=True)
+        return JsonHelper.from_object(json_data), items
 
     def create_json_episode_item(self, result_set):
         """ Creates a new MediaItem for an episode.
@@ -276,27 +276,29 @@ class Channel(chn_class.Channel):
 
         # More pages?
         max_count = 5
-        current_count = 1
-        next_page = json_data.get_value("nextLink")
         query_string = self.parentItem.url.split("&", 1)[-1]
 
         http_headers = {"X-Requested-With": "XMLHttpRequest"}
         http_headers.update(self.parentItem.HttpHeaders)
         http_headers.update(self.httpHeaders)
-        while next_page and current_count < max_count:
-            current_count += 1
+
+        def get_next_page(page_json):
+            next_page = page_json.get_value("nextLink")
+            if not next_page:
+                return None
+
             Logger.debug("Found next page: %s", next_page)
             if next_page.startswith("/search/extended") or next_page.startswith("/media/series"):
                 next_page = next_page.split("&", 1)[0]
-                next_page = "%s%s&%s" % (self.baseUrlLive, next_page, query_string)
+                return "%s%s&%s" % (self.baseUrlLive, next_page, query_string)
             elif not next_page.startswith("http"):
-                next_page = "%s%s&%s" % (self.baseUrlLive, next_page, query_string)
-            else:
-                next_page = "%s&%s" % (next_page, query_string)
+                return "%s%s&%s" % (self.baseUrlLive, next_page, query_string)
+            return "%s&%s" % (next_page, query_string)
 
-            page_data = UriHandler.open(next_page, proxy=self.proxy, additional_headers=http_headers)
-            json_data = JsonHelper(page_data)
-            tiles = json_data.get_value("tiles")
+        pages, next_page = self._follow_pages(json_data, get_next_page, max_count,
+                                              additional_headers=http_headers, parser=JsonHelper)
+        for page_json in pages:
+            tiles = page_json.get_value("tiles")
             if not isinstance(tiles, (tuple, list)):
                 Logger.debug("Found single tile data blob")
                 new_data = "%s%s\n" % (new_data, tiles)
@@ -304,18 +306,9 @@ class Channel(chn_class.Channel):
                 Logger.debug("Found multiple tile data blobs")
                 for item_data in tiles:
                     new_data = "%s%s\n" % (new_data, item_data)
-            next_page = json_data.get_value("nextLink")
 
-        if next_page and current_count == max_count:
+        if next_page:
             # There are more pages
-            if next_page.startswith("/search/extended") or next_page.startswith("/media/series"):
-                next_page = next_page.split("&", 1)[0]
-                next_page = "%s%s&%s" % (self.baseUrlLive, next_page, query_string)
-            elif not next_page.startswith("http"):
-                next_page = "%s%s&%s" % (self.baseUrlLive, next_page, query_string)
-            else:
-                next_page = "%s&%s" % (next_page, query_string)
-
             title = LanguageHelper.get_localized_string(LanguageHelper.MorePages)
             title = "\a.: %s :." % (title,)
             more = MediaItem(title, next_page)
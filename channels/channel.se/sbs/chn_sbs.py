@@ -257,11 +257,8 @@ class Channel(chn_class.Channel):
         # extract the images
         self.__update_image_lookup(json)
 
-        for p in range(2, pages + 1, 1):
-            url = url_format.format(p)
-            Logger.debug("Loading: %s", url)
-
-            data = UriHandler.open(url, proxy=self.proxy)
+        # the other pages can be fetched at once
+        for data in self._fetch_pages(url_format.format(p) for p in range(2, pages + 1, 1)):
             json = JsonHelper(data)
             programs += json.get_value("data") or []
 
@@ -934,7 +934,7 @@ class Channel(chn_class.Channel):
 
         """
 
-        return self.__extract_json_data(data, "(?:__svtplay|__reduxStore)")
+        return self.__extract_json_data(data, ("__svtplay", "__reduxStore"))
 
     def extract_live_channel_data(self, data):
         """ Adds the channel items to the listing.
@@ -1079,10 +1079,11 @@ class Channel(chn_class.Channel):
         return "https://www.svtstatic.se/image/wide/{}/{}/{}?quality=70".format(
             width, thumb_data["id"], thumb_data["changed"])
 
-    def __extract_json_data(self, data, root):
+    def __extract_json_data(self, data, roots):
         """ Performs pre-process actions for data processing
 
-        :param str data: The retrieve data that was loaded for the current item and URL.
+        :param str data:            The retrieve data that was loaded for the current item and URL.
+        :param tuple[str] roots:    The names of the root objects that contain the JSON.
 
         :return: A tuple of the data and a list of MediaItems that were generated.
         :rtype: tuple[str|JsonHelper,list[MediaItem]]
@@ -1090,10 +1091,11 @@ class Channel(chn_class.Channel):
         """
 
         Logger.info("Extracting JSON data during pre-processing")
-        data = Regexer.do_regex(r'root\[[\'"]%s[\'"]\] = ([\w\W]+?);\W*root\[' % (root,), data)[-1]
+        # like before, the last root assignment in the page is used
+        markers = ["root[{0}{1}{0}] = ".format(quote, root) for root in roots for quote in "'\""]
+        json_data = JsonHelper.from_embedded(data, markers, logger=Logger.instance(), last=True)
         items = []
-        Logger.trace("JSON data found: %s", data)
-        return data, items
+        return json_data, items
 
     def __get_api_url(self, operation, hash_value, variables):
         """ Generates a GraphQL url
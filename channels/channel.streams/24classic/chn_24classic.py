@@ -178,5 +178,5 @@ class Channel(chn_class.Channel):
 
         if url:
             item.append_single_stream(url)
-            item.Complete = True
+            item.complete = True
         return item
@@ -454,9 +454,8 @@ class Channel(chn_class.Channel):
         """
 
         items = []
-        json_regex = r'window.__IPLAYER_REDUX_STATE__ = (.*?);\s*</script>'
-        json_data = Regexer.do_regex(json_regex, data)
-        return JsonHelper(json_data[0]), items
+        json_data = JsonHelper.from_embedded(data, "window.__IPLAYER_REDUX_STATE__ = ")
+        return json_data, items
 
     def create_show_items(self, result_set):
         """ Creates a new MediaItem for an episode.
@@ -37,6 +37,8 @@ class CleanAction(AddonAction):
         self.parameter_parser.pickler.purge_store(Config.addonId, age=0)
 
         Logger.info("Cleaning: Cache objects in cache folder")
+        if UriHandler.instance().cacheStore:
+            UriHandler.instance().cacheStore.clear()
         env_ctrl = EnvController(Logger.instance())
         env_ctrl.cache_clean_up(Config.cacheDir, 0)
 
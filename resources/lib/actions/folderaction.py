@@ -24,7 +24,8 @@ class FolderAction(AddonAction):
         :param ActionParser parameter_parser:      A ActionParser object to is used to parse and
                                                     create urls
         :param Channel channel:                    The channel info for the channel
-        :param list[MediaItem]|None favorites:     Possible list of existing favourites to show
+        :param list[MediaItem]|FavouriteList|None favorites: Possible list of existing
+                                                            favourites to show
 
         """
 
@@ -48,10 +49,21 @@ class FolderAction(AddonAction):
             # determine the parent guid
             parent_guid = self.parameter_parser.get_parent_guid(self.__channel, selected_item)
 
+            # were the items re-used from the PickleStore?
+            from_store = False
             if self.__favorites is None:
+                if selected_item is None:
+                    # the main list was opened, used to determine the most used channels
+                    AddonSettings.register_channel_usage(self.__channel)
+
                 watcher = StopWatch("Plugin process_folder_list", Logger.instance())
-                media_items = self.__channel.process_folder_list(selected_item)
-                watcher.lap("Class process_folder_list finished")
+                media_items = self.__get_stored_media_items(parent_guid, selected_item)
+                if media_items is None:
+                    media_items = self.__channel.process_folder_list(selected_item)
+                    watcher.lap("Class process_folder_list finished")
+                else:
+                    from_store = True
+                    watcher.lap("Stored items retrieved")
             else:
                 parent_guid = "{}.fav".format(parent_guid)
                 watcher = StopWatch("Plugin process_folder_list With Items", Logger.instance())
@@ -102,7 +114,8 @@ class FolderAction(AddonAction):
             ok = ok and xbmcplugin.addDirectoryItems(self.handle, kodi_items, len(kodi_items))
             watcher.lap("items send to Kodi")
 
-            if ok and parent_guid is not None:
+            # re-used items are not stored again, so they expire
+            if ok and parent_guid is not None and not from_store:
                 self.parameter_parser.pickler.store_media_items(parent_guid, selected_item, media_items)
 
             watcher.stop()
@@ -122,6 +135,38 @@ class FolderAction(AddonAction):
                 XbmcWrapper.Error, 4000)
             xbmcplugin.endOfDirectory(self.handle, False)
 
+    def __get_stored_media_items(self, parent_guid, selected_item):
+        """ Retrieves the items of the previous listing of the `selected_item` from the
+        PickleStore, so the folder does not need to be processed again. This only happens if
+        the listing cache is enabled, the channel allows it and the folder is not a live folder.
+
+        :param str parent_guid:             The guid of the parent in the PickleStore.
+        :param MediaItem selected_item:     The selected item (or None for the main list).
+
+        :return: The stored items or None if the folder should be processed.
+        :rtype: list[MediaItem]|None
+
+        """
+
+        max_age = AddonSettings.get_listing_cache_time()
+        if not max_age or parent_guid is None or not self.__channel.cacheParsedListings:
+            return None
+
+        if selected_item is None:
+            url = None
+        elif selected_item.isLive or selected_item.url in ("searchSite", "#searchSite"):
+            return None
+        else:
+            url = selected_item.url
+
+        media_items = self.parameter_parser.pickler.retrieve_media_items(parent_guid, url, max_age)
+        if not media_items:
+            return None
+
+        Logger.info("Re-using %s stored items for '%s'", len(media_items), selected_item or self.__channel)
+        self.__channel.parentItem = selected_item
+        return media_items
+
     def __show_empty_information(self, items, favs=False):
         """ Adds an empty item to a list or just shows a message.
         @type favs: boolean
@@ -49,7 +49,8 @@ def run_addon():
         ignore_ssl_errors = AddonSettings.ignore_ssl_errors()
         UriHandler.create_uri_handler(cache_dir=cache_dir,
                                       cookie_jar=os.path.join(Config.profileDir, "cookiejar.dat"),
-                                      ignore_ssl_errors=ignore_ssl_errors)
+                                      ignore_ssl_errors=ignore_ssl_errors,
+                                      cache_max_size=AddonSettings.get_http_cache_size())
 
         # start texture handler
         TextureHandler.set_texture_handler(Config, Logger.instance(), UriHandler.instance())
@@ -57,10 +58,18 @@ def run_addon():
         # run the plugin
         from resources.lib import plugin
         p = plugin.Plugin(sys.argv[0], sys.argv[2], sys.argv[1])
-        p.run()
+        try:
+            p.run()
+        finally:
+            # persist changed cookies and cache index once, at the end of the run
+            UriHandler.flush()
+            # make sure we leave no references behind. This also writes the changed local
+            # settings, so they are not lost if the run failed.
+            AddonSettings.clear_cached_addon_settings_object()
+
+        # log the connection pooling statistics
+        UriHandler.instance().log_connection_statistics()
 
-        # make sure we leave no references behind
-        AddonSettings.clear_cached_addon_settings_object()
         # close the log to prevent locking on next call
         Logger.instance().close_log()
         log_file = None
@@ -2,7 +2,9 @@
 
 import os
 import io
+import json
 import uuid
+import hashlib
 import shutil
 import threading
 
@@ -12,6 +14,7 @@ from resources.lib.logger import Logger                               # this has
 from resources.lib.proxyinfo import ProxyInfo                         # this has not further references
 from resources.lib.retroconfig import Config                          # this has not further references
 from resources.lib.helpers.htmlentityhelper import HtmlEntityHelper   # Only has Logger as reference
+from resources.lib.helpers.filehelper import FileHelper
 from resources.lib.settings import localsettings, kodisettings, settingsstore
 
 # Theoretically we could add a remote settings store too!
@@ -67,7 +70,7 @@ class AddonSettings(object):
                 return store
 
             if store_location == KODI:
-                store = kodisettings.KodiSettings(Logger.instance())
+                store = kodisettings.KodiSettings(Logger.instance(), profile_dir=Config.profileDir)
             elif store_location == LOCAL:
                 store = localsettings.LocalSettings(Config.profileDir, Logger.instance())
             else:
@@ -89,6 +92,7 @@ class AddonSettings(object):
         if store is None:
             return
 
+        store.flush()
         # this really only works if no reference to the <store> object is kept somewhere.
         del store
 
@@ -100,11 +104,12 @@ class AddonSettings(object):
     @staticmethod
     def clear_cached_addon_settings_object():
         """ Clears the cached add-on settings. This will force a reload for the next INSTANCE
-        of an AddonSettings class. """
+        of an AddonSettings class. Changed settings are persisted first. """
 
         for store_type in (KODI, LOCAL):
             store = AddonSettings.__setting_stores.pop(store_type, None)
             if store:
+                store.flush()
                 del store
 
     #endregion
@@ -712,6 +717,66 @@ class AddonSettings(object):
 
         return AddonSettings.store(KODI).get_boolean_setting("http_cache", default=True)
 
+    @staticmethod
+    def get_http_cache_size():
+        """ Returns the maximum size of the HTTP cache.
+
+        :return: The maximum size of the HTTP(s) cache in bytes.
+        :rtype: int
+
+        """
+
+        size_in_mb = AddonSettings.store(KODI).get_integer_setting("http_cache_size", default=50)
+        return size_in_mb * 1024 * 1024
+
+    @staticmethod
+    def cache_warming_enabled():
+        """ Returns True if the service should pre-fetch listings of the favourite and most used
+        channels into the caches. This is the kill-switch for cache warming.
+
+        :return: Indication if the cache should be warmed in the background.
+        :rtype: bool
+
+        """
+
+        return AddonSettings.store(KODI).get_boolean_setting("cache_warming", default=False)
+
+    @staticmethod
+    def get_cache_warming_interval():
+        """ Returns the minimum time between two cache warming runs.
+
+        :return: The interval in seconds.
+        :rtype: int
+
+        """
+
+        hours = AddonSettings.store(KODI).get_integer_setting("cache_warming_interval", default=6)
+        return hours * 60 * 60
+
+    @staticmethod
+    def get_cache_warming_channel_count():
+        """ Returns the number of (favourite and most used) channels to warm the cache for.
+
+        :return: The number of channels.
+        :rtype: int
+
+        """
+
+        return AddonSettings.store(KODI).get_integer_setting("cache_warming_channels", default=3)
+
+    @staticmethod
+    def get_listing_cache_time():
+        """ Returns how long the parsed listings in the PickleStore can be re-used instead of
+        processing the folder again. A value of 0 disables the re-use.
+
+        :return: The time in seconds.
+        :rtype: int
+
+        """
+
+        minutes = AddonSettings.store(KODI).get_integer_setting("listing_cache", default=0)
+        return minutes * 60
+
     @staticmethod
     def ignore_ssl_errors():
         """ Returns True if SSL errors should be ignored from Python
@@ -884,6 +949,31 @@ class AddonSettings(object):
 
         return AddonSettings.store(LOCAL).get_boolean_setting("visible", channel, default=True)
 
+    @staticmethod
+    def register_channel_usage(channel):
+        """ Increments the number of times the channel was opened. It is used to determine the
+        most used channels.
+
+        :param channel: The ChannelInfo or Channel object.
+
+        """
+
+        usage = AddonSettings.get_channel_usage(channel)
+        AddonSettings.store(LOCAL).set_setting("usage", usage + 1, channel)
+
+    @staticmethod
+    def get_channel_usage(channel):
+        """ Returns the number of times the channel was opened.
+
+        :param channel: The ChannelInfo or Channel object.
+
+        :rtype: int
+        :return: The number of times the channel was opened.
+
+        """
+
+        return AddonSettings.store(LOCAL).get_integer_setting("usage", channel, default=0)
+
     @staticmethod
     def show_channel_settings(channel):
         """ Show the add-on settings and pre-selects the channel settings tab with the correct channel
@@ -1103,6 +1193,12 @@ class AddonSettings(object):
     def update_add_on_settings_with_channels(channels, config):
         """ Updates the settings.xml to include all the channels
 
+        The generated sections (the country selection, the channel settings and the channel
+        selection) are cached in the profile folder together with a hash of their inputs and the
+        add-on version (the generators change with the add-on, the cache does not). Only the
+        sections for which the inputs changed are generated again. If the resulting content
+        is the same as the content of the current settings.xml, nothing is written at all.
+
         :param list[any] channels:  The channels to add to the settings.xml
         :param type[Config] config: The configuration object
 
@@ -1117,12 +1213,46 @@ class AddonSettings(object):
         with io.open(filename_template, "r", encoding="utf-8") as fp:
             contents = fp.read()
 
-        new_contents = AddonSettings.__update_add_on_settings_with_country_settings(contents, channels)
-        new_contents, settings_offset_for_visibility, channels_with_settings = \
-            AddonSettings.__update_add_on_settings_with_channel_settings(new_contents, channels)
+        sections_file = os.path.join(config.profileDir, "settings_sections.json")
+        sections = AddonSettings.__read_settings_sections(sections_file)
+        cached_sections = dict(sections)
+        version = str(config.version)
 
+        # the distinct list of languages from the channels
+        languages = list(set([c.language for c in channels]))
+        languages.sort(key=lambda l: l or "")
+        country_xml = AddonSettings.__get_settings_section(
+            sections, "countries", version, languages,
+            lambda: AddonSettings.__get_country_settings_xml(languages))
+
+        channel_settings_xml, channels_with_settings = AddonSettings.__get_settings_section(
+            sections, "channel_settings", version,
+            [(c.moduleName, c.guid, c.safe_name, sorted(c.settings or [], key=lambda s: s["order"]))
+             for c in channels],
+            lambda: AddonSettings.__get_channel_settings_xml(channels))
+
+        channel_selection_xml = AddonSettings.__get_settings_section(
+            sections, "channel_selection", version, channels_with_settings,
+            lambda: AddonSettings.__get_channel_selection_xml(channels_with_settings))
+
+        new_contents = AddonSettings.__update_add_on_settings_with_country_settings(contents, country_xml)
+        new_contents = AddonSettings.__update_add_on_settings_with_channel_settings(
+            new_contents, channel_settings_xml)
         new_contents = AddonSettings.__update_add_on_settings_with_channel_selection(
-            new_contents, channels_with_settings)
+            new_contents, channel_selection_xml)
+
+        # Finally we insert the new XML into the old one
+        filename = os.path.join(config.rootDir, "resources", "settings.xml")
+        filename_temp = os.path.join(config.rootDir, "resources", "settings.tmp.xml")
+
+        # Nothing changed if the template, the sections and the current settings.xml are the same.
+        contents_hash = AddonSettings.__get_hash(new_contents)
+        if sections.get("contents") == contents_hash and \
+                sections.get("settings") == AddonSettings.__get_file_hash(filename):
+            Logger.info("Settings.xml is already up-to-date.")
+            if sections != cached_sections:
+                AddonSettings.__write_settings_sections(sections_file, sections)
+            return
 
         # Now fill the templates, we only import here due to performance penalties of the
         # large number of imports.
@@ -1130,15 +1260,12 @@ class AddonSettings(object):
         th = TemplateHelper(Logger.instance(), template=new_contents)
         new_contents = th.transform()
 
-        # Finally we insert the new XML into the old one
-        filename = os.path.join(config.rootDir, "resources", "settings.xml")
-        filename_temp = os.path.join(config.rootDir, "resources", "settings.tmp.xml")
         try:
             # Backup the user profile settings.xml because sometimes it gets reset. Because in some
             # concurrency situations, Kodi might decide to think we have no settings and just
             # erase all user settings.
-            user_settings = os.path.join(Config.profileDir, "settings.xml")
-            user_settings_backup = os.path.join(Config.profileDir, "settings.old.xml")
+            user_settings = os.path.join(config.profileDir, "settings.xml")
+            user_settings_backup = os.path.join(config.profileDir, "settings.old.xml")
             Logger.debug("Backing-up user settings: %s", user_settings_backup)
             if os.path.isfile(user_settings):
                 if os.path.isfile(user_settings_backup):
@@ -1180,17 +1307,114 @@ class AddonSettings(object):
             shutil.move(filename_temp, filename)
             return
 
+        sections["contents"] = contents_hash
+        sections["settings"] = AddonSettings.__get_hash(new_contents)
+        AddonSettings.__write_settings_sections(sections_file, sections)
+
         Logger.info("Settings.xml updated successfully. Reloading settings.")
         AddonSettings.__refresh(KODI)
         return
 
     @staticmethod
-    def __update_add_on_settings_with_channel_selection(contents, channels):
+    def __get_settings_section(sections, name, version, inputs, generator):
+        """ Returns a generated settings.xml section from the cached `sections` if the hash of its
+        inputs and the add-on version did not change. Otherwise it is generated and added to the
+        `sections`.
+
+        :param dict[str,any] sections:  The cached sections.
+        :param str name:                The name of the section.
+        :param str version:             The version of the add-on that generates the section.
+        :param any inputs:              The (json serializable) inputs of the section.
+        :param generator:               A function that generates the section.
+
+        :return: The generated section.
+        :rtype: any
+
+        """
+
+        inputs_hash = AddonSettings.__get_hash(json.dumps([version, inputs], sort_keys=True))
+        section = sections.get(name)
+        if section and section.get("hash") == inputs_hash:
+            Logger.debug("Using cached '%s' settings section", name)
+            return section["value"]
+
+        Logger.debug("Generating '%s' settings section", name)
+        value = generator()
+        sections[name] = {"hash": inputs_hash, "value": value}
+        return value
+
+    @staticmethod
+    def __read_settings_sections(path):
+        """ Reads the cached settings.xml sections.
+
+        :param str path:    The path of the sections file.
+
+        :return: The sections or an empty dictionary if there were no (valid) sections.
+        :rtype: dict[str,any]
+
+        """
+
+        if not os.path.isfile(path):
+            return {}
+
+        try:
+            with io.open(path, mode="rb") as fp:
+                return json.loads(fp.read().decode("utf-8"))
+        except:
+            Logger.error("Error reading the cached settings sections: %s", path, exc_info=True)
+            return {}
+
+    @staticmethod
+    def __write_settings_sections(path, sections):
+        """ Writes the cached settings.xml sections.
+
+        :param str path:                The path of the sections file.
+        :param dict[str,any] sections:  The sections to store.
+
+        """
+
+        try:
+            FileHelper.write_atomic(path, json.dumps(sections, separators=(",", ":")).encode("utf-8"))
+        except:
+            Logger.error("Error writing the cached settings sections: %s", path, exc_info=True)
+
+    @staticmethod
+    def __get_file_hash(path):
+        """ Returns the hash of the content of a text file.
+
+        :param str path:    The path of the file.
+
+        :return: The hash or None if the file did not exist.
+        :rtype: str|None
+
+        """
+
+        if not os.path.isfile(path):
+            return None
+
+        with io.open(path, "r", encoding="utf-8") as fp:
+            return AddonSettings.__get_hash(fp.read())
+
+    @staticmethod
+    def __get_hash(value):
+        """ Returns the SHA1 hash of a text.
+
+        :param str|unicode value:   The text to hash.
+
+        :return: The hex digest of the hash.
+        :rtype: str
+
+        """
+
+        return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def __update_add_on_settings_with_channel_selection(contents, channel_selection_xml):
         """ Adds the settings part that allows the selection of the channel for which the channel settings should
         be displayed.
 
-        :param str  contents: The current settings
-        :param list[Any] channels: The available channels
+        :param str contents:                The current settings
+        :param str channel_selection_xml:   The generated channel selection
 
         :return: updated contents
         :rtype: str
@@ -1201,13 +1425,6 @@ class AddonSettings(object):
             Logger.error("No '<!-- start of active channels -->' found in settings.xml. Stopping updating.")
             return
 
-        # Create new XML
-        channel_selection_xml = '        <!-- start of active channels -->\n' \
-                                '        <setting id="config_channel" type="select" label="30040" values="'
-        channel_safe_names = "|".join([c.safe_name for c in channels])
-        channel_selection_xml = "%s%s" % (channel_selection_xml, channel_safe_names)
-        channel_selection_xml = '%s" />' % (channel_selection_xml.rstrip("|"),)
-
         # replace the correct parts
         begin = contents[:contents.find('<!-- start of active channels -->')].strip()
         end = contents[contents.find('<!-- end of active channels -->'):].strip()
@@ -1215,15 +1432,33 @@ class AddonSettings(object):
         return contents
 
     @staticmethod
-    def __update_add_on_settings_with_channel_settings(contents, channels):  # NOSONAR
-        """ Adds the channel specific settings
+    def __get_channel_selection_xml(channel_safe_names):
+        """ Creates the settings part that allows the selection of the channel for which the
+        channel settings should be displayed.
 
-        This method first aggregates the settings and then adds them.
+        :param list[str] channel_safe_names:    The safe names of the channels with settings.
 
-        :param str contents: The current settings
-        :param list[any] channels: The available channels
+        :return: The generated XML.
+        :rtype: str
+
+        """
+
+        # Create new XML
+        channel_selection_xml = '        <!-- start of active channels -->\n' \
+                                '        <setting id="config_channel" type="select" label="30040" values="'
+        channel_safe_names = "|".join(channel_safe_names)
+        channel_selection_xml = "%s%s" % (channel_selection_xml, channel_safe_names)
+        channel_selection_xml = '%s" />' % (channel_selection_xml.rstrip("|"),)
+        return channel_selection_xml
 
-        :return: updated contents and the offset in visibility
+    @staticmethod
+    def __update_add_on_settings_with_channel_settings(contents, channel_settings_xml):
+        """ Adds the channel specific settings
+
+        :param str contents:                The current settings
+        :param str channel_settings_xml:    The generated channel settings
+
+        :return: updated contents
         :rtype: str
 
         """
@@ -1232,6 +1467,26 @@ class AddonSettings(object):
             Logger.error("No '<!-- begin of channel settings -->' found in settings.xml. Stopping updating.")
             return
 
+        begin = contents[:contents.find('<!-- begin of channel settings -->')].strip()
+        end = contents[contents.find('<!-- end of channel settings -->'):]
+
+        Logger.trace("Generated channel settings:\n%s", channel_settings_xml)
+        contents = "%s\n%s\n        %s" % (begin, channel_settings_xml.rstrip(), end)
+        return contents
+
+    @staticmethod
+    def __get_channel_settings_xml(channels):  # NOSONAR
+        """ Creates the channel specific settings
+
+        This method first aggregates the settings and then creates the XML.
+
+        :param list[any] channels: The available channels
+
+        :return: The generated XML and the safe names of the channels with settings.
+        :rtype: tuple[str,list[str]]
+
+        """
+
         settings = dict()
         channels_with_settings = []
 
@@ -1286,7 +1541,7 @@ class AddonSettings(object):
             if len(settings[channel.moduleName]) == 0:
                 settings.pop(channel.moduleName)
             else:
-                channels_with_settings.append(channel)
+                channels_with_settings.append(channel.safe_name)
 
         xml_content = '\n        <!-- begin of channel settings -->\n'
         # Sort them to make the result more consistent
@@ -1298,21 +1553,16 @@ class AddonSettings(object):
                 setting_offset_for_visibility += 1
                 xml_content = "%s        %s\n" % (xml_content, setting.format(setting_offset_for_visibility))
 
-        begin = contents[:contents.find('<!-- begin of channel settings -->')].strip()
-        end = contents[contents.find('<!-- end of channel settings -->'):]
-
-        Logger.trace("Generated channel settings:\n%s", xml_content)
-        contents = "%s\n%s\n        %s" % (begin, xml_content.rstrip(), end)
-        return contents, setting_offset_for_visibility, channels_with_settings
+        return xml_content, channels_with_settings
 
     @staticmethod
-    def __update_add_on_settings_with_country_settings(contents, channels):
+    def __update_add_on_settings_with_country_settings(contents, country_xml):
         """ Adds the channel showing/hiding to the settings.xml
 
         :param str|unicode contents:    The current settings
-        :param list[any] channels:      The available channels
+        :param str|unicode country_xml: The generated country settings
 
-        :return: updated contents and the offset in visibility
+        :return: updated contents
         :rtype: str
 
         """
@@ -1321,13 +1571,24 @@ class AddonSettings(object):
             Logger.error("No '<!-- start of channel selection -->' found in settings.xml. Stopping updating.")
             return
 
+        begin = contents[:contents.find('<!-- start of channel selection -->')].strip()
+        end = contents[contents.find('<!-- end of channel selection -->'):].strip()
+        contents = "%s\n    \n%s        %s" % (begin, country_xml, end)
+        return contents
+
+    @staticmethod
+    def __get_country_settings_xml(languages):
+        """ Creates the settings for the channel showing/hiding per country.
+
+        :param list[str|None] languages:    The sorted distinct languages of the channels.
+
+        :return: The generated XML.
+        :rtype: str
+
+        """
+
         # First we create a new bit of settings file.
         channel_xml = '        <!-- start of channel selection -->\n'
-
-        # the distinct list of languages from the channels
-        languages = [c.language for c in channels]
-        languages = list(set(languages))
-        languages.sort(key=lambda l: l or "")
         Logger.debug("Found languages: %s", languages)
 
         # get the labels and setting identifiers for those languages
@@ -1340,11 +1601,7 @@ class AddonSettings(object):
         for language in language_lookup_sorted_keys:
             channel_xml = '%s        <setting id="%s" type="bool" label="%s" subsetting="false" default="true" />\n' \
                          % (channel_xml, language_lookup[language][0], language_lookup[language][1])
-
-        begin = contents[:contents.find('<!-- start of channel selection -->')].strip()
-        end = contents[contents.find('<!-- end of channel selection -->'):].strip()
-        contents = "%s\n    \n%s        %s" % (begin, channel_xml, end)
-        return contents
+        return channel_xml
 
     @staticmethod
     def __get_language_settings_id_and_label(language_code):
@@ -0,0 +1,244 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import os
+import time
+import traceback
+
+from resources.lib.logger import Logger
+
+
+class CacheWarmer(object):
+    def __init__(self, channels, pickler, max_folders=10, max_workers=2, should_stop=None):
+        """ Pre-fetches the main list and the first level folders of channels. The HTTP responses
+        end up in the HTTP cache and the listings in the PickleStore, so opening them later on
+        results in cache hits.
+
+        Channels are warmed concurrently (with at most `max_workers` at the same time), but the
+        folders of a single channel are fetched one after the other, as a channel object is not
+        thread-safe.
+
+        :param list[ChannelInfo] channels:  The channels to warm.
+        :param Pickler pickler:             The PickleStore to store the listings in.
+        :param int max_folders:             The maximum number of first level folders per channel.
+        :param int max_workers:             The maximum number of channels to warm concurrently.
+        :param should_stop:                 Returns True if warming should stop.
+        :type should_stop:                  () -> bool
+
+        """
+
+        self.__channels = channels
+        self.__pickler = pickler
+        self.__maxFolders = max_folders
+        self.__maxWorkers = max_workers
+        self.__shouldStop = should_stop or (lambda: False)
+
+    @staticmethod
+    def get_channels(max_channels, favourites=None):
+        """ Determines the channels to warm: the channels with the most favourites first, then
+        the most used channels. Channels without favourites that were never used are skipped.
+
+        :param int max_channels:            The maximum number of channels.
+        :param Favourites favourites:       The favourites to use.
+
+        :return: The channels to warm.
+        :rtype: list[ChannelInfo]
+
+        """
+
+        from resources.lib.addonsettings import AddonSettings
+        from resources.lib.helpers.channelimporter import ChannelIndex
+
+        favourite_counts = favourites.count_per_channel() if favourites is not None else {}
+        ranked = []
+        for channel_info in ChannelIndex.get_register().get_channels():
+            if channel_info.uses_external_addon:
+                continue
+
+            rank = (favourite_counts.get(channel_info.guid, 0),
+                    AddonSettings.get_channel_usage(channel_info))
+            if rank > (0, 0):
+                ranked.append((rank, channel_info))
+
+        # sorted() is stable, so channels with equal ranks keep their order
+        ranked = sorted(ranked, key=lambda r: r[0], reverse=True)
+        return [channel_info for _, channel_info in ranked[:max_channels]]
+
+    def warm(self):
+        """ Warms the caches for the channels.
+
+        :return: The number of listings that were fetched.
+        :rtype: int
+
+        """
+
+        from resources.lib.helpers.threadhelper import ThreadHelper
+
+        listings = 0
+        work = ThreadHelper.imap_unordered(
+            self.__warm_channel, self.__channels, max_workers=self.__maxWorkers, name="CacheWarmer")
+        try:
+            for channel_info, count, error in work:
+                if error is None:
+                    listings += count
+                else:
+                    Logger.error("Error warming the cache for %s:\n%s", channel_info,
+                                 "".join(traceback.format_exception(*error)))
+
+                if self.__shouldStop():
+                    Logger.info("Stopped warming the cache")
+                    break
+        finally:
+            # waits for the channels that are being warmed
+            work.close()
+
+        Logger.info("Warmed the cache with %s listings of %s channels", listings, len(self.__channels))
+        return listings
+
+    def __warm_channel(self, channel_info):
+        """ Fetches the main list and the first level folders of a channel.
+
+        :param ChannelInfo channel_info:    The channel to warm.
+
+        :return: The number of listings that were fetched.
+        :rtype: int
+
+        """
+
+        if self.__shouldStop():
+            return 0
+
+        channel = channel_info.get_channel()
+        if channel is None:
+            return 0
+
+        Logger.debug("Warming the cache for %s", channel)
+        channel.init_channel()
+        items = channel.process_folder_list(None)
+        self.__pickler.store_media_items(channel.guid, None, items)
+        listings = 1
+
+        folders = [item for item in items if self.__should_warm(item)]
+        for folder in folders[:self.__maxFolders]:
+            if self.__shouldStop():
+                break
+
+            children = channel.process_folder_list(folder)
+            self.__pickler.store_media_items(folder.guid, folder, children)
+            listings += 1
+        return listings
+
+    @staticmethod
+    def __should_warm(item):
+        """ Checks if a folder should be warmed. Live folders are never cached (they are fetched
+        with `no_cache`), so there is no use in fetching them.
+
+        :param MediaItem item:  The item to check.
+
+        :rtype: bool
+
+        """
+
+        return item.type == "folder" and not item.isLive and \
+            item.url is not None and item.url.startswith(("http:", "https:"))
+
+
+class CacheWarmingService(object):
+    # seconds between the checks whether the cache should be warmed
+    CheckInterval = 60
+    # seconds without user input before Kodi is considered idle
+    IdleTime = 5 * 60
+    LogFileName = "retrospect.service.log"
+
+    def __init__(self, monitor, settings, is_idle=None):
+        """ The service loop that warms the cache, with the configured interval, while Kodi is
+        idle. It only imports and creates the add-on infrastructure when the cache is actually
+        warmed, so it is cheap to keep running when cache warming is disabled.
+
+        :param xbmc.Monitor monitor:    The Kodi monitor used to wait and check for an abort.
+        :param settings:                Returns the value of a Kodi setting (xbmcaddon.Addon().getSetting).
+        :type settings:                 (str) -> str
+        :param is_idle:                 Returns True if Kodi is idle.
+        :type is_idle:                  () -> bool
+
+        """
+
+        self.__monitor = monitor
+        self.__settings = settings
+        self.__isIdle = is_idle or CacheWarmingService.__is_kodi_idle
+        self.__lastRun = 0
+
+    def run(self):
+        """ Runs the service loop until Kodi requests an abort. """
+
+        while not self.__monitor.waitForAbort(CacheWarmingService.CheckInterval):
+            self.check()
+
+    def check(self):
+        """ Warms the cache if cache warming is enabled, if it is due and if Kodi is idle.
+
+        :return: True if the cache was warmed.
+        :rtype: bool
+
+        """
+
+        # the settings are read each time, so the kill-switch works immediately.
+        if self.__settings("cache_warming") != "true" or self.__settings("http_cache") == "false":
+            return False
+
+        interval = int(self.__settings("cache_warming_interval") or 6) * 60 * 60
+        if self.__lastRun + interval > time.time() or not self.__isIdle():
+            return False
+
+        self.__lastRun = time.time()
+        self.warm()
+        return True
+
+    def warm(self):
+        """ Sets up the add-on infrastructure (just like an add-on run) and warms the cache. """
+
+        from resources.lib.retroconfig import Config
+        from resources.lib.addonsettings import AddonSettings
+        from resources.lib.urihandler import UriHandler
+        from resources.lib.textures import TextureHandler
+        from resources.lib.favourites import Favourites
+        from resources.lib.pickler import Pickler
+
+        import xbmc
+
+        # the service has its own log file, as the add-on could run at the same time.
+        own_logger = Logger.instance() is None
+        if own_logger:
+            Logger.create_logger(os.path.join(Config.profileDir, CacheWarmingService.LogFileName),
+                                 Config.appName, append=False,
+                                 dual_logger=lambda x, y=4: xbmc.log(x, y))
+        try:
+            Logger.instance().minLogLevel = AddonSettings.get_log_level()
+            UriHandler.create_uri_handler(cache_dir=Config.cacheDir,
+                                          cookie_jar=os.path.join(Config.profileDir, "cookiejar.dat"),
+                                          ignore_ssl_errors=AddonSettings.ignore_ssl_errors(),
+                                          cache_max_size=AddonSettings.get_http_cache_size())
+            TextureHandler.set_texture_handler(Config, Logger.instance(), UriHandler.instance())
+
+            channels = CacheWarmer.get_channels(AddonSettings.get_cache_warming_channel_count(),
+                                                Favourites(Config.favouriteDir))
+            warmer = CacheWarmer(channels, Pickler(Config.profileDir), should_stop=self.__should_stop)
+            try:
+                warmer.warm()
+            finally:
+                UriHandler.flush()
+        except:
+            Logger.error("Error warming the cache", exc_info=True)
+        finally:
+            # settings might be changed before the next run
+            AddonSettings.clear_cached_addon_settings_object()
+            if own_logger:
+                Logger.instance().close_log()
+
+    def __should_stop(self):
+        return self.__monitor.abortRequested() or self.__settings("cache_warming") != "true" \
+            or not self.__isIdle()
+
+    @staticmethod
+    def __is_kodi_idle():
+        import xbmc
+        return xbmc.getGlobalIdleTime() >= CacheWarmingService.IdleTime and not xbmc.Player().isPlaying()
@@ -213,10 +213,12 @@ class ChannelInfo(object):
         return self.addonUrl is not None
 
     @staticmethod
-    def from_json(path):
+    def from_json(path, json_data=None):
         """ Generates a list of ChannelInfo objects present in the json meta data file.
 
-        :param str path: The path of the json file.
+        :param str path:                The path of the json file.
+        :param dict|None json_data:     The already parsed content of the json file (for
+                                        instance from the channel index).
 
         :return: The channel info objects within the json file.
         :rtype: list[ChannelInfo]
@@ -229,16 +231,12 @@ class ChannelInfo(object):
 
         channel_infos = []
 
-        with io.open(path, mode="r", encoding="utf-8") as json_file:
-            json_data = json_file.read()
+        if json_data is None:
+            with io.open(path, mode="r", encoding="utf-8") as json_file:
+                json_data = JsonHelper(json_file.read(), logger=Logger.instance()).json
 
-        json = JsonHelper(json_data, logger=Logger.instance())
-        channels = json.get_value("channels")  # type: dict
-
-        if "settings" in json.json:
-            settings = json.get_value("settings")
-        else:
-            settings = []
+        channels = json_data["channels"]  # type: list[dict]
+        settings = json_data.get("settings", [])
         Logger.debug("Found %s channels and %s settings in %s", len(channels), len(settings), path)
 
         for channel in channels:
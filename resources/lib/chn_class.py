@@ -1,6 +1,8 @@
 # coding=utf-8  # NOSONAR
 # SPDX-License-Identifier: CC-BY-NC-SA-4.0
 
+import itertools
+
 from resources.lib.backtothefuture import PY2
 
 if PY2:
@@ -18,11 +20,13 @@ from resources.lib.retroconfig import Config
 from resources.lib.logger import Logger
 from resources.lib.urihandler import UriHandler
 from resources.lib.parserdata import ParserData
+from resources.lib.parserindex import ParserIndex
 from resources.lib.textures import TextureHandler
 
 from resources.lib.helpers.htmlentityhelper import HtmlEntityHelper
 from resources.lib.helpers.jsonhelper import JsonHelper
 from resources.lib.helpers.languagehelper import LanguageHelper
+from resources.lib.helpers.threadhelper import ThreadHelper
 from resources.lib.addonsettings import AddonSettings, LOCAL
 from resources.lib.channelinfo import ChannelInfo
 
@@ -54,6 +58,9 @@ class Channel:
         # More and more API's need a specific set of headers. This set is used for the self.mainListUri, and is set to
         # all items generated by the chn_class.py.
         self.httpHeaders = dict()
+        # Request headers (besides Authorization and the like) that make a response differ per value, e.g. a
+        # profile or token header. They are added to the cache key of the HTTP cache.
+        self.cacheKeyHeaders = []
         self.loggedOn = False
 
         # Initialize channel stuff from ChannelInfo object
@@ -88,6 +95,10 @@ class Channel:
         # configure login stuff
         self.requiresLogon = False
 
+        # can the parsed listings be re-used from the PickleStore (see the listing_cache setting)?
+        # Channels with listings that change with each request should disable this.
+        self.cacheParsedListings = True
+
         # setup the urls
         self.mainListUri = ""
         self.baseUrl = ""
@@ -97,6 +108,7 @@ class Channel:
         # self.dataHandlers = dict()
         # self.updateHandlers = dict()
         self.dataParsers = dict()
+        self.__dataParserIndex = None   # : compiled index of the dataParsers, see ParserIndex
 
         self.episodeItemRegex = ''      # : used for the ParseMainList
         self.episodeItemJson = None     # : used for the ParseMainList
@@ -200,7 +212,9 @@ class Channel:
             no_cache = item is not None and not item.is_playable() and item.isLive
             if no_cache:
                 Logger.debug("Disabling cache for '%s'", item)
-            data = UriHandler.open(url, proxy=self.proxy, additional_headers=headers, no_cache=no_cache)
+            # For listings a stale cached response is fine, it is refreshed in the background.
+            data = UriHandler.open(url, proxy=self.proxy, additional_headers=headers, no_cache=no_cache,
+                                   stale_while_revalidate=True, cache_key_headers=self.cacheKeyHeaders)
         # Searching a site using search_site()
         elif url == "searchSite" or url == "#searchSite":
             Logger.debug("Starting to search")
@@ -268,7 +282,9 @@ class Channel:
                         handler_json = JsonHelper(handler_data, Logger.instance())
 
                 Logger.trace(data_parser.Parser)
-                parser_results = handler_json.get_value(fallback=[], *data_parser.Parser)
+                # the compiled paths are cached, so they are shared by all listings
+                parser_path = JsonHelper.compile_path(*data_parser.Parser)
+                parser_results = handler_json.get_value(parser_path, fallback=[])
 
                 if not isinstance(parser_results, (tuple, list)):
                     # if there is just one match, return that as a list
@@ -277,16 +293,20 @@ class Channel:
                 if isinstance(handler_data, JsonHelper):
                     raise ValueError("Cannot perform Regex Parser on JsonHelper.")
                 else:
-                    parser_results = Regexer.do_regex(data_parser.Parser, handler_data)
+                    # stream the matches to the creator, instead of collecting them all first
+                    parser_results = Regexer.iter_regex(data_parser.Parser, handler_data)
 
-            Logger.debug("[DataParsers] Processing DataParser.Creator for %s items", len(parser_results))
+            Logger.debug("[DataParsers] Processing DataParser.Creator")
+            result_count = 0
             for parser_result in parser_results:
+                result_count += 1
                 handler_result = data_parser.Creator(parser_result)
                 if handler_result is not None:
                     if isinstance(handler_result, list):
                         items += handler_result
                     else:
                         items.append(handler_result)
+            Logger.debug("[DataParsers] Processed DataParser.Creator for %s items", result_count)
 
             if data_parser.PostProcessor:
                 Logger.debug("[DataParsers] Processing DataParser.PostProcessor")
@@ -721,7 +741,8 @@ class Channel:
 
         Logger.debug('Starting update_video_item for %s (%s)', item.name, self.channelName)
 
-        data = UriHandler.open(item.url, proxy=self.proxy, additional_headers=item.HttpHeaders)
+        data = UriHandler.open(item.url, proxy=self.proxy, additional_headers=item.HttpHeaders,
+                               cache_key_headers=self.cacheKeyHeaders)
 
         url = Regexer.do_regex(self.mediaUrlRegex, data)[-1]
         part = MediaItemPart(item.name, url)
@@ -887,6 +908,7 @@ class Channel:
             self.dataParsers[url].append(data)
         else:
             self.dataParsers[url] = [data]
+        self.__dataParserIndex = None
         return
 
     def _get_setting(self, setting_id, value_for_none=None):
@@ -933,6 +955,82 @@ class Channel:
 
         return url
 
+    def _fetch_pages(self, page_urls, max_pages=None, max_workers=4,
+                     additional_headers=None, no_cache=False):
+        """ Fetches pages with predictable URLs concurrently using a bounded number of threads.
+        All pages are retrieved via the shared UriHandler, so they share the session, cookies
+        and the http cache, and use the same headers and proxy.
+
+        :param page_urls:                       The URLs of the pages (can be a generator).
+        :type page_urls:                        list[str]|iterable[str]
+        :param int|None max_pages:              The maximum number of pages to fetch.
+        :param int max_workers:                 The maximum number of concurrent requests.
+        :param dict|None additional_headers:    The headers to use for all pages.
+        :param bool no_cache:                   Should cache be disabled.
+
+        :return: The data of the pages in the order of the URLs (an empty string for a page that
+                 failed).
+        :rtype: list[str]
+
+        """
+
+        if max_pages is not None:
+            page_urls = itertools.islice(page_urls, max_pages)
+
+        headers = dict(additional_headers or {})
+
+        def fetch(url):
+            Logger.debug("Retrieving page: %s", url)
+            data = UriHandler.open(url, proxy=self.proxy, additional_headers=headers,
+                                   no_cache=no_cache, cache_key_headers=self.cacheKeyHeaders)
+            if UriHandler.instance().status.error:
+                # don't let the callers parse the body of an error response as page data
+                Logger.warning("Error retrieving page: %s", url)
+                return ""
+            return data
+
+        pages = ThreadHelper.map(fetch, page_urls, max_workers=max_workers, name="PageFetcher")
+        Logger.debug("Retrieved %s pages", len(pages))
+        return pages
+
+    def _follow_pages(self, data, get_next_url, max_pages, additional_headers=None, no_cache=False,
+                      parser=None):
+        """ Follows the "next page" links that can only be found in the previous page, so they
+        are retrieved one after the other.
+
+        :param str|JsonHelper data:             The data of the first page.
+        :param get_next_url:                    Returns the URL of the next page (or None) from
+                                                the data of a page.
+        :type get_next_url:                     (str|JsonHelper) -> str|None
+        :param int max_pages:                   The maximum number of pages, including the first.
+        :param dict|None additional_headers:    The headers to use for all pages.
+        :param bool no_cache:                   Should cache be disabled.
+        :param parser:                          Optional conversion of the data of each retrieved
+                                                page (for instance JsonHelper), which is then
+                                                passed on to `get_next_url` and returned.
+        :type parser:                           (str) -> any
+
+        :return: The (converted) data of the pages retrieved after the first one (in order) and
+                 the URL of the next page that was not retrieved (if any).
+        :rtype: tuple[list[any],str|None]
+
+        """
+
+        pages = []
+        headers = dict(additional_headers or {})
+        next_url = get_next_url(data)
+
+        while next_url and len(pages) + 1 < max_pages:
+            Logger.debug("Retrieving next page: %s", next_url)
+            data = UriHandler.open(next_url, proxy=self.proxy, additional_headers=headers,
+                                   no_cache=no_cache, cache_key_headers=self.cacheKeyHeaders)
+            if parser is not None:
+                data = parser(data)
+            pages.append(data)
+            next_url = get_next_url(data)
+
+        return pages, next_url
+
     def __get_data_parsers(self, url):
         """ Fetches a list of dataparsers that are valid for this URL. The Parsers and Creators can then
         be used to parse the data from the url. The first match is returned.
@@ -968,17 +1066,14 @@ class Channel:
             else:
                 Logger.warning("no DataParser was found keyword [%s]. Continuing with other options.", url)
         else:
-            # make sure we sort by keylength and then start with the longest one.
-            keys = sorted(self.dataParsers.keys(), key=len, reverse=True)
-            # watch.lap("DataParsers sorted")
+            # the index finds the longest matching key, just like trying them one by one would.
+            if self.__dataParserIndex is None:
+                self.__dataParserIndex = ParserIndex.get_index(self.dataParsers)
 
-            # filter them in order
-            for key in keys:
-                # for each key we see if we have filtered results
+            key = self.__dataParserIndex.find(url)
+            if key is not None:
                 data_parsers = [d for d in self.dataParsers[key] if d.matches(url)]
-                if data_parsers:
-                    Logger.trace("Found %s direct DataParsers matches", len(data_parsers))
-                    break
+                Logger.trace("Found %s direct DataParsers matches", len(data_parsers))
             # watch.lap("DataParsers filtered")
 
         if not data_parsers:
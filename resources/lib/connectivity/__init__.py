@@ -1,2 +1,2 @@
 # SPDX-License-Identifier: CC-BY-NC-SA-4.0
-__all__ = ["streamcache", "cachehttpadapter"]
+__all__ = ["streamcache", "cachehttpadapter", "persistentcookiejar"]
@@ -7,16 +7,30 @@ from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE, DEFAULT_RETRIES, DE
 from requests.structures import CaseInsensitiveDict
 
 import json
+import time
 import hashlib
+import threading
+import email.utils
 
 from .streamcache import StreamCache
 from resources.lib.logger import Logger
 
 
 class CacheHTTPAdapter(HTTPAdapter):
+    # Request headers that are always part of the cache key (if present in the request), so
+    # requests with different authentication or local IP headers don't share a cache entry.
+    DefaultKeyHeaders = ("authorization", "x-forwarded-for", "x-requested-with")
+    # The freshness lifetime if the response has no explicit (or heuristic) one.
+    DefaultLifetime = 3600
+    # Request header (not send to the server) to indicate that stale responses may be returned
+    # while they are revalidated in the background.
+    StaleWhileRevalidateHeader = "x-retrospect-stale-while-revalidate"
+    # The size of the chunks used when reading from the network and writing the cache.
+    ChunkSize = 256 * 1024
 
     def __init__(self, cache_store, pool_connections=DEFAULT_POOLSIZE, pool_maxsize=DEFAULT_POOLSIZE,
-                 max_retries=DEFAULT_RETRIES, pool_block=DEFAULT_POOLBLOCK):
+                 max_retries=DEFAULT_RETRIES, pool_block=DEFAULT_POOLBLOCK,
+                 key_headers=DefaultKeyHeaders, stale_max_age=24 * 3600, cookie_jar=None):
         """ Creates a Caching HTTP Adapter for the Requests module.
 
         :param StreamCache cache_store:     The Cache store to use.
@@ -24,20 +38,35 @@ class CacheHTTPAdapter(HTTPAdapter):
         :param int pool_maxsize:            Maximum number of active connections.
         :param int max_retries:             Maximum number of retries.
         :param bool pool_block:             Use the default pool?
+        :param tuple[str] key_headers:      The request headers to include in the cache keys.
+        :param int stale_max_age:           The maximum staleness in seconds of responses that
+                                            are returned while revalidating, if stale responses
+                                            are allowed by the request.
+        :param CookieJar cookie_jar:        The cookie jar of the session. The cookies of the
+                                            background revalidations (which are not returned
+                                            to the session) are stored in it.
 
         """
 
         self.cache_store = cache_store        # type: StreamCache
+        self.key_headers = tuple(h.lower() for h in key_headers or ())
+        self.stale_max_age = stale_max_age
+        self.cookie_jar = cookie_jar
+        self.__revalidations = []
 
         super(CacheHTTPAdapter, self).__init__(pool_connections, pool_maxsize, max_retries,
                                                pool_block)
 
     def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        allow_stale = request.headers.pop(CacheHTTPAdapter.StaleWhileRevalidateHeader, None) is not None
+
         try:
             if request.method == "GET":
-                response = self.__get_cached_response(request)
+                response = self.__get_cached_response(request, stream=stream, allow_stale=allow_stale)
                 if response:
                     self.cache_store.cacheHits += 1
+                    if getattr(response, "is_stale", False):
+                        self.__revalidate_in_background(request, timeout, verify, cert, proxies)
                     return response
         except:
             Logger.error("Error retrieving cache for %s", request.url, exc_info=True)
@@ -45,6 +74,33 @@ class CacheHTTPAdapter(HTTPAdapter):
         # Actually send a request
         Logger.debug("Retrieving data from: %s", request.url)
         response = super(CacheHTTPAdapter, self).send(request, stream, timeout, verify, cert, proxies)
+        return self.__process_response(request, response, stream)
+
+    def wait_for_revalidations(self, timeout=None):
+        """ Waits for the background revalidations that are still running.
+
+        :param float|None timeout:  The maximum time to wait in seconds (per revalidation).
+
+        """
+
+        for thread in list(self.__revalidations):
+            thread.join(timeout)
+            if thread.is_alive():
+                Logger.warning("Background revalidation did not finish within %s seconds", timeout)
+        self.__revalidations = [t for t in self.__revalidations if t.is_alive()]
+
+    def __process_response(self, request, response, stream):
+        """ Stores a network response in the cache (if cacheable) and replaces a `304 Not Modified`
+        response with the cached one.
+
+        :param requests.PreparedRequest request:    The request.
+        :param requests.Response response:          The network response.
+        :param bool stream:                         Was a streaming response requested.
+
+        :return: The response to return to the caller.
+        :rtype: requests.Response
+
+        """
 
         try:
             # Cache it if it was a cacheable response
@@ -55,14 +111,73 @@ class CacheHTTPAdapter(HTTPAdapter):
             if response.status_code == 304:
                 Logger.debug("304 Response found. Prolonging the %s", response.url)
                 self.cache_store.cacheHits += 1
-                response = self.__get_cached_response(request, no_check=True)
+                _, meta_key = self.__get_cache_keys(request, self.__get_vary(request))
+                self.cache_store.touch(meta_key)
+                response.close()
+                response = self.__get_cached_response(request, no_check=True, stream=stream)
         except:
             Logger.error("Error storing cache for %s", request.url, exc_info=True)
 
         return response
 
-    def __get_cached_response(self, req, no_check=False):
-        body_key, meta_key = self.__get_cache_keys(req)
+    def __revalidate_in_background(self, request, timeout, verify, cert, proxies):
+        """ Revalidates (and refreshes) a stale cached response in a background thread, so the
+        stale response can be returned immediately.
+
+        :param requests.PreparedRequest request:    The request for the stale response.
+
+        """
+
+        def revalidate():
+            try:
+                Logger.debug("Revalidating stale cache in the background: %s", revalidation_request.url)
+                response = super(CacheHTTPAdapter, self).send(
+                    revalidation_request, False, timeout, verify, cert, proxies)
+                if self.cookie_jar is not None:
+                    # The session never sees this response, so store its cookies ourselves.
+                    requests.cookies.extract_cookies_to_jar(self.cookie_jar, revalidation_request, response.raw)
+                response = self.__process_response(revalidation_request, response, False)
+                response.close()
+            except:
+                Logger.error("Error revalidating cache for %s", revalidation_request.url, exc_info=True)
+
+        # The validators were set on the request when the stale response was found.
+        revalidation_request = request.copy()
+        thread = threading.Thread(target=revalidate, name="CacheRevalidation")
+        thread.daemon = True
+        self.__revalidations.append(thread)
+        thread.start()
+
+    def __get_cached_response(self, req, no_check=False, stream=False, allow_stale=False):
+        """ Retrieves a response from the cache.
+
+        The freshness lifetime is determined from the `max-age` cache-control value, the `Expires`
+        header or heuristically from the `Last-Modified` header. The `s-maxage` value is ignored,
+        as it only applies to shared caches. If the response is no longer fresh, the request gets
+        the `If-None-Match` and `If-Modified-Since` validators, so the server can respond with a
+        `304 Not Modified`.
+
+        A stale response is returned (marked with `is_stale`) if it is still within the
+        `stale-while-revalidate` period of the response, or if `allow_stale` was specified and it
+        is not older than `stale_max_age`. The caller should then revalidate it.
+
+        :param requests.PreparedRequest req:    The request.
+        :param bool no_check:                   Return the response without freshness checks.
+        :param bool stream:                     Should the body be streamed from the cache file
+                                                instead of being read at once.
+        :param bool allow_stale:                Allow stale responses (stale-while-revalidate).
+
+        :return: The cached response or None.
+        :rtype: requests.Response|None
+
+        """
+
+        vary = self.__get_vary(req)
+        if vary is None:
+            Logger.debug("No-Cache-Hit (Vary: *): %s", req.url)
+            return None
+
+        body_key, meta_key = self.__get_cache_keys(req, vary)
         if not self.cache_store.has_cache_key(meta_key) or not \
                 self.cache_store.has_cache_key(body_key):
             Logger.debug("No-Cache-Hit: %s", req.url)
@@ -75,7 +190,13 @@ class CacheHTTPAdapter(HTTPAdapter):
 
         resp = requests.Response()
         resp.url = meta.get("url", req.url)
-        resp.raw = self.cache_store.get(body_key)
+        if stream:
+            # the file itself is the raw stream
+            resp.raw = self.cache_store.get(body_key)
+        else:
+            # read it with a single read, instead of via chunks that are joined later
+            resp._content = self.cache_store.read(body_key)
+            resp._content_consumed = True
         resp.status_code = meta["status"]
         resp.reason = meta.get("reason")
         resp.headers = headers
@@ -87,20 +208,100 @@ class CacheHTTPAdapter(HTTPAdapter):
 
         # Determine the maximum age and then check if the cache if valid or not.
         Logger.trace("Cache-Data: %s", cache_data)
-        valid_in_seconds = 3600
-        if 'max-age' in cache_data:
-            valid_in_seconds = cache_data['max-age']
+        age = self.cache_store.get_age(meta_key)
+        lifetime = self.__get_freshness_lifetime(headers, cache_data, age)
+        if age < lifetime:
+            Logger.debug("Cache-Hit: %s", req.url)
+            return resp
 
-        if self.cache_store.is_expired(meta_key, valid_in_seconds):
-            if self.__must_revalidate(cache_data):
-                Logger.debug("Stale-Cache hit found. Revalidating")
+        if self.__must_revalidate(cache_data, headers):
+            Logger.debug("Stale-Cache hit found. Revalidating")
+            if "etag" in headers:
                 req.headers["If-None-Match"] = headers["etag"]
-            else:
-                Logger.debug("Expired Cache-Hit: %s", req.url)
+            if "last-modified" in headers:
+                req.headers["If-Modified-Since"] = headers["last-modified"]
+        else:
+            Logger.debug("Expired Cache-Hit: %s", req.url)
+
+        if self.__can_serve_stale(cache_data, age - lifetime, allow_stale):
+            Logger.debug("Stale-Cache-Hit (%ds stale): %s", age - lifetime, req.url)
+            resp.is_stale = True
+            return resp
+        return None
+
+    def __get_freshness_lifetime(self, headers, cache_data, age):
+        """ Determines the freshness lifetime (RFC 7234 - 4.2.1) of a cached response.
+
+        :param CaseInsensitiveDict headers:     The headers of the cached response.
+        :param dict cache_data:                 The cache-control data.
+        :param float age:                       The number of seconds since it was stored.
+
+        :return: The number of seconds the response is fresh.
+        :rtype: float
+
+        """
+
+        if "max-age" in cache_data:
+            return cache_data["max-age"]
+
+        date = self.__parse_http_date(headers.get("date"))
+        if "expires" in headers:
+            expires = self.__parse_http_date(headers["expires"])
+            if expires is None:
+                # An invalid date (like "0" or "-1") means already expired
+                return 0
+            # without a Date header we use the moment it was stored
+            date = date or time.time() - age
+            return expires - date
+
+        last_modified = self.__parse_http_date(headers.get("last-modified"))
+        if date is not None and last_modified is not None and date > last_modified:
+            # Heuristic freshness: 10% of the time since the last modification.
+            return min((date - last_modified) / 10, CacheHTTPAdapter.DefaultLifetime)
+
+        return CacheHTTPAdapter.DefaultLifetime
+
+    def __can_serve_stale(self, cache_data, staleness, allow_stale):
+        """ Checks whether a stale response may be used while it is revalidated.
+
+        :param dict cache_data:     The cache-control data.
+        :param float staleness:     The number of seconds the response is stale.
+        :param bool allow_stale:    Did the caller allow stale responses?
+
+        :rtype: bool
+
+        """
+
+        if "must-revalidate" in cache_data or "proxy-revalidate" in cache_data:
+            return False
+
+        stale_while_revalidate = cache_data.get("stale-while-revalidate", 0)
+        if stale_while_revalidate is True:
+            # no value was specified
+            stale_while_revalidate = 0
+
+        if staleness < stale_while_revalidate:
+            return True
+
+        return allow_stale and staleness < self.stale_max_age
+
+    def __parse_http_date(self, value):
+        """ Parses a HTTP date (RFC 7231 - 7.1.1.1) to seconds since epoch.
+
+        :param str|None value:  The date value.
+
+        :return: The seconds since epoch or None if it was invalid.
+        :rtype: float|None
+
+        """
+
+        if not value:
             return None
 
-        Logger.debug("Cache-Hit: %s", req.url)
-        return resp
+        date = email.utils.parsedate_tz(value)
+        if date is None:
+            return None
+        return email.utils.mktime_tz(date)
 
     def __extract_cache_data(self, headers):
         """ Extracts cache data from the `cache-control` headers.
@@ -196,6 +397,10 @@ class CacheHTTPAdapter(HTTPAdapter):
             Logger.trace("CacheKey No-Cache or No-Store found. Not caching")
             return False
 
+        if "*" in self.__get_vary_headers(res.headers):
+            Logger.trace("Vary: * found. Not caching")
+            return False
+
         # must revalidate means that you must revalidate after the cache became
         # stale. So after the cache expired.
         if "must-revalidate" in cache_data or "proxy-revalidate" in cache_data:
@@ -211,26 +416,23 @@ class CacheHTTPAdapter(HTTPAdapter):
 
     def __store_response(self, req, res, cache_data):
         Logger.debug("Storing cache for: %s", res.url)
-        body_key, meta_key = self.__get_cache_keys(req)
+        vary = self.__get_vary_headers(res.headers)
+        self.__store_vary(req, vary)
+        body_key, meta_key = self.__get_cache_keys(req, vary)
 
-        # Store the body as a binary file and reset the raw and _content_consumed attributes
-        # of the response so we can reuse it again
+        # Store the body in a single pass: each (large) chunk from the network is written to disk
+        # and kept, so we don't need to read it back from disk afterwards.
+        chunks = []
         with self.cache_store.set(body_key) as fp:
-            for chunk in res.iter_content(chunk_size=128):
+            for chunk in res.iter_content(chunk_size=CacheHTTPAdapter.ChunkSize):
                 fp.write(chunk)
+                chunks.append(chunk)
 
-        # we need to restore some original response protected members and the raw content. The
-        # latter is an urllib3 response, but we can use an BytesIO as long as we add some required
-        # stuff such as _original_response.
-        original_response = None
-        if hasattr(res.raw, '_original_response'):
-            original_response = res.raw._original_response
-
-        # set the raw content so we can use it again
-        res.raw = self.cache_store.get(body_key)
-        res._content_consumed = False
-        if original_response:
-            res.raw._original_response = original_response
+        # The raw urllib3 response is consumed now, but we keep it, as it holds the
+        # _original_response that is needed for the cookie extraction. The content is set directly.
+        res._content = b"".join(chunks)
+        res._content_consumed = True
+        del chunks
 
         # store all headers and cache-data and store it in a json file
         data = {
@@ -251,19 +453,19 @@ class CacheHTTPAdapter(HTTPAdapter):
 
         return
 
-    def __must_revalidate(self, cache_data):
+    def __must_revalidate(self, cache_data, headers):
         """ Checks if a cached response should be revalidated
 
-        Arguments:
-        meta_data : dict - the response to check.
+        :param dict cache_data:                 The cache-control data.
+        :param CaseInsensitiveDict headers:     The headers of the cached response.
 
-        If True is returned the response has a must-revalidate cache parameters
-        and an ETAG.
+        If True is returned the response has an ETag or Last-Modified header that can be used to
+        revalidate it with a conditional request.
 
         """
 
         # No cache data present, so no need to revalidate the thing.
-        if not cache_data:
+        if not cache_data and "last-modified" not in headers:
             Logger.trace("No cache data found for a cached request. No "
                          "need to revalidate as it's either expired or not.")
             return False
@@ -273,15 +475,89 @@ class CacheHTTPAdapter(HTTPAdapter):
         #     if "etag" in cache_data:
         #         return True
 
-        # always revalidate a etag as many sites don't provide the ....-revalidate option.
-        if "etag" in cache_data:
+        # always revalidate a etag or last-modified as many sites don't provide the
+        # ....-revalidate option.
+        if "etag" in headers or "last-modified" in headers:
             return True
 
         return False
 
-    def __get_cache_keys(self, req):
+    def __get_vary(self, req):
+        """ Retrieves the request headers on which the previously cached response for this URL
+        varied.
+
+        :param requests.PreparedRequest req:    The request.
+
+        :return: The lower-case header names or None if the response varied on everything.
+        :rtype: list[str]|None
+
+        """
+
+        vary_key = "{0}.vary".format(self.__get_url_hash(req))
+        if not self.cache_store.has_cache_key(vary_key):
+            return []
+
+        with self.cache_store.get(vary_key) as fd:
+            vary = json.load(fd)
+        if "*" in vary:
+            return None
+        return vary
+
+    def __store_vary(self, req, vary):
+        """ Stores the `Vary` header names of a response for an URL, so the next lookup for the URL
+        can determine which request headers to include in the cache key.
+
+        :param requests.PreparedRequest req:    The request.
+        :param list[str] vary:                  The lower-case header names.
+
+        """
+
+        vary_key = "{0}.vary".format(self.__get_url_hash(req))
+        if not vary and not self.cache_store.has_cache_key(vary_key):
+            return
+
+        with self.cache_store.set(vary_key) as fp:
+            fp.write(json.dumps(vary).encode())
+
+    def __get_vary_headers(self, headers):
+        """ Extracts the lower-case header names from the `Vary` header.
+
+        :param dict headers:    The response headers.
+
+        :rtype: list[str]
+
+        """
+
+        vary = headers.get("vary")
+        if not vary:
+            return []
+        return sorted(set(h.strip().lower() for h in vary.split(",") if h.strip()))
+
+    def __get_url_hash(self, req):
+        hash_tool = hashlib.md5()
+        hash_tool.update(req.url.encode())
+        return hash_tool.hexdigest()
+
+    def __get_cache_keys(self, req, vary=None):
+        """ Determines the cache keys for a request. Besides the URL, the values of the key headers
+        and the headers the response varies on are used, if present in the request.
+
+        :param requests.PreparedRequest req:    The request.
+        :param list[str] vary:                  The lower-case header names from the `Vary` header.
+
+        :return: The body and meta data cache keys.
+        :rtype: tuple[str,str]
+
+        """
+
         hash_tool = hashlib.md5()
         hash_tool.update(req.url.encode())
+        for header in sorted(set(self.key_headers).union(vary or [])):
+            value = req.headers.get(header)
+            if value is None:
+                continue
+            hash_tool.update("\n{0}:{1}".format(header, value).encode())
+
         key = hash_tool.hexdigest()
         body_file = "{0}.body".format(key)
         meta_file = "{0}.meta".format(key)
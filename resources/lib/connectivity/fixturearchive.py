@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import hashlib
+import json
+import os
+import threading
+import zipfile
+
+from resources.lib.helpers.filehelper import FileHelper
+from resources.lib.logger import Logger
+
+
+class FixtureArchive(object):
+    Record = "record"
+    Replay = "replay"
+
+    __IndexName = "index.json"
+
+    def __init__(self, path, mode):
+        """ An archive with recorded HTTP request/response pairs, used to replay the traffic of
+        channels without network access.
+
+        The archive is a zip file with an `index.json` that holds the responses (status, headers
+        and the name of the body) per request key, and the response bodies themselves. A request
+        that was recorded multiple times is replayed in the same order, after which the last
+        response keeps being replayed.
+
+        :param str path:    The path of the zip file.
+        :param str mode:    The mode: FixtureArchive.Record or FixtureArchive.Replay.
+
+        """
+
+        if mode not in (FixtureArchive.Record, FixtureArchive.Replay):
+            raise ValueError("Invalid fixture archive mode: {}".format(mode))
+
+        self.path = path
+        self.mode = mode
+
+        # statistics of the requests that were recorded or replayed
+        self.requests = 0
+        self.bytes = 0
+        self.misses = 0
+
+        self.__lock = threading.Lock()
+        self.__index = {}
+        self.__bodies = {}
+        self.__positions = {}
+        self.__zip = None
+
+        if mode == FixtureArchive.Replay:
+            self.__zip = zipfile.ZipFile(path, "r")
+            self.__index = json.loads(self.__zip.read(FixtureArchive.__IndexName).decode("utf-8"))
+            Logger.debug("Opened %s", self)
+
+    @property
+    def is_recording(self):
+        return self.mode == FixtureArchive.Record
+
+    @staticmethod
+    def get_key(method, url, body=None):
+        """ Creates the key of a request: the method, the URL and the body.
+
+        :param str method:              The HTTP method.
+        :param str url:                 The full URL.
+        :param bytes|str|None body:     The request body.
+
+        :return: The key of the request.
+        :rtype: str
+
+        """
+
+        key = hashlib.sha1("{} {}\n".format(method, url).encode("utf-8"))
+        if body:
+            key.update(body if isinstance(body, bytes) else body.encode("utf-8"))
+        return key.hexdigest()
+
+    def put(self, method, url, body, response, content):
+        """ Records a response.
+
+        :param str method:                  The HTTP method.
+        :param str url:                     The requested URL.
+        :param bytes|str|None body:         The request body.
+        :param dict[str,any] response:      The `status`, `reason`, `url`, `headers` and
+                                            `encoding` of the response.
+        :param bytes content:               The (decoded) body of the response.
+
+        """
+
+        key = FixtureArchive.get_key(method, url, body)
+        content_name = "bodies/{}".format(hashlib.sha1(content).hexdigest())
+        response["method"] = method
+        response["body"] = content_name
+
+        with self.__lock:
+            self.__index.setdefault(key, []).append(response)
+            self.__bodies[content_name] = content
+            self.requests += 1
+            self.bytes += len(content)
+
+    def get(self, method, url, body=None):
+        """ Retrieves the next recorded response for a request.
+
+        :param str method:              The HTTP method.
+        :param str url:                 The requested URL.
+        :param bytes|str|None body:     The request body.
+
+        :return: The recorded response (see `put`) with its body as `content` or None if the
+                 request was not recorded.
+        :rtype: dict[str,any]|None
+
+        """
+
+        key = FixtureArchive.get_key(method, url, body)
+        with self.__lock:
+            responses = self.__index.get(key)
+            if not responses:
+                Logger.warning("No recorded response for: %s %s", method, url)
+                self.misses += 1
+                return None
+
+            position = self.__positions.get(key, 0)
+            self.__positions[key] = position + 1
+            response = dict(responses[min(position, len(responses) - 1)])
+            response["content"] = self.__zip.read(response["body"])
+            self.requests += 1
+            self.bytes += len(response["content"])
+            return response
+
+    def save(self):
+        """ Writes the recorded responses to the archive. Replaying archives are not changed. """
+
+        if not self.is_recording:
+            return
+
+        with self.__lock:
+            folder = os.path.dirname(self.path)
+            if folder and not os.path.isdir(folder):
+                os.makedirs(folder)
+
+            # write to a temporary file first, so an existing archive stays intact on errors
+            temp_path = "{}.tmp".format(self.path)
+            with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr(FixtureArchive.__IndexName,
+                                 json.dumps(self.__index, indent=2, sort_keys=True))
+                for name, content in self.__bodies.items():
+                    archive.writestr(name, content)
+
+            FileHelper.replace(temp_path, self.path)
+            Logger.info("Saved %s", self)
+
+    def close(self, save=True):
+        """ Saves the archive (when recording) and closes it.
+
+        :param bool save:   Should the recorded responses be saved.
+
+        """
+
+        if save:
+            self.save()
+        if self.__zip is not None:
+            self.__zip.close()
+            self.__zip = None
+
+    def __str__(self):
+        return "FixtureArchive [{}] {} ({} requests, {} bytes)".format(
+            self.mode, self.path, self.requests, self.bytes)
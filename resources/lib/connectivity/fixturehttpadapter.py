@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .fixturearchive import FixtureArchive
+from resources.lib.logger import Logger
+
+
+class FixtureHTTPAdapter(HTTPAdapter):
+    # The response bodies are stored decoded, so these headers no longer apply to them.
+    SkippedHeaders = ("content-encoding", "content-length", "transfer-encoding")
+
+    def __init__(self, archive):
+        """ Creates a HTTP Adapter for the Requests module that records all responses into a
+        fixture archive, or that replays them from it without any network access.
+
+        Just like responses from the http cache, replayed responses do not set cookies.
+
+        :param FixtureArchive archive:  The archive to record into or replay from.
+
+        """
+
+        self.archive = archive      # type: FixtureArchive
+        super(FixtureHTTPAdapter, self).__init__()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if not self.archive.is_recording:
+            return self.__replay(request)
+
+        response = super(FixtureHTTPAdapter, self).send(request, stream, timeout, verify, cert, proxies)
+
+        # The raw urllib3 response is consumed now, but we keep it, as it holds the
+        # _original_response that is needed for the cookie extraction.
+        content = response.content
+        headers = dict(
+            (k, v) for k, v in response.headers.items()
+            if k.lower() not in FixtureHTTPAdapter.SkippedHeaders
+        )
+        self.archive.put(request.method, request.url, request.body, {
+            "url": response.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": headers,
+            "encoding": response.encoding
+        }, content)
+        return response
+
+    def __replay(self, request):
+        """ Creates a response for the request from the archive.
+
+        :param requests.PreparedRequest request:    The request.
+
+        :return: The recorded response.
+        :rtype: requests.Response
+
+        """
+
+        recorded = self.archive.get(request.method, request.url, request.body)
+        if recorded is None:
+            raise requests.exceptions.ConnectionError(
+                "No recorded response in {} for {} {}".format(self.archive.path, request.method, request.url),
+                request=request)
+
+        Logger.debug("Fixture-Hit: %s", request.url)
+        resp = requests.Response()
+        resp.url = recorded.get("url", request.url)
+        resp._content = recorded["content"]
+        resp._content_consumed = True
+        resp.status_code = recorded["status"]
+        resp.reason = recorded.get("reason")
+        resp.headers = CaseInsensitiveDict(data=recorded["headers"])
+        resp.encoding = recorded["encoding"]
+        resp.request = request
+        return resp
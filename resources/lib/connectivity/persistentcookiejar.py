@@ -0,0 +1,110 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+from resources.lib.backtothefuture import PY2
+if PY2:
+    # noinspection PyCompatibility,PyUnresolvedReferences
+    from cookielib import MozillaCookieJar
+else:
+    # noinspection PyCompatibility
+    from http.cookiejar import MozillaCookieJar
+
+from resources.lib.helpers.filehelper import FileHelper
+
+
+class PersistentCookieJar(MozillaCookieJar):
+    def __init__(self, filename):
+        """ A MozillaCookieJar that keeps track of changes to the persistent cookies. The file on
+        disk is only rewritten (atomically) when the cookies really changed and `flush` is called.
+
+        :param str filename:    The path of the cookie jar file.
+
+        """
+
+        MozillaCookieJar.__init__(self, filename)
+        self.dirty = False
+
+    def set_cookie(self, cookie):
+        """ Set a cookie and marks the jar as changed if a stored cookie was added or changed.
+
+        :param cookie: The cookie to set.
+
+        """
+
+        # noinspection PyUnresolvedReferences
+        self._cookies_lock.acquire()
+        try:
+            existing = self._cookies.get(cookie.domain, {}).get(cookie.path, {}).get(cookie.name)
+            if self.__has_changed(existing, cookie):
+                self.dirty = True
+            MozillaCookieJar.set_cookie(self, cookie)
+        finally:
+            # noinspection PyUnresolvedReferences
+            self._cookies_lock.release()
+
+    def clear(self, domain=None, path=None, name=None):
+        count = len(self)
+        MozillaCookieJar.clear(self, domain, path, name)
+        self.dirty = self.dirty or len(self) != count
+
+    def clear_session_cookies(self):
+        # Session cookies are never stored, so removing them won't change the file.
+        dirty = self.dirty
+        MozillaCookieJar.clear_session_cookies(self)
+        self.dirty = dirty
+
+    def clear_expired_cookies(self):
+        count = len(self)
+        MozillaCookieJar.clear_expired_cookies(self)
+        self.dirty = self.dirty or len(self) != count
+
+    def load(self, filename=None, ignore_discard=False, ignore_expires=False):
+        MozillaCookieJar.load(self, filename, ignore_discard, ignore_expires)
+        self.dirty = False
+
+    def save(self, filename=None, ignore_discard=False, ignore_expires=False):
+        """ Saves the cookies to a temporary file and then renames it to the actual file, so
+        the cookie jar file is never left half-written.
+
+        """
+
+        filename = filename or self.filename
+        temp_filename = "{0}.tmp".format(filename)
+        MozillaCookieJar.save(self, temp_filename, ignore_discard, ignore_expires)
+        FileHelper.replace(temp_filename, filename)
+        self.dirty = False
+
+    def flush(self):
+        """ Writes the cookies to disk, but only if they changed since the last load or save.
+
+        :return: Indication whether the cookies were written.
+        :rtype: bool
+
+        """
+
+        if not self.dirty:
+            return False
+
+        self.save()
+        return True
+
+    def __has_changed(self, existing, cookie):
+        """ Checks whether setting a cookie changes the persisted cookies.
+
+        :param existing:    The currently stored cookie (or None).
+        :param cookie:      The new cookie.
+
+        :rtype: bool
+
+        """
+
+        if existing is None:
+            # session cookies are never persisted
+            return not cookie.discard
+
+        if existing.discard and cookie.discard:
+            return False
+
+        return (existing.value, existing.expires, existing.secure, existing.discard,
+                existing.version, existing.port) != \
+            (cookie.value, cookie.expires, cookie.secure, cookie.discard,
+             cookie.version, cookie.port)
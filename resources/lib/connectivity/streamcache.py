@@ -2,8 +2,14 @@
 
 import os
 import io
-import datetime
+import json
+import time
+import tempfile
 import threading
+from collections import OrderedDict
+
+from resources.lib.helpers.filehelper import FileHelper
+from resources.lib.logger import Logger
 
 # lock object to use.
 cacheLock = threading.RLock()
@@ -36,35 +42,144 @@ def locked_read_write(origfunc):
 
 
 class StreamCache(object):
-    def __init__(self, cache_path):
+    # The default maximum size of the cache: 50MB
+    DefaultMaxSize = 50 * 1024 * 1024
+
+    __IndexFile = "index.json"
+    __IndexVersion = 1
+    __TempSuffix = ".tmp"
+
+    def __init__(self, cache_path, max_size=DefaultMaxSize):
+        """ Creates a file based cache store. All keys are kept in a single index file that holds
+        the size, store time and last access time of each key. The index is ordered from least
+        to most recently used, so once the cache grows beyond `max_size` the least recently
+        used keys are evicted.
+
+        :param str cache_path:  The path to store the cache in (a `www` sub-folder is used).
+        :param int max_size:    The maximum size in bytes of the cache.
+
+        """
+
         self.cacheHits = 0
         self.cachePath = os.path.join(cache_path, "www")
         if not os.path.isdir(self.cachePath):
             os.makedirs(self.cachePath)
 
+        self.maxSize = max_size
+        self.size = 0
+
+        # key -> [size, store time, last access time] ordered from least to most recently used.
+        self.__index = OrderedDict()
+        self.__indexPath = os.path.join(self.cachePath, StreamCache.__IndexFile)
+        self.__indexTime = 0
+        self.__indexDirty = False
+        self.__removed = set()
+        self.__reconciled = 0
+        self.__load_index()
+
     @locked_read_write
     def set(self, key):
+        """ Opens a cache key for writing. The content is written to a temporary file that
+        replaces the actual file once it is closed, so readers never see a partially written
+        file. The index is updated at the same moment.
+
+        :param str key:     The key to store.
+
+        :return: A writable binary file object.
+        :rtype: _IndexedCacheFile
+
+        """
+
         file_name = os.path.join(self.cachePath, key)
-        fp = io.open(file_name, mode="w+b")
-        return fp
+        handle, temp_name = tempfile.mkstemp(
+            prefix="{0}.".format(key), suffix=StreamCache.__TempSuffix, dir=self.cachePath)
+        fp = io.open(handle, mode="w+b")
+        return _IndexedCacheFile(fp, temp_name, file_name, key, self)
 
     @locked_read_write
     def get(self, key):
+        """ Opens a cache key for reading and marks the key as most recently used. The caller
+        should close the returned file.
+
+        :param str key:     The key to retrieve.
+
+        :return: The cached content as a binary file object.
+        :rtype: io.BufferedReader
+
+        """
+
         file_name = os.path.join(self.cachePath, key)
-        with io.open(file_name, mode="rb") as fp:
-            return io.BytesIO(fp.read())
+        try:
+            fp = io.open(file_name, mode="rb")
+        except (IOError, OSError):
+            # the file was removed outside the index, so remove it from the index too.
+            self.__remove_entry(key, remove_file=False)
+            raise
+
+        self.__mark_used(key)
+        return fp
+
+    def read(self, key):
+        """ Returns the full content of a cache key (with a single read) and marks the key as
+        most recently used.
+
+        :param str key:     The key to retrieve.
+
+        :return: The cached content.
+        :rtype: bytes
+
+        """
+
+        with self.get(key) as fp:
+            return fp.read()
 
     def is_expired(self, key, seconds=3600):
-        file_name = os.path.join(self.cachePath, key)
-        if not os.path.isfile(file_name):
+        """ Checks whether a key is older than the given number of seconds.
+
+        :param str key:         The key to check.
+        :param int seconds:     The number of seconds a key is valid.
+
+        :return: True if the key exists and was stored more than `seconds` ago.
+        :rtype: bool
+
+        """
+
+        entry = self.__index.get(key)
+        if entry is None:
             return False
 
-        store_time = datetime.datetime.fromtimestamp(os.path.getmtime(file_name))
-        valid_until = store_time + datetime.timedelta(seconds=seconds)
-        if valid_until < datetime.datetime.now():
-            return True
+        return entry[1] + seconds < time.time()
 
-        return False
+    def get_age(self, key):
+        """ Returns the number of seconds since a key was stored (or touched).
+
+        :param str key:     The key to check.
+
+        :return: The age in seconds or None if the key does not exist.
+        :rtype: float|None
+
+        """
+
+        entry = self.__index.get(key)
+        if entry is None:
+            return None
+
+        return time.time() - entry[1]
+
+    @locked_read_write
+    def touch(self, key):
+        """ Resets the store time of a key, for instance after a revalidation.
+
+        :param str key:     The key to touch.
+
+        """
+
+        entry = self.__index.get(key)
+        if entry is None:
+            return
+
+        entry[1] = time.time()
+        self.__indexDirty = True
 
     def has_cache_key(self, key):
         """ Returns if a key is present (expired or not) in the cache.
@@ -76,8 +191,253 @@ class StreamCache(object):
 
         """
 
+        return key in self.__index
+
+    @locked_read_write
+    def purge(self, max_age):
+        """ Removes all keys that were stored more than `max_age` seconds ago. Once every
+        `max_age` seconds the index is also reconciled with the files in the cache folder.
+
+        :param int max_age:     The maximum age in seconds.
+
+        """
+
+        now = time.time()
+        if self.__reconciled + max_age < now:
+            self.__reconcile()
+
+        expired = [k for k, v in self.__index.items() if v[1] + max_age < now]
+        for key in expired:
+            self.__remove_entry(key)
+        Logger.info("Removed %s of %s keys from %s", len(expired), len(self.__index) + len(expired), self)
+
+    @locked_read_write
+    def clear(self):
+        """ Removes all keys and files from the cache. """
+
+        for key in list(self.__index.keys()):
+            self.__remove_entry(key)
+
+        # don't merge the keys of others into a cleared index
+        self.__indexTime = self.__get_index_time()
+        self.flush()
+
+    @locked_read_write
+    def flush(self):
+        """ Writes the index to disk if it was changed. Changes made to the index on disk by
+        other instances are merged before writing.
+
+        """
+
+        if not self.__indexDirty:
+            return
+
+        if self.__get_index_time() != self.__indexTime:
+            # Someone else (the service?) updated the index. Merge their unknown keys.
+            on_disk = self.__read_index()
+            if on_disk is not None:
+                # their keys are considered to be least recently used
+                merged = OrderedDict(
+                    (k, v) for k, v in on_disk.items()
+                    if k not in self.__index and k not in self.__removed
+                )
+                self.size += sum(v[0] for v in merged.values())
+                merged.update(self.__index)
+                self.__index = merged
+
+        data = {
+            "version": StreamCache.__IndexVersion,
+            "reconciled": self.__reconciled,
+            "keys": [[k] + v for k, v in self.__index.items()]
+        }
+        FileHelper.write_atomic(self.__indexPath, json.dumps(data, separators=(",", ":")).encode())
+        self.__indexTime = self.__get_index_time()
+        self.__indexDirty = False
+        self.__removed.clear()
+        Logger.debug("Stored index with %s keys (%s bytes) for %s", len(self.__index), self.size, self)
+
+    @locked_read_write
+    def _register(self, key, size):
+        """ Adds (or updates) a key in the index as most recently used and evicts the least
+        recently used keys if the cache grows beyond its maximum size.
+
+        :param str key:     The key that was stored.
+        :param int size:    The size in bytes.
+
+        """
+
+        old_entry = self.__index.pop(key, None)
+        if old_entry is not None:
+            self.size -= old_entry[0]
+
+        now = time.time()
+        self.__index[key] = [size, now, now]
+        self.size += size
+        self.__removed.discard(key)
+        self.__indexDirty = True
+
+        if self.size > self.maxSize:
+            self.__evict()
+
+    def __mark_used(self, key):
+        entry = self.__index.pop(key, None)
+        if entry is None:
+            return
+
+        entry[2] = time.time()
+        self.__index[key] = entry
+        self.__indexDirty = True
+
+    def __evict(self):
+        """ Removes the least recently used keys until the cache is below 90% of its maximum
+        size, so we don't need to evict on every single store. """
+
+        target_size = self.maxSize * 0.9
+        evicted = 0
+        while self.size > target_size and len(self.__index) > 1:
+            key = next(iter(self.__index))
+            self.__remove_entry(key)
+            evicted += 1
+        Logger.debug("Evicted %s least recently used keys from %s", evicted, self)
+
+    def __remove_entry(self, key, remove_file=True):
+        entry = self.__index.pop(key, None)
+        if entry is not None:
+            self.size -= entry[0]
+        self.__removed.add(key)
+        self.__indexDirty = True
+
+        if not remove_file:
+            return
+
         file_name = os.path.join(self.cachePath, key)
-        return os.path.isfile(file_name)
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
+
+    def __reconcile(self):
+        """ Synchronises the index with the files in the cache folder. Files that are not in the
+        index (for instance due to an index that was not stored) are added, keys that have no
+        file are removed.
+
+        """
+
+        Logger.debug("Reconciling index of %s", self)
+        files = set(f for f in os.listdir(self.cachePath)
+                    if not f.startswith(StreamCache.__IndexFile)
+                    and not f.endswith(StreamCache.__TempSuffix))
+
+        for key in [k for k in self.__index.keys() if k not in files]:
+            self.__remove_entry(key, remove_file=False)
+
+        for key in files:
+            if key in self.__index:
+                continue
+
+            file_name = os.path.join(self.cachePath, key)
+            stat = os.stat(file_name)
+            self.__index[key] = [stat.st_size, stat.st_mtime, stat.st_mtime]
+            self.size += stat.st_size
+
+        self.__reconciled = time.time()
+        self.__indexDirty = True
+
+    def __load_index(self):
+        index = self.__read_index()
+        self.__indexTime = self.__get_index_time()
+        if index is None:
+            # No (valid) index was found, so we need to rebuild it from the files.
+            self.__reconcile()
+            return
+
+        self.__index = index
+        self.size = sum(v[0] for v in index.values())
+
+    def __read_index(self):
+        """ Reads the index from disk
+
+        :return: The ordered index or None if none (valid) was found.
+        :rtype: OrderedDict|None
+
+        """
+
+        if not os.path.isfile(self.__indexPath):
+            return None
+
+        try:
+            with io.open(self.__indexPath, mode="rb") as fp:
+                data = json.loads(fp.read().decode())
+            if data.get("version") != StreamCache.__IndexVersion:
+                return None
+
+            self.__reconciled = max(self.__reconciled, data.get("reconciled", 0))
+            return OrderedDict((k[0], k[1:]) for k in data["keys"])
+        except:
+            Logger.error("Error reading the index of %s", self, exc_info=True)
+            return None
+
+    def __get_index_time(self):
+        try:
+            return os.path.getmtime(self.__indexPath)
+        except OSError:
+            return 0
 
     def __str__(self):
         return "Cache store [{0}]".format(self.cachePath)
+
+
+class _IndexedCacheFile(object):
+    def __init__(self, fp, temp_name, file_name, key, cache_store):
+        """ A file object for a temporary file that replaces the actual cache file, and registers
+        its key and size in the cache index, once it is closed. If it is closed due to an
+        exception, the temporary file is discarded and the cached file is kept as is.
+
+        :param io.BufferedRandom fp:        The actual (temporary) file object.
+        :param str temp_name:               The path of the temporary file.
+        :param str file_name:               The path of the cache file.
+        :param str key:                     The cache key.
+        :param StreamCache cache_store:     The store to register in.
+
+        """
+
+        self.__fp = fp
+        self.__tempName = temp_name
+        self.__fileName = file_name
+        self.__key = key
+        self.__cacheStore = cache_store
+
+    def write(self, data):
+        return self.__fp.write(data)
+
+    def close(self):
+        if self.__fp.closed:
+            return
+
+        size = self.__fp.tell()
+        self.__fp.close()
+        FileHelper.replace(self.__tempName, self.__fileName)
+        # noinspection PyProtectedMember
+        self.__cacheStore._register(self.__key, size)
+
+    def discard(self):
+        """ Closes and removes the temporary file without storing it in the cache. """
+
+        if self.__fp.closed:
+            return
+
+        self.__fp.close()
+        try:
+            os.remove(self.__tempName)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+        return False
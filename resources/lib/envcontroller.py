@@ -234,16 +234,18 @@ class EnvController:
         return True
 
     @staticmethod
-    def cache_clean_up(path, cache_time, mask="*.*"):
+    def cache_clean_up(path, cache_time, mask="*.*", exclude=None):
         """Cleans up the XOT cache folder.
 
         Check the cache files create timestamp and compares it with the current datetime extended
         with the amount of seconds as defined in cacheTime.
 
         Expired items are deleted.
-        :param str path:        The cache path to clean.
-        :param int cache_time:  The minimum (in seconds) of files that will be deleted.
-        :param str mask:        The file mask to consider when cleaning the cache.
+        :param str path:                    The cache path to clean.
+        :param int cache_time:              The minimum (in seconds) of files that will be deleted.
+        :param str mask:                    The file mask to consider when cleaning the cache.
+        :param list[str]|None exclude:      Folders that should be skipped (they are cleaned by
+                                            their own logic).
 
         """
 
@@ -263,7 +265,12 @@ class EnvController:
 
             #for item in os.listdir(path):
             current_dir = None
+            excluded = [os.path.normcase(os.path.abspath(e)) for e in exclude or []]
             for root, dirs, files in os.walk(path):
+                # prune the excluded folders so we don't walk them
+                dirs[:] = [d for d in dirs
+                           if os.path.normcase(os.path.abspath(os.path.join(root, d))) not in excluded]
+
                 if current_dir != root:
                     Logger.debug("Cleaning cache folder: %s", root)
                     current_dir = root
@@ -2,25 +2,37 @@
 
 import glob
 import io
+import json
 import os
+import shutil
 
 from resources.lib.logger import Logger
 from resources.lib.pickler import Pickler
 from resources.lib.regexer import Regexer
+from resources.lib.helpers.filehelper import FileHelper
 
 
 class Favourites:
+    StoreName = "favourites.json"
+    StoreVersion = 1
+
     def __init__(self, path):
         """ Initializes a Favourites class that can be use to show, add and delete favourites.
 
+        All favourites are kept in a single store, indexed by channel guid and item guid. The
+        channel name, item name and action url of each favourite are stored in the clear, so
+        favourites can be listed and counted without de-pickling them. Favourites that were
+        stored in the old separate `.xotfav` files are migrated into the store.
+
         :param str path: The path to store the favourites file
 
         """
 
-        self.__filePattern = "%s-%s.xotfav"
         self.__pickler = Pickler()
+        self.__store = None
 
         self.FavouriteFolder = path
+        self.__storePath = os.path.join(path, Favourites.StoreName)
 
     def add(self, channel, item, action_url):
         """ Adds a favourite for a specific channel.
@@ -32,20 +44,20 @@ class Favourites:
         """
 
         Logger.debug("Adding item %s\nfor channel %s\n%s", item, channel, action_url)
-        file_name = self.__filePattern % (channel.guid, item.guid)
-        file_path = os.path.join(self.FavouriteFolder, file_name)
         pickle = self.__pickler.pickle_media_item(item)
 
-        # Just double check for folder existence
-        if not os.path.isdir(self.FavouriteFolder):
-            os.makedirs(self.FavouriteFolder)
-
         # replacing to pickle in the actionUrl to save space
         action_url = self.__remove_pickle(action_url)
 
+        store = self.__get_store()
+        store.setdefault(channel.guid, {})[item.guid] = {
+            "channel": channel.channelName,
+            "name": item.name,
+            "action_url": action_url,
+            "pickle": pickle
+        }
         try:
-            with io.open(file_path, mode='w', encoding='utf-8') as file_handle:
-                file_handle.write("%s\n%s\n%s\n%s" % (channel.channelName, item.name, action_url, pickle))
+            self.__save_store()
         except:
             Logger.error("Error saving favourite", exc_info=True)
             raise
@@ -59,97 +71,242 @@ class Favourites:
 
         """
 
-        path_mask = os.path.join(self.FavouriteFolder, "*-%s.xotfav" % (item.guid, ))
+        Logger.debug("Removing favourites for item: %s", item.guid)
+        changed = False
+        for favourites in self.__get_store().values():
+            if favourites.pop(item.guid, None) is not None:
+                Logger.trace("Removing item %s", item)
+                changed = True
 
-        Logger.debug("Removing favourites for mask: %s", path_mask)
-        for fav in glob.glob(path_mask):
-            Logger.trace("Removing item %s\nFileName: %s", item, fav)
-            os.remove(fav)
+        if changed:
+            self.__save_store()
         return
 
     def list(self, channel=None):
         """ Lists favourites. If a channel was specified it will limit them to that.
 
+        Only the favourites of the channel are selected from the store. Their MediaItems are
+        only de-pickled (and validated) once they are iterated for rendering.
+
         :param channel: The channel to limit the favourites to.
 
-        :return: A list of tupples (action_url, pickle)
-        :rtype: list
+        :return: The favourites as MediaItems with their actionUrl set.
+        :rtype: FavouriteList
 
         """
 
-        favs = []
-
+        store = self.__get_store()
         if channel:
-            path_mask = os.path.join(self.FavouriteFolder, "%s-*.xotfav" % (channel.guid,))
+            channels = [(channel.guid, store.get(channel.guid, {}))]
         else:
-            path_mask = os.path.join(self.FavouriteFolder, "*.xotfav")
+            channels = list(store.items())
+
+        entries = [
+            (channel_guid, item_guid, favourite)
+            for channel_guid, favourites in channels
+            for item_guid, favourite in favourites.items()
+        ]
+        Logger.debug("Found %s favourites", len(entries))
+        return FavouriteList(self, entries, show_channel=channel is None)
+
+    def count_per_channel(self):
+        """ Counts the favourites per channel, without reading the favourites.
+
+        :return: The number of favourites per channel guid.
+        :rtype: dict[str,int]
+
+        """
+
+        return dict(
+            (channel_guid, len(favourites))
+            for channel_guid, favourites in self.__get_store().items() if favourites
+        )
+
+    def load(self, channel_guid, item_guid, favourite, show_channel):
+        """ De-pickles and validates a single favourite. Invalid favourites are removed from the
+        store.
 
-        Logger.debug("Fetching favourites for mask: %s", path_mask)
-        for fav in glob.glob(path_mask):
-            Logger.trace("Fetching %s", fav)
+        :param str channel_guid:            The guid of the channel.
+        :param str item_guid:               The guid of the item.
+        :param dict[str,str] favourite:     The stored favourite.
+        :param bool show_channel:           Add the channel name to the name of the item.
 
+        :return: The MediaItem of the favourite or None if it was invalid.
+        :rtype: MediaItem|None
+
+        """
+
+        channel_name = favourite.get("channel")
+        name = favourite.get("name")
+        action_url = favourite.get("action_url")
+        pickle = favourite.get("pickle")
+
+        if not channel_name or not name or not action_url or not pickle:
+            Logger.error("Corrupt Favourite, removing it:\n"
+                         "Channel: %s\n"
+                         "Item: %s\n"
+                         "ActionUrl: %s\n"
+                         "Pickle: %s",
+                         channel_name, name, action_url, pickle)
+
+            # Remove the invalid favourite
+            self.__remove_entry(channel_guid, item_guid)
+            return None
+
+        if "pickle=" in action_url and "pickle=%s" not in action_url:
+            # see issue https://github.com/retrospect-addon/plugin.video.retrospect/issues/1037
+            Logger.debug("Found favourite with full pickle, removing the pickle as we should use the one from the file.")
+            action_url = self.__remove_pickle(action_url)
+
+        Logger.debug("Found favourite: %s", name)
+        try:
+            item = self.__pickler.de_pickle_media_item(pickle)
+        except Exception:
+            Logger.error("Cannot depickle item.", exc_info=True)
+            # Let's not remove them for now. Just ignore.
+            return None
+
+        validation_error = self.__pickler.validate(item, logger=Logger.instance())
+        if validation_error:
+            Logger.error("Invalid Pickled Item: %s\nRemoving favourite: %s", validation_error, name)
+
+            # Remove the invalid favourite
+            self.__remove_entry(channel_guid, item_guid)
+            return None
+
+        # clean up the .: from titles
+        if ".:" in item.name and ":." in item.name:
+            item.name = item.name.strip(".:\0\b ")
+
+        # add the channel name
+        if show_channel:
+            item.name = "%s [%s]" % (item.name, channel_name)
+
+        item.clear_date()
+
+        item.actionUrl = action_url % (pickle,)
+        return item
+
+    def __remove_entry(self, channel_guid, item_guid):
+        self.__get_store().get(channel_guid, {}).pop(item_guid, None)
+        self.__save_store()
+
+    def __get_store(self):
+        """ Reads the favourites store (once) and migrates the old `.xotfav` favourites.
+
+        :return: The favourites per channel guid and item guid.
+        :rtype: dict[str,dict[str,dict[str,str]]]
+
+        """
+
+        if self.__store is not None:
+            return self.__store
+
+        self.__store = {}
+        if os.path.isfile(self.__storePath):
             try:
+                with io.open(self.__storePath, mode="rb") as fp:
+                    self.__store = json.loads(fp.read().decode("utf-8"))["channels"]
+            except:
+                Logger.error("Error reading favourites from %s. Resetting all favourites.",
+                             self.__storePath, exc_info=True)
+                backup = self.__storePath.replace(".json", ".error.json")
+                Logger.warning("Creating backup of favourites file: %s", backup)
+                shutil.copy(self.__storePath, backup)
+                os.remove(self.__storePath)
+                self.__store = {}
+
+        self.__migrate()
+        return self.__store
+
+    def __save_store(self):
+        # Just double check for folder existence
+        if not os.path.isdir(self.FavouriteFolder):
+            os.makedirs(self.FavouriteFolder)
+
+        content = json.dumps({"version": Favourites.StoreVersion, "channels": self.__store})
+        FileHelper.write_atomic(self.__storePath, content.encode("utf-8"))
+
+    def __migrate(self):
+        """ Moves the favourites from the old separate `.xotfav` files into the store. """
+
+        path_mask = os.path.join(self.FavouriteFolder, "*.xotfav")
+        favourite_files = glob.glob(path_mask)
+        if not favourite_files:
+            return
+
+        Logger.info("Migrating %s favourites to %s", len(favourite_files), self.__storePath)
+        migrated = []
+        for fav in favourite_files:
+            try:
+                # the file names are <channel guid>-<item guid>.xotfav and an item guid has no '-'
+                channel_guid, item_guid = os.path.splitext(os.path.basename(fav))[0].rsplit("-", 1)
                 with io.open(fav, mode='r', encoding='utf-8') as file_handle:
                     channel_name = file_handle.readline().rstrip()
                     name = file_handle.readline().rstrip()
                     action_url = file_handle.readline().rstrip()
-                    if "pickle=" in action_url and "pickle=%s" not in action_url:
-                        # see issue https://github.com/retrospect-addon/plugin.video.retrospect/issues/1037
-                        Logger.debug("Found favourite with full pickle, removing the pickle as we should use the one from the file.")
-                        action_url = self.__remove_pickle(action_url)
-
                     pickle = file_handle.readline()
             except:
-                Logger.error("Error fetching favourite", exc_info=True)
-                raise
-
-            if channel_name == "" or name == "" or action_url == "" or pickle == "":
-                Logger.error("Apparently the file had too few lines, corrupt Favourite, removing it:\n"
-                             "Pickle: %s\n"
-                             "Channel: %s\n"
-                             "Item: %s\n"
-                             "ActionUrl: %s\n"
-                             "Pickle: %s",
-                             fav, channel_name, name, action_url, pickle)
-
-                # Remove the invalid favourite
-                os.remove(fav)
+                Logger.error("Error migrating favourite %s", fav, exc_info=True)
                 continue
 
-            Logger.debug("Found favourite: %s", name)
-            try:
-                item = self.__pickler.de_pickle_media_item(pickle)
-            except Exception:
-                Logger.error("Cannot depickle item.", exc_info=True)
-                # Let's not remove them for now. Just ignore.
-                # os.remove(fav)
-                continue
+            # corrupt favourites are migrated as well, they are removed once they are listed
+            self.__store.setdefault(channel_guid, {})[item_guid] = {
+                "channel": channel_name,
+                "name": name,
+                "action_url": action_url,
+                "pickle": pickle
+            }
+            migrated.append(fav)
+
+        if not migrated:
+            return
+
+        # only remove the files once they are safely stored
+        self.__save_store()
+        for fav in migrated:
+            os.remove(fav)
 
-            validation_error = self.__pickler.validate(item, logger=Logger.instance())
-            if validation_error:
-                Logger.error("Invalid Pickled Item: %s\nRemoving favourite: %s", validation_error, fav)
+    def __remove_pickle(self, action_url):
+        pickle = Regexer.do_regex("pickle=([^&]+)", action_url)
+        if not pickle:
+            return action_url
 
-                # Remove the invalid favourite
-                os.remove(fav)
-                continue
+        return action_url.replace(pickle[0], "%s")
 
-            # clean up the .: from titles
-            if ".:" in item.name and ":." in item.name:
-                item.name = item.name.strip(".:\0\b ")
 
-            # add the channel name
-            if channel is None:
-                item.name = "%s [%s]" % (item.name, channel_name)
+class FavouriteList(object):
+    def __init__(self, favourites, entries, show_channel):
+        """ The listed favourites. The MediaItems are only de-pickled once they are iterated
+        (rendered) or counted for the first time. After that the valid MediaItems are kept, so
+        invalid favourites are never counted.
 
-            item.clear_date()
+        :param Favourites favourites:   The favourites that are listed.
+        :param list[tuple[str,str,dict[str,str]]] entries: The (channel guid, item guid,
+                                                            favourite) entries.
+        :param bool show_channel:       Add the channel name to the names of the items.
 
-            item.actionUrl = action_url % (pickle,)
-            favs.append(item)
-        return favs
+        """
 
-    def __remove_pickle(self, action_url):
-        pickle = Regexer.do_regex("pickle=([^&]+)", action_url)
-        if not pickle:
-            return action_url
+        self.__favourites = favourites
+        self.__entries = entries
+        self.__showChannel = show_channel
+        self.__items = None
 
-        return action_url.replace(pickle[0], "%s")
+    def __len__(self):
+        return len(self.__get_items())
+
+    def __iter__(self):
+        return iter(self.__get_items())
+
+    def __getitem__(self, index):
+        return self.__get_items()[index]
+
+    def __get_items(self):
+        if self.__items is None:
+            self.__items = []
+            for channel_guid, item_guid, favourite in self.__entries:
+                item = self.__favourites.load(channel_guid, item_guid, favourite, self.__showChannel)
+                if item is not None:
+                    self.__items.append(item)
+        return self.__items
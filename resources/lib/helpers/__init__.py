@@ -1,4 +1,4 @@
 # SPDX-License-Identifier: CC-BY-NC-SA-4.0
 __all__ = ["encodinghelper", "htmlentityhelper", "stopwatch", "xmlhelper", "jsonhelper", "htmlhelper",
            "channelimporter", "jsonhelper", "datehelper", "taghelperbase", "languagehelper",
-           "sessionhelper", "logsender", "templatehelper"]
+           "sessionhelper", "logsender", "templatehelper", "filehelper", "threadhelper"]
@@ -2,7 +2,10 @@
 
 import sys
 import os
+import io
+import json
 import datetime
+import hashlib
 import time
 
 from resources.lib.backtothefuture import PY3
@@ -16,6 +19,7 @@ from resources.lib.retroconfig import Config
 from resources.lib.channelinfo import ChannelInfo
 from resources.lib.logger import Logger
 from resources.lib.textures import TextureHandler
+from resources.lib.helpers.filehelper import FileHelper
 from resources.lib.helpers.stopwatch import StopWatch
 from resources.lib.chn_class import Channel
 
@@ -24,6 +28,8 @@ class ChannelIndex(object):
     """ Class that handles the deploying and loading of available channels."""
 
     __channelIndexer = None  # : Property to store the channel indexer in.
+    __INDEX_FILE = "channelindex.json"
+    __INDEX_VERSION = 1
 
     @staticmethod
     def get_register():
@@ -59,6 +65,7 @@ class ChannelIndex(object):
 
         # initialise the collections
         self.__allChannels = []  # list of all available channels, used for deduplications
+        self.__channelSets = None  # the channel sets from the persisted (and valid) channel index
 
         self.validAt = datetime.datetime.now()
         self.id = int(time.time())
@@ -84,7 +91,13 @@ class ChannelIndex(object):
         channel_pack, channel_set = channel_id.rsplit(".", 1)
         channel_set_info_path = os.path.join(channel_path, channel_pack, channel_set, "chn_{}.json".format(channel_set))
 
-        channel_infos = ChannelInfo.from_json(channel_set_info_path)
+        channel_sets = self.__get_indexed_channel_sets(channel_path)
+        json_data = None
+        if channel_sets is not None:
+            json_data = next((data for pack, chn_set, data in channel_sets
+                              if pack == channel_pack and chn_set == channel_set), None)
+
+        channel_infos = ChannelInfo.from_json(channel_set_info_path, json_data)
         if channel_code is None:
             channel_infos = [ci for ci in channel_infos if ci.channelCode is None]
         else:
@@ -98,7 +111,7 @@ class ChannelIndex(object):
             Logger.debug("Found single channel in the channel index: %s.", channel_infos[0])
 
         channel_info = channel_infos[0]
-        if self.__is_channel_set_updated(channel_info):
+        if channel_sets is None and self.__is_channel_set_updated(channel_info):
             Logger.warning("Found updated channel_set: %s.", channel_set_info_path)
 
             # new we should init all channels by loading them all, just to be sure that all is ok
@@ -141,55 +154,54 @@ class ChannelIndex(object):
         country_visibility = {}
 
         channel_path = os.path.join(Config.rootDir, self.__INTERNAL_CHANNEL_PATH)
-        for channel_pack in os.listdir(channel_path):
-            if not channel_pack.startswith("channel."):
-                continue
+        channel_sets = self.__get_indexed_channel_sets(channel_path)
+        index_is_valid = channel_sets is not None
+        if not index_is_valid:
+            channel_sets = self.__scan_channel_sets(channel_path)
+
+        for channel_pack, channel_set, json_data in channel_sets:
+            channel_set_info_path = os.path.join(
+                channel_path, channel_pack, channel_set, "chn_{}.json".format(channel_set))
+            channel_infos = ChannelInfo.from_json(channel_set_info_path, json_data)
+
+            # Check if the channel was updated (only if the index is outdated, otherwise nothing
+            # changed since the last full check).
+            if not index_is_valid and self.__is_channel_set_updated(channel_infos[0]):
+                if not channels_updated:
+                    # this was the first update found (otherwise channelsUpdated was True) show a message:
+                    title = LanguageHelper.get_localized_string(LanguageHelper.InitChannelTitle)
+                    text = LanguageHelper.get_localized_string(LanguageHelper.InitChannelText)
+                    XbmcWrapper.show_notification(title, text, display_time=15000, logger=Logger.instance())
+                channels_updated |= True
+
+                # Initialise the channelset.
+                self.__initialise_channel_set(channel_infos[0])
+
+                # And perform all first actions for the included channels in the set
+                for channel_info in channel_infos:
+                    self.__initialise_channel(channel_info)
 
-            for channel_set in os.listdir(os.path.join(channel_path, channel_pack)):
-                channel_set_path = os.path.join(channel_path, channel_pack, channel_set)
-                if not os.path.isdir(channel_set_path):
+            # Check the channel validity
+            for channel_info in channel_infos:
+                if not self.__channel_is_correct(channel_info):
                     continue
+                self.__allChannels.append(channel_info)
 
-                channel_set_info_path = os.path.join(channel_set_path, "chn_{}.json".format(channel_set))
-                channel_infos = ChannelInfo.from_json(channel_set_info_path)
-
-                # Check if the channel was updated
-                if self.__is_channel_set_updated(channel_infos[0]):
-                    if not channels_updated:
-                        # this was the first update found (otherwise channelsUpdated was True) show a message:
-                        title = LanguageHelper.get_localized_string(LanguageHelper.InitChannelTitle)
-                        text = LanguageHelper.get_localized_string(LanguageHelper.InitChannelText)
-                        XbmcWrapper.show_notification(title, text, display_time=15000, logger=Logger.instance())
-                    channels_updated |= True
-
-                    # Initialise the channelset.
-                    self.__initialise_channel_set(channel_infos[0])
-
-                    # And perform all first actions for the included channels in the set
-                    for channel_info in channel_infos:
-                        self.__initialise_channel(channel_info)
-
-                # Check the channel validity
-                for channel_info in channel_infos:
-                    if not self.__channel_is_correct(channel_info):
-                        continue
-                    self.__allChannels.append(channel_info)
-
-                    if channel_info.ignore:
-                        Logger.warning("Not loading: %s -> ignored in the channel set", channel_info)
-                        continue
-                    valid_channels.append(channel_info)
+                if channel_info.ignore:
+                    Logger.warning("Not loading: %s -> ignored in the channel set", channel_info)
+                    continue
+                valid_channels.append(channel_info)
 
-                    # was the channel hidden based on language settings? We do some caching to speed
-                    # things up.
-                    if channel_info.language not in country_visibility:
-                        country_visibility[channel_info.language] = AddonSettings.show_channel_with_language(channel_info.language)
-                    channel_info.visible = country_visibility[channel_info.language]
+                # was the channel hidden based on language settings? We do some caching to speed
+                # things up.
+                if channel_info.language not in country_visibility:
+                    country_visibility[channel_info.language] = AddonSettings.show_channel_with_language(channel_info.language)
+                channel_info.visible = country_visibility[channel_info.language]
 
-                    # was the channel explicitly disabled from the settings?
-                    channel_info.enabled = AddonSettings.get_channel_visibility(channel_info)
+                # was the channel explicitly disabled from the settings?
+                channel_info.enabled = AddonSettings.get_channel_visibility(channel_info)
 
-                    Logger.debug("Found channel: %s", channel_info)
+                Logger.debug("Found channel: %s", channel_info)
 
         if channels_updated:
             Logger.info("New or updated channels found. Updating add-on configuration for all channels and user agent.")
@@ -199,6 +211,9 @@ class ChannelIndex(object):
             Logger.debug("No channel changes found. Skipping add-on configuration for channels.")
             # TODO: perhaps we should check that the settings.xml is correct and not broken?
 
+        if not index_is_valid:
+            self.__write_index(self.__get_index_key(channel_path), channel_sets)
+
         valid_channels.sort(key=lambda c: c.sort_key)
         visible_channels = [ci for ci in valid_channels if ci.visible and ci.enabled]
         Logger.info("Fetch a total of %d channels of which %d are visible.",
@@ -228,6 +243,122 @@ class ChannelIndex(object):
         Logger.debug("Found these categories: %s", ", ".join(categories))
         return categories
 
+    def __scan_channel_sets(self, channel_path):
+        """ Scans the channel folder for all channel sets and reads their json meta data.
+
+        :param str channel_path:    The folder with the channel packs.
+
+        :return: A list of (channel pack, channel set, json data) tuples.
+        :rtype: list[tuple[str,str,dict]]
+
+        """
+
+        Logger.debug("Scanning '%s' for channel sets", channel_path)
+        channel_sets = []
+        for channel_pack in os.listdir(channel_path):
+            if not channel_pack.startswith("channel."):
+                continue
+
+            for channel_set in os.listdir(os.path.join(channel_path, channel_pack)):
+                channel_set_path = os.path.join(channel_path, channel_pack, channel_set)
+                if not os.path.isdir(channel_set_path):
+                    continue
+
+                channel_set_info_path = os.path.join(channel_set_path, "chn_{}.json".format(channel_set))
+                with io.open(channel_set_info_path, mode="rb") as json_file:
+                    json_data = json.loads(json_file.read().decode("utf-8"))
+                channel_sets.append((channel_pack, channel_set, json_data))
+
+        return channel_sets
+
+    def __get_index_key(self, channel_path):
+        """ Determines the key for the channel index. It is based on the add-on version and the
+        modification times of the channel packs and their channelpack.json, so it changes once
+        a channel pack is added, removed or updated.
+
+        :param str channel_path:    The folder with the channel packs.
+
+        :return: The key for the channel index.
+        :rtype: str
+
+        """
+
+        parts = [str(Config.version)]
+        for channel_pack in sorted(os.listdir(channel_path)):
+            if not channel_pack.startswith("channel."):
+                continue
+
+            channel_pack_path = os.path.join(channel_path, channel_pack)
+            parts.append("{}:{}".format(channel_pack, os.path.getmtime(channel_pack_path)))
+            channel_pack_info = os.path.join(channel_pack_path, "channelpack.json")
+            if os.path.isfile(channel_pack_info):
+                parts.append(str(os.path.getmtime(channel_pack_info)))
+
+        return hashlib.md5("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def __get_indexed_channel_sets(self, channel_path):
+        """ Returns the channel sets from the persisted channel index, if it is up to date. The
+        index is only read once per ChannelIndex instance.
+
+        :param str channel_path:    The folder with the channel packs.
+
+        :return: A list of (channel pack, channel set, json data) tuples or None if there is no
+                 up to date index.
+        :rtype: list[tuple[str,str,dict]]|None
+
+        """
+
+        if self.__channelSets is None:
+            self.__channelSets = self.__read_index(self.__get_index_key(channel_path))
+        return self.__channelSets
+
+    def __read_index(self, index_key):
+        """ Reads the persisted channel index.
+
+        :param str index_key:   The key the index should have.
+
+        :return: A list of (channel pack, channel set, json data) tuples or None if the index
+                 was not found or is outdated.
+        :rtype: list[tuple[str,str,dict]]|None
+
+        """
+
+        index_path = os.path.join(Config.profileDir, ChannelIndex.__INDEX_FILE)
+        if not os.path.isfile(index_path):
+            Logger.debug("No channel index found at '%s'", index_path)
+            return None
+
+        try:
+            with io.open(index_path, mode="rb") as index_file:
+                index = json.loads(index_file.read().decode("utf-8"))
+        except:
+            Logger.error("Error reading channel index '%s'", index_path, exc_info=True)
+            return None
+
+        if index.get("version") != ChannelIndex.__INDEX_VERSION or index.get("key") != index_key:
+            Logger.info("Channel index at '%s' is outdated", index_path)
+            return None
+
+        return [tuple(channel_set) for channel_set in index["sets"]]
+
+    def __write_index(self, index_key, channel_sets):
+        """ Persists the channel index.
+
+        :param str index_key:                               The key of the index.
+        :param list[tuple[str,str,dict]] channel_sets:      The channel sets to store.
+
+        """
+
+        index_path = os.path.join(Config.profileDir, ChannelIndex.__INDEX_FILE)
+        index = {
+            "version": ChannelIndex.__INDEX_VERSION,
+            "key": index_key,
+            "sets": channel_sets
+        }
+        FileHelper.write_atomic(index_path, json.dumps(index).encode("utf-8"))
+        self.__channelSets = channel_sets
+        Logger.debug("Stored channel index with %s channel sets at '%s'", len(channel_sets), index_path)
+
     def __is_channel_set_updated(self, channel_info):
         """ Checks whether a channel set was updated.
 
@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+import io
+import os
+
+from resources.lib.backtothefuture import PY2
+
+
+class FileHelper(object):
+    """ Class that helps with (atomically) writing files. """
+
+    @staticmethod
+    def replace(source, destination):
+        """ Renames a file and replaces the destination if it already exists.
+
+        :param str source:          The file to rename.
+        :param str destination:     The new name (path) of the file.
+
+        """
+
+        if PY2:
+            # Python 2 has no os.replace and cannot rename over an existing file on all platforms
+            if os.path.isfile(destination):
+                os.remove(destination)
+            os.rename(source, destination)
+        else:
+            os.replace(source, destination)
+
+    @staticmethod
+    def write_atomic(path, content):
+        """ Writes the content to a temporary file and then renames it to the actual path, so
+        the file is never left half-written.
+
+        :param str path:        The path of the file.
+        :param bytes content:   The content to write.
+
+        """
+
+        temp_path = "{0}.tmp".format(path)
+        with io.open(temp_path, mode="wb") as fp:
+            fp.write(content)
+        FileHelper.replace(temp_path, path)
@@ -4,41 +4,219 @@
 import re
 import json
 
-from resources.lib.backtothefuture import unichr
+from resources.lib.backtothefuture import unichr, basestring
 
 
 #noinspection PyShadowingNames
 class JsonHelper(object):
+    __decoder = json.JSONDecoder()
+    __embedded_prefix_chars = " \t\r\n=:"
+    __non_whitespace = re.compile(r"\S")
+    __non_whitespace_bytes = re.compile(br"\S")
+    __paths = {}
+
     def __init__(self, data, logger=None):
         """Creates a class that wraps json.
 
-        :param str|unicode data:    JSON data to parse.
-        :param any logger:      If specified it is used for logging.
+        The data is decoded without making copies of it first: bytes are passed as-is to the
+        JSON decoder and for JSONP data the decoding starts directly after the wrapper, so
+        the data is never stripped or sliced. The JSON text (see `data`) is only created when
+        it is requested.
 
-        """
+        :param str|unicode|bytes data:  JSON data to parse.
+        :param any logger:              If specified it is used for logging.
 
-        if isinstance(data, bytes):
-            data = data.decode('utf-8')
+        """
 
         self.logger = logger
-        self.data = data.strip()
         self.json = dict()
+        self.__data = data
+        self.__text = None
+        self.__start = 0
+        self.__end = None
 
-        if len(self.data) == 0:
+        start = self.__find_non_whitespace(data, 0)
+        if start < 0:
             # no data in, no data out
-            self.json = dict()
+            self.__text = ""
             return
 
-        if self.data[0] not in "[{":
-            # find the actual start in case of a jQuery18303627530449324564_1370950605750({"success":true});
-            if self.logger is not None:
-                self.logger.debug("Removing non-Json wrapper")
-            start = self.data.find("(") + 1
-            end = self.data.rfind(")")
-            self.data = self.data[start:end]
+        if data[start:start + 1] in ("[", "{", b"[", b"{"):
+            # here we are call the json.loads
+            self.json = json.loads(data)
+            return
+
+        # find the actual start in case of a jQuery18303627530449324564_1370950605750({"success":true});
+        if self.logger is not None:
+            self.logger.debug("Removing non-Json wrapper")
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+            self.__data = data
+
+        self.__start = self.__find_non_whitespace(data, data.find("(", start) + 1)
+        self.json, self.__end = JsonHelper.__decoder.raw_decode(data, max(self.__start, 0))
+
+    @property
+    def data(self):
+        """ The JSON text. It is created from the input data when it is requested, or it is
+        generated from the parsed JSON for JSON that was not created from text (such as
+        embedded JSON).
+
+        :rtype: str
+
+        """
+
+        if self.__text is not None:
+            return self.__text
+
+        if self.__data is None:
+            self.__text = JsonHelper.dump(self.json, pretty_print=False)
+            return self.__text
+
+        text = self.__data
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        self.__text = text[self.__start:self.__end].strip()
+        return self.__text
+
+    @staticmethod
+    def compile_path(*args):
+        """ Compiles a path of dictionary keys and list indexes into an accessor function that
+        can be reused for many JSON objects, see `get_value`. Compiled paths are cached, so
+        compiling the same path again returns the same accessor.
+
+        :param str|int args:    The dictionary keys, or list indexes.
+
+        :return: A function that returns the value at the path for a JSON object. It raises a
+                 KeyError (or IndexError) if the path does not exist.
+        :rtype: function
+
+        """
+
+        accessor = JsonHelper.__paths.get(args)
+        if accessor is not None:
+            return accessor
+
+        if len(args) == 0:
+            def accessor(json_object):
+                return json_object
+        elif len(args) == 1:
+            key = args[0]
+
+            def accessor(json_object):
+                return json_object[key]
+        else:
+            def accessor(json_object):
+                for k in args:
+                    json_object = json_object[k]
+                return json_object
+
+        accessor.path = args
+        JsonHelper.__paths[args] = accessor
+        return accessor
+
+    @staticmethod
+    def from_embedded(data, markers, logger=None, last=False):
+        """ Creates a JsonHelper for JSON data that is embedded in other data (such as a state
+        object in an HTML page). See `JsonHelper.extract_embedded`.
+
+        :param str|unicode|bytes data:      The data that contains the JSON.
+        :param str|list[str] markers:       The text(s) that directly precede(s) the JSON.
+        :param any logger:                  If specified it is used for logging.
+        :param bool last:                   Use the last marker in the data instead of the first.
+
+        :return: A JsonHelper with the JSON or None if it was not found.
+        :rtype: JsonHelper|None
+
+        """
+
+        json_object = JsonHelper.extract_embedded(data, markers, last=last)
+        if json_object is None:
+            if logger is not None:
+                logger.warning("No embedded JSON found for %s", markers)
+            return None
+
+        return JsonHelper.from_object(json_object, logger=logger)
+
+    @staticmethod
+    def from_object(json_object, logger=None):
+        """ Creates a JsonHelper for already parsed JSON data.
+
+        :param dict|list json_object:   The parsed JSON data.
+        :param any logger:              If specified it is used for logging.
+
+        :return: A JsonHelper for the data.
+        :rtype: JsonHelper
+
+        """
+
+        helper = JsonHelper("", logger=logger)
+        helper.json = json_object
+        helper.__data = None
+        helper.__text = None
+        return helper
+
+    @staticmethod
+    def extract_embedded(data, markers, last=False, members=False):
+        """ Extracts JSON data that is embedded in other data (such as a state object in an HTML
+        page) and directly follows a marker, for example: `window.__STATE__ = {...};`
+
+        The JSON is decoded directly from the data, starting after the marker (and any
+        whitespace, "=" or ":"), so there is no regex scanning the data and no copy of the JSON
+        text is made. The decoding stops at the end of the JSON value.
+
+        If `members` is set, the marker should be a key (`"key":`) of an object in the data. That
+        key and all the members that follow it, up to the end of the enclosing object, are then
+        decoded into a single object. This does copy the data after the marker once.
+
+        :param str|unicode|bytes data:      The data that contains the JSON.
+        :param str|list[str] markers:       The text(s) that directly precede(s) the JSON. The
+                                            first marker that is found in the data is used.
+        :param bool last:                   Use the last occurrence of any of the markers in the
+                                            data instead (document order, not marker order).
+        :param bool members:                Decode the members of the enclosing object, starting
+                                            at the marker.
+
+        :return: The decoded JSON or None if none of the markers was found.
+        :rtype: dict|list|None
+
+        """
+
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+
+        if isinstance(markers, basestring):
+            markers = [markers]
+
+        start = -1
+        marker_start = -1
+        for marker in markers:
+            if last:
+                position = data.rfind(marker)
+                if position >= 0 and position + len(marker) > start:
+                    start = position + len(marker)
+                    marker_start = position
+                continue
+
+            position = data.find(marker)
+            if position >= 0:
+                start = position + len(marker)
+                marker_start = position
+                break
+
+        if start < 0:
+            return None
+
+        if members:
+            # the closing brace of the enclosing object also closes the opening one we add
+            json_object, _ = JsonHelper.__decoder.raw_decode("{" + data[marker_start:])
+            return json_object
 
-        # here we are call the json.loads
-        self.json = json.loads(self.data)
+        while start < len(data) and data[start] in JsonHelper.__embedded_prefix_chars:
+            start += 1
+
+        json_object, end = JsonHelper.__decoder.raw_decode(data, start)
+        return json_object
 
     @staticmethod
     def convert_special_chars(text, do_quotes=True):
@@ -91,6 +269,24 @@ class JsonHelper(object):
 
         return clean_text
 
+    @staticmethod
+    def __find_non_whitespace(data, start):
+        """ Finds the first non-whitespace character without creating a (stripped) copy.
+
+        :param str|unicode|bytes data:  The data to search.
+        :param int start:               The position to start searching.
+
+        :return: The position of the first non-whitespace character or -1 if there is none.
+        :rtype: int
+
+        """
+
+        if isinstance(data, bytes):
+            match = JsonHelper.__non_whitespace_bytes.search(data, start)
+        else:
+            match = JsonHelper.__non_whitespace.search(data, start)
+        return -1 if match is None else match.start()
+
     @staticmethod
     def __special_chars_handler(match):
         """ Helper method to replace \\uXXXX with unichr(int(hex))
@@ -111,13 +307,28 @@ class JsonHelper(object):
     def get_value(self, *args, **kwargs):
         """ Retrieves data from the JSON object based on the input parameters
 
-        :param str args|int:    The dictionary keys, or list indexes.
+        :param str args|int:    The dictionary keys, or list indexes. Or a single path that was
+                                compiled with `JsonHelper.compile_path`.
         :param any kwargs:      Possible value = fallback and allows the specification of a fallback value.
 
         :return: the selected JSON object
 
         """
 
+        if len(args) == 1 and callable(args[0]):
+            try:
+                return args[0](self.json)
+            except KeyError as e:
+                arg = e.args[0] if e.args else None
+                if "fallback" in kwargs:
+                    if self.logger:
+                        self.logger.debug("Key ['%s'] not found in Json", arg)
+                    return kwargs["fallback"]
+
+                if self.logger:
+                    self.logger.warning("Key ['%s'] not found in Json", arg, exc_info=True)
+                return None
+
         try:
             data = self.json
             for arg in args:
@@ -11,6 +11,7 @@ from resources.lib.urihandler import UriHandler
 from resources.lib.helpers.jsonhelper import JsonHelper
 from resources.lib.helpers.htmlentityhelper import HtmlEntityHelper
 from resources.lib.helpers.encodinghelper import EncodingHelper
+from resources.lib.helpers.threadhelper import ThreadHelper
 
 
 class SubtitleHelper(object):
@@ -36,6 +37,9 @@ class SubtitleHelper(object):
         "</37>": "</font>",
     }
 
+    # The maximum number of concurrent downloads of HLS subtitle segments
+    SegmentWorkers = 4
+
     def __init__(self):
         """Create a class instance. This is not allowed, due to only static
         methods.
@@ -107,8 +111,9 @@ class SubtitleHelper(object):
                 Logger.info("Discovered subtitle format 'webvtt' instead of '%s'", format)
                 format = "webvtt"
 
-            # Actually transform the subtitle
-            srt = SubtitleHelper.__transform(raw, sub_format=format, url=url, proxy=proxy)
+            # Actually transform the subtitle: the converters generate the SRT in parts which are
+            # joined only once.
+            srt = "".join(SubtitleHelper.__transform(raw, sub_format=format, url=url, proxy=proxy))
 
             if replace:
                 Logger.debug("Replacing SRT data: %s", replace)
@@ -136,7 +141,7 @@ class SubtitleHelper(object):
         jsonSubtitle : string - Json Subtitle subtitle format
 
         Returns:
-        SRT formatted subtitle:
+        The parts of the SRT formatted subtitle:
 
         Example:
             {"startMillis":80,"endMillis":4170,"text":"Ett Kanal 5:\nAlla gonblick i \"100 jdare!!!\"?","posX":0.5,"posY":0.9,"colorR":220,"colorG":220,"colorB":220}
@@ -154,10 +159,7 @@ class SubtitleHelper(object):
         regex = r'"startMillis":(\d+),"endMillis":(\d+),"text":"(.+?)(?=["] *,)'
         subs = Regexer.do_regex(regex, json_subtitle)
 
-        # Init some stuff
-        srt = ""
         i = 1
-
         for sub in subs:
             try:
                 start = SubtitleHelper.__convert_to_time(sub[0])
@@ -166,12 +168,13 @@ class SubtitleHelper(object):
                 text = sub[2].replace('\"', '"')
                 text = JsonHelper.convert_special_chars(text)
                 text = HtmlEntityHelper.convert_html_entities(text)
-                srt = "%s\n%s\n%s --> %s\n%s\n" % (srt, i, start, end, text.strip())
-                i += 1
+                cue = "\n%s\n%s --> %s\n%s\n" % (i, start, end, text.strip())
             except:
                 Logger.error("Error parsing subtitle: %s", sub, exc_info=True)
+                continue
 
-        return srt
+            yield cue
+            i += 1
 
     @staticmethod
     def __convert_dc_subtitle_to_srt(dc_subtitle):
@@ -181,7 +184,7 @@ class SubtitleHelper(object):
         dcSubtitle : string - DC Subtitle subtitle format
 
         Returns:
-        SRT formatted subtitle:
+        The parts of the SRT formatted subtitle:
 
         Example:
             <Subtitle SpotNumber="1" TimeIn="00:00:01:220" TimeOut="00:00:04:001" FadeUpTime="20" FadeDownTime="20">
@@ -215,9 +218,8 @@ class SubtitleHelper(object):
         parse_regex = parse_regex.replace('"', '["\']')
         subs = Regexer.do_regex(parse_regex, dc_subtitle)
 
-        srt = ""
         i = 1
-        text = ""
+        text = []
         start = ""
         end = ""
 
@@ -228,17 +230,16 @@ class SubtitleHelper(object):
                     # new start of a sub
                     if text and start and end:
                         # if we have a complete old one, save it
-                        text = HtmlEntityHelper.convert_html_entities(text)
-                        srt = "%s\n%s\n%s --> %s\n%s\n" % (srt, i, start, end, text.strip())
+                        cue = HtmlEntityHelper.convert_html_entities("\n".join(text))
+                        yield "\n%s\n%s --> %s\n%s\n" % (i, start, end, cue.strip())
                         i += 1
                     start = "%s,%03d" % (sub[1], int(sub[2]))
                     end = "%s,%03d" % (sub[3], int(sub[4]))
-                    text = ""
+                    text = []
                 else:
-                    text = "%s\n%s" % (text, sub[5].replace("<br />", "\n"))
+                    text.append(sub[5].replace("<br />", "\n"))
             except:
                 Logger.error("Error parsing subtitle: %s", sub, exc_info=True)
-        return srt
 
     @staticmethod
     def __convert_web_vtt_to_srt(webvvt):
@@ -248,7 +249,7 @@ class SubtitleHelper(object):
         ttml : string - TTML (Timed Text Markup Language) subtitle format
 
         Returns:
-        SRT formatted subtitle:
+        The parts of the SRT formatted subtitle:
 
         Example:
             1
@@ -257,9 +258,27 @@ class SubtitleHelper(object):
 
         """
 
+        cues = SubtitleHelper.__get_web_vtt_cues(webvvt.split("\n"))
+        return SubtitleHelper.__format_web_vtt_cues(cues)
+
+    @staticmethod
+    def __get_web_vtt_cues(lines):
+        """ Parses the lines of a WebVTT subtitle into cues.
+
+        Text lines before the first cue (like NOTE or STYLE blocks) are not part of a cue and
+        are ignored.
+
+        :param iterable[str] lines: The lines of the WebVTT subtitle.
+
+        :return: The cues as (timing, text lines) tuples, with the timing in SRT format.
+        :rtype: iterable[tuple[str,list[str]]]
+
+        """
+
         count = 0
-        result = ""
-        for line in webvvt.split("\n"):
+        timing = None
+        text = []
+        for line in lines:
             line = line.strip()
             if line.endswith("WEBVTT") or line.startswith("X-TIMESTAMP"):
                 continue
@@ -267,20 +286,40 @@ class SubtitleHelper(object):
                 continue
 
             if " --> " in line:
+                if timing is not None:
+                    yield timing, text
+
                 count += 1
                 start, end = line.split(" --> ")
-                result = "%s\n\n%s" % (result, count)
                 if start.count(":") == 1:
-                    result = "%s\n00:%s --> 00:%s" % (result, start.replace(".", ","), end.replace(".", ","))
+                    timing = "00:%s --> 00:%s" % (start.replace(".", ","), end.replace(".", ","))
                 else:
-                    result = "%s\n%s --> %s" % (result, start.replace(".", ","), end.replace(".", ","))
+                    timing = "%s --> %s" % (start.replace(".", ","), end.replace(".", ","))
+                text = []
             elif line == str(count + 1):
                 # we apparently have built-in numbering using WebVTT cue-numbering
                 continue
-            else:
-                result = "%s\n%s" % (result, HtmlEntityHelper.convert_html_entities(line))
+            elif timing is not None:
+                text.append(line)
 
-        return result
+        if timing is not None:
+            yield timing, text
+
+    @staticmethod
+    def __format_web_vtt_cues(cues):
+        """ Formats WebVTT cues as SRT.
+
+        :param iterable[tuple[str,list[str]]] cues: The (timing, text lines) cues.
+
+        :return: The parts of the SRT subtitle.
+        :rtype: iterable[str]
+
+        """
+
+        for count, (timing, text) in enumerate(cues, 1):
+            yield "\n\n%s\n%s" % (count, timing)
+            for line in text:
+                yield "\n%s" % (HtmlEntityHelper.convert_html_entities(line),)
 
     @staticmethod
     def __convert_ttml_to_srt(ttml):
@@ -290,7 +329,7 @@ class SubtitleHelper(object):
         ttml : string - TTML (Timed Text Markup Language) subtitle format
 
         Returns:
-        SRT formatted subtitle:
+        The parts of the SRT formatted subtitle:
 
         Example:
             1
@@ -302,9 +341,7 @@ class SubtitleHelper(object):
         pars_regex = r'<p[^>]+begin="([^"]+)\.(\d+)"[^>]+end="([^"]+)\.(\d+)"[^>]*>([\w\W]+?)</p>'
         subs = Regexer.do_regex(pars_regex, ttml)
 
-        srt = ""
         i = 1
-
         for sub in subs:
             try:
                 start = "%s,%03d" % (sub[0], int(sub[1]))
@@ -312,12 +349,13 @@ class SubtitleHelper(object):
                 text = sub[4].replace("<br />", "\n")
                 text = HtmlEntityHelper.convert_html_entities(text)
                 text = text.replace("\r\n", "")
-                srt = "%s\n%s\n%s --> %s\n%s\n" % (srt, i, start, end, text.strip())
-                i += 1
+                cue = "\n%s\n%s --> %s\n%s\n" % (i, start, end, text.strip())
             except:
                 Logger.error("Error parsing subtitle: %s", sub[1], exc_info=True)
+                continue
 
-        return srt
+            yield cue
+            i += 1
 
     @staticmethod
     def __convert_sami_to_srt(sami):
@@ -327,7 +365,7 @@ class SubtitleHelper(object):
         sami : string - SAMI subtitle format
 
         Returns:
-        SRT formatted subtitle:
+        The parts of the SRT formatted subtitle:
 
         Example:
             1
@@ -342,67 +380,97 @@ class SubtitleHelper(object):
             pars_regex2 = r'<sync start=(\d+)>\W+<p[^>]+>([^\n]+)\W+<sync start=(\d+)>'
             subs = Regexer.do_regex(pars_regex2, sami)
 
-        srt = ""
         i = 1
-
         for sub in subs:
             try:
                 start = SubtitleHelper.__convert_to_time(sub[0])
                 end = SubtitleHelper.__convert_to_time(sub[2])
                 text = sub[1]
                 text = HtmlEntityHelper.convert_html_entities(text)
-                srt = "%s\n%s\n%s --> %s\n%s\n" % (srt, i, start, end, text)
-                i += 1
+                cue = "\n%s\n%s --> %s\n%s\n" % (i, start, end, text)
             except:
                 Logger.error("Error parsing subtitle: %s", sub[1], exc_info=True)
+                continue
 
-        # re-encode to be able to write it
-        return srt
+            yield cue
+            i += 1
 
     @staticmethod
     def __convert_m3u8_srt_to_subtitle_to_srt(raw, url, proxy):
-        # Find the VTT line in the subtitle
-        lines = raw.split("\n")
-        sub_url = None
-        for line in lines:
-            if ".vtt" in line:
-                sub_url = line
-                break
+        """ Converts a HLS subtitle playlist into SRT format. All the WebVTT segments of the
+        playlist are downloaded concurrently and their cues are combined in a single SRT
+        subtitle. Cues that span multiple segments are repeated in each of those segments, so
+        a cue that is the same as the previous one is skipped.
 
-        if not sub_url:
-            return ""
+        :param str raw:         The HLS subtitle playlist.
+        :param str url:         The URL of the playlist.
+        :param Proxy proxy:     If specified, a proxy will be used
+
+        :return: The parts of the SRT subtitle.
+        :rtype: iterable[str]
+
+        """
+
+        # Find the VTT segments in the playlist
+        sub_urls = []
+        for line in raw.split("\n"):
+            line = line.strip()
+            if ".vtt" not in line or line.startswith("#"):
+                continue
+
+            if not line.startswith("http"):
+                line = "%s/%s" % (url.rsplit("/", 1)[0], line)
+            sub_urls.append(line)
+
+        if not sub_urls:
+            return []
+
+        Logger.debug("Downloading %s WebVTT segments", len(sub_urls))
+        segments = ThreadHelper.map(
+            lambda sub_url: SubtitleHelper.__download_segment(sub_url, proxy), sub_urls,
+            max_workers=SubtitleHelper.SegmentWorkers, name="SubtitleSegment")
+
+        return SubtitleHelper.__format_web_vtt_cues(SubtitleHelper.__get_unique_cues(
+            cue for segment in segments for cue in SubtitleHelper.__get_web_vtt_cues(segment.split("\n"))))
+
+    @staticmethod
+    def __download_segment(url, proxy):
+        """ Downloads a WebVTT segment of a HLS subtitle playlist.
+
+        :param str url:         The URL of the segment.
+        :param Proxy proxy:     If specified, a proxy will be used
 
-        if not sub_url.startswith("http"):
-            sub_url = "%s/%s" % (url.rsplit("/", 1)[0], sub_url)
+        :return: The content of the segment.
+        :rtype: str
 
-        # Now we know the subtitle, it would be wise to just use the existing converters to just
-        # convert the data, but now now
-        result = ""
-        m3u8_sub = UriHandler.open(sub_url, proxy=proxy)
+        """
 
-        if isinstance(m3u8_sub, bytes):
+        segment = UriHandler.open(url, proxy=proxy)
+        if isinstance(segment, bytes):
             # Decode the data as it should be str
             try:
-                m3u8_sub = m3u8_sub.decode()
+                segment = segment.decode()
             except:
                 Logger.warning("Converting input to UTF-8 using 'unicode_escape'")
-                m3u8_sub = m3u8_sub.decode('unicode_escape')
+                segment = segment.decode('unicode_escape')
+        return segment
 
-        for line in m3u8_sub.split("\n"):
-            line = line.strip()
-            if line.endswith("WEBVTT") or line.startswith("X-TIMESTAMP"):
-                continue
+    @staticmethod
+    def __get_unique_cues(cues):
+        """ Skips cues that are the same as their previous cue.
 
-            if " --> " in line:
-                start, end = line.split(" --> ")
-                if start.count(":") == 1:
-                    result = "%s\n00:%s --> 00:%s" % (result, start.replace(".", ","), end.replace(".", ","))
-                else:
-                    result = "%s\n%s --> %s" % (result, start.replace(".", ","), end.replace(".", ","))
-            else:
-                result = "%s\n%s" % (result, line)
+        :param iterable[tuple[str,list[str]]] cues: The (timing, text lines) cues.
 
-        return result
+        :return: The cues without the repeated ones.
+        :rtype: iterable[tuple[str,list[str]]]
+
+        """
+
+        previous = None
+        for cue in cues:
+            if cue != previous:
+                yield cue
+            previous = cue
 
     @staticmethod
     def __convert_to_time(timestamp):
@@ -429,6 +497,9 @@ class SubtitleHelper(object):
         @param str sub_format:  Defines the source format. Defaults to Sami.
         @param Proxy proxy:     If specified, a proxy will be used
 
+        @return: The parts of the SRT subtitle.
+        @rtype: iterable[str]
+
         """
 
         Logger.debug("Converting subtitle from '%s' to 'srt' (%s)", sub_format, url)
@@ -436,7 +507,7 @@ class SubtitleHelper(object):
         if sub_format.lower() == 'sami':
             srt = SubtitleHelper.__convert_sami_to_srt(raw)
         elif sub_format.lower() == 'srt':
-            srt = raw
+            srt = [raw]
         elif sub_format.lower() == 'webvtt':
             srt = SubtitleHelper.__convert_web_vtt_to_srt(
                 raw)  # With Krypton and Leia VTT is supported natively
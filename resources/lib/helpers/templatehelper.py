@@ -2,14 +2,23 @@
 
 import re
 import io
-from xml.etree import ElementTree
 
 
 class TemplateHelper(object):
+    __categoryRegex = re.compile(r'<category\b[^>]*?\sid="([^"]*)"')
+    __settingRegex = re.compile(r'^\s*<setting\b')
+    __idRegex = re.compile(r'\sid="([^"]*)"')
+    __visibleRegex = re.compile(r'\svisible="([^"]*)"')
+    __relativeRegex = re.compile("(%([^%]+)%)")
+
     def __init__(self, logger, template_path=None, template=None):
         """ Instantiates a new TemplateHelper class object. This object can walk a Kodi settings.xml
         file and modify it based on a template.
 
+        The template is indexed in a single pass over its lines: the positions of the settings
+        per category and id, and the lines with a templated `visible` attribute that need to be
+        transformed. This only works for SINGLE LINE XML elements!
+
         :param Logger logger:       A `Logger` object used for logging.
         :param str template_path:   Path to a template file.
         :param str template:        Actual template string.
@@ -17,8 +26,10 @@ class TemplateHelper(object):
         """
 
         self.__logger = logger
+        # the positions of the settings per category id and setting id
         self.__settingsIndex = {}
-        self.__relativeRegex = re.compile("(%([^%]+)%)")
+        # the (line number, category id, setting id, occurrence) of the lines to transform
+        self.__templatedLines = []
 
         self.__templateLines = []
         if template_path:
@@ -28,24 +39,7 @@ class TemplateHelper(object):
             with io.StringIO(template) as fp:
                 self.__templateLines = fp.readlines()
 
-        if template_path:
-            self.__template = ElementTree.parse(template_path)
-        else:
-            self.__template = ElementTree.fromstring(template)
-
-        categories = self.__template.findall('.//category')
-        for category in categories:
-            category_settings_index = []
-            category_id = category.attrib["id"]
-            self.__settingsIndex[category_id] = category_settings_index
-
-            settings = category.findall('.//setting')
-            self.__logger.debug("Found %d settings in Category '%s'", len(settings), category_id)
-            for node in settings:
-                setting_id = node.attrib.get("id", ElementTree.tostring(node).strip())
-                node_str = ElementTree.tostring(node).strip()
-                category_settings_index.append(setting_id)
-                self.__logger.trace("%02d: %s - %s", len(category_settings_index), setting_id, node_str)
+        self.__index()
 
     def get_offset(self, category_id, reference_id, setting_id, skip=0):
         """ Determines the offset from one setting to a reference settings.
@@ -61,10 +55,11 @@ class TemplateHelper(object):
 
         """
 
-        if self.__settingsIndex[category_id].count(reference_id) > 1:
+        settings_in_category = self.__settingsIndex[category_id]
+        if len(settings_in_category.get(reference_id, ())) > 1:
             raise ValueError("Multiple reference setting indexes found for %s." % (reference_id,))
 
-        if self.__settingsIndex[category_id].count(setting_id) > 1:
+        if len(settings_in_category.get(setting_id, ())) > 1:
             self.__logger.warning("Multiple values found for %s, using #%s", setting_id, skip)
 
         return self.get_index_of(category_id, reference_id) - self.get_index_of(category_id, setting_id, skip)
@@ -82,26 +77,13 @@ class TemplateHelper(object):
 
         """
 
-        settings_in_category = self.__settingsIndex[category_id]
-        if settings_in_category.count(setting_id) == 1:
-            return settings_in_category.index(setting_id)
-
-        self.__logger.warning("Multiple values found for setting_id %s, using #%s", setting_id, skip)
-        setting_indexes = [s for s in settings_in_category if s == setting_id]
-        # The old way:
-        # setting_indexes = filter(lambda s: s == setting_id, settings_in_category)
-        if not setting_indexes:
+        setting_indexes = self.__settingsIndex[category_id].get(setting_id)
+        if not setting_indexes or skip >= len(setting_indexes):
             raise ValueError("No settings found for %s" % (setting_id,))
 
-        index = 0
-        index_start = 0
-        for i in range(0, skip + 1):
-            # start one after the current index (but then we need to add +1 to the found index)
-            index += settings_in_category[index_start:].index(setting_id)
-            if i > 0:
-                index += 1
-            index_start = index + 1
-        return index
+        if len(setting_indexes) > 1:
+            self.__logger.warning("Multiple values found for setting_id %s, using #%s", setting_id, skip)
+        return setting_indexes[skip]
 
     def transform(self):
         """ Transforms a settings.xml template into an actual settings.xml file.
@@ -112,50 +94,49 @@ class TemplateHelper(object):
         """
 
         # we go through it line by line, because we don't want to modify any order in attributes
-        # or whitespaces. This currently only works for SINGLE LINE XML elements!
-        result = []
-        category = None
-        settings_in_category = []
-        for line in self.__templateLines:
-            # always append the line
-            self.__logger.trace("%s", line.strip())
-            result.append(line)
+        # or whitespaces. Only the lines with a templated visible attribute are changed.
+        result = list(self.__templateLines)
+        for line_number, category, setting_id, occurrence in self.__templatedLines:
+            line = result[line_number]
+            self.__logger.debug("IN:  %s", line.strip())
+            for match in TemplateHelper.__relativeRegex.findall(line):
+                line = line.replace(match[0], str(self.get_offset(category, match[1], setting_id, skip=occurrence)))
+
+            result[line_number] = line
+            self.__logger.debug("OUT: %s", line.strip())
+        return "".join(result)
+
+    def __index(self):
+        """ Indexes the settings per category and finds the lines that need to be transformed. """
 
+        category = None
+        settings_in_category = None
+        position = 0
+        for line_number, line in enumerate(self.__templateLines):
             if "<category" in line:
-                line = line.replace(">", "/>")
-                element = ElementTree.fromstring(line)
                 # we start a new category
-                category = element.attrib["id"]
-                settings_in_category = []
-                continue
-
-            if not line.strip() or "/>" not in line or line.strip().startswith("<!--"):
+                category = TemplateHelper.__categoryRegex.search(line).group(1)
+                settings_in_category = {}
+                self.__settingsIndex[category] = settings_in_category
+                position = 0
                 continue
 
-            element = ElementTree.fromstring(line.encode('utf-8'))
-            element_id = element.attrib.get("id", ElementTree.tostring(element))
-
-            if category is None:
+            if category is None or "/>" not in line or not TemplateHelper.__settingRegex.match(line):
                 # visible only works within categories
                 continue
 
-            # so we found an ID of a setting see if it was a duplicate and add it to the items
-            # that were found. We need this to support duplicate IDs in the settings within a
-            # single category.
-            setting_ids_found_before = settings_in_category.count(element_id)
-            settings_in_category.append(element_id)
+            # settings without an id (like separators) are indexed by their full line
+            setting_id = TemplateHelper.__idRegex.search(line)
+            setting_id = line.strip() if setting_id is None else setting_id.group(1)
 
-            # now see if we need to replace
-            if "visible" not in element.attrib or "%" not in element.attrib.get("visible", ""):
-                # we need a visible attribute with a template
-                continue
+            # We need to support duplicate IDs in the settings within a single category.
+            positions = settings_in_category.setdefault(setting_id, [])
+            positions.append(position)
+            position += 1
 
-            self.__logger.debug("IN:  %s", line.strip())
-            matches = self.__relativeRegex.findall(line)
-            for match in matches:
-                line = line.replace(match[0], str(self.get_offset(category, match[1], element_id, skip=setting_ids_found_before)))
+            visible = TemplateHelper.__visibleRegex.search(line)
+            if visible is not None and "%" in visible.group(1):
+                self.__templatedLines.append((line_number, category, setting_id, len(positions) - 1))
 
-            # replace the line we added at the start
-            result[-1] = line
-            self.__logger.debug("OUT: %s", line.strip())
-        return "".join(result)
+        self.__logger.debug("Indexed %d categories and %d templated settings",
+                            len(self.__settingsIndex), len(self.__templatedLines))
@@ -0,0 +1,122 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+import sys
+import threading
+import traceback
+
+from resources.lib.backtothefuture import PY2
+from resources.lib.logger import Logger
+
+if PY2:
+    # noinspection PyUnresolvedReferences,PyCompatibility
+    from Queue import Queue
+else:
+    # noinspection PyUnresolvedReferences,PyCompatibility
+    from queue import Queue
+
+
+class ThreadHelper(object):
+    """ Class that helps running work on a bounded number of threads. """
+
+    __WorkerDone = object()
+
+    @staticmethod
+    def map(function, iterable, max_workers=4, name="Worker"):
+        """ Calls `function` for all items of `iterable` using at most `max_workers` threads and
+        returns the results in the order of the items. The iterable is consumed lazily, so it
+        can be a generator.
+
+        If any of the calls raised an exception, the first one (in the order of the items) is
+        re-raised once all the calls have finished.
+
+        :param function:            The function to call for each item.
+        :type function:             (any) -> any
+        :param iterable:            The items to process.
+        :param int max_workers:     The maximum number of concurrent threads.
+        :param str name:            The base name for the threads.
+
+        :return: The results in the order of the items.
+        :rtype: list[any]
+
+        """
+
+        results = {}
+        errors = {}
+        work = ThreadHelper.imap_unordered(
+            lambda indexed_item: function(indexed_item[1]), enumerate(iterable),
+            max_workers=max_workers, name=name)
+
+        for (index, _), result, error in work:
+            if error is None:
+                results[index] = result
+            else:
+                errors[index] = error
+
+        if errors:
+            first_error = errors[min(errors.keys())]
+            Logger.error("%s of %s calls failed. First error:\n%s",
+                         len(errors), len(errors) + len(results),
+                         "".join(traceback.format_exception(*first_error)))
+            raise first_error[1]
+
+        return [results[i] for i in range(len(results))]
+
+    @staticmethod
+    def imap_unordered(function, iterable, max_workers=4, name="Worker"):
+        """ Calls `function` for all items of `iterable` using at most `max_workers` threads and
+        yields an (item, result, exc_info) tuple for each item as soon as it is completed. The
+        exc_info is None if the call succeeded.
+
+        The tuples are yielded on the calling thread, so it is safe to update the UI from there.
+        Closing the generator early (for instance by breaking out of the loop) stops the
+        processing of new items and waits for the items that are being processed.
+
+        :param function:            The function to call for each item.
+        :type function:             (any) -> any
+        :param iterable:            The items to process.
+        :param int max_workers:     The maximum number of concurrent threads.
+        :param str name:            The base name for the threads.
+
+        :return: The completed items.
+        :rtype: iterable[tuple[any,any,tuple|None]]
+
+        """
+
+        items = iter(iterable)
+        lock = threading.Lock()
+        stopped = threading.Event()
+        completed = Queue()
+
+        def work():
+            try:
+                while not stopped.is_set():
+                    with lock:
+                        try:
+                            item = next(items)
+                        except StopIteration:
+                            return
+
+                    try:
+                        completed.put((item, function(item), None))
+                    except:
+                        completed.put((item, None, sys.exc_info()))
+            finally:
+                completed.put(ThreadHelper.__WorkerDone)
+
+        threads = [threading.Thread(target=work, name="{0}-{1}".format(name, i))
+                   for i in range(max(1, max_workers))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        running = len(threads)
+        try:
+            while running:
+                entry = completed.get()
+                if entry is ThreadHelper.__WorkerDone:
+                    running -= 1
+                    continue
+                yield entry
+        finally:
+            stopped.set()
+            for thread in threads:
+                thread.join()
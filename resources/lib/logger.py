@@ -3,9 +3,10 @@
 import os
 import io
 import sys
+import threading
 import traceback
 import time
-import datetime
+from collections import deque
 
 from resources.lib.backtothefuture import PY2
 
@@ -45,6 +46,21 @@ class Logger:
 
         return Logger.__logger is not None
 
+    @staticmethod
+    def is_enabled(level):
+        """ Checks whether messages of the given level would be logged. Use it in hot paths to
+        prevent building log messages (or their arguments) that would never be written.
+
+        :param int level:   The log level to check (Logger.LVL_xxx).
+
+        :returns: whether a logger exists and messages of the given level are logged.
+        :rtype: bool
+
+        """
+
+        logger = Logger.__logger
+        return logger is not None and level >= logger.minLogLevel
+
     @staticmethod
     def create_logger(log_file_name, application_name, min_log_level=10,
                       append=False, dual_logger=None):
@@ -109,6 +125,14 @@ class Logger:
             Logger.LVL_TRACE: 'TRACE'
         }
 
+        # Lines are written to the log file by a background writer. For stdout they are written
+        # directly, so they stay in order with other output.
+        self.__writer = None
+        self.__loggerFile = os.path.normcase(__file__)
+        # code object -> source file name (or None for frames that are not the actual caller)
+        self.__callers = {}
+        self.__timestamp = (0, "")
+
         if not append:
             self.clean_up_log()
 
@@ -134,8 +158,12 @@ class Logger:
 
         """
 
+        logger = Logger.__logger
+        if logger.minLogLevel > Logger.LVL_TRACE:
+            return
+
         # noinspection PyArgumentList
-        Logger.__logger.__write(msg, level=Logger.LVL_TRACE, *args, **kwargs)
+        logger.__write(msg, level=Logger.LVL_TRACE, *args, **kwargs)
         return
 
     @staticmethod
@@ -151,8 +179,12 @@ class Logger:
 
         """
 
+        logger = Logger.__logger
+        if logger.minLogLevel > Logger.LVL_DEBUG:
+            return
+
         # noinspection PyArgumentList
-        Logger.__logger.__write(msg, level=Logger.LVL_DEBUG, *args, **kwargs)
+        logger.__write(msg, level=Logger.LVL_DEBUG, *args, **kwargs)
         return
 
     @staticmethod
@@ -226,7 +258,8 @@ class Logger:
     def close_log(self, log_closing=True):
         """ Close the log file.
 
-        Calling close() on a filehandle also closes the FileDescriptor
+        All lines that were queued for the background writer are written before the file is
+        closed. Calling close() on a filehandle also closes the FileDescriptor
 
         :param log_closing:     Are we actually going to close the log file? A log line
                                 is written on closure and the object is disposed of.
@@ -242,6 +275,10 @@ class Logger:
             # self.dualLog("CURRENT LOGGER after: {0}".format(Logger.instance() or "none"))
             # self.dualLog("CLOSING LOGGER: {0}".format(self.id))
 
+        if self.__writer is not None:
+            self.__writer.close()
+            self.__writer = None
+
         self.logHandle.flush()
         if self.logHandle is not sys.stdout:
             self.logHandle.close()
@@ -322,7 +359,7 @@ class Logger:
             (source_file, source_line_number) = self.__find_caller()
 
             # get time information
-            timestamp = datetime.datetime.today().strftime(self.timeFormat)
+            timestamp = self.__get_timestamp()
 
             # check for exception info, if present, add to end of string:
             # noinspection PyArgumentList
@@ -331,37 +368,44 @@ class Logger:
             # now split lines and write everyline into the logfile:
             lines = msg.splitlines()
             line_count = len(lines)
-
-            try:
-                # check if multiline
-                if line_count > 1:
-                    for i in range(0, line_count):
-                        # for line in lines:
-                        line = lines[i]
-                        if len(line) <= 0:
-                            continue
-
-                        # if last line:
-                        if i == line_count - 1:
-                            line = '+ %s' % (line, )
-                        elif i > 0:
-                            line = '| %s' % (line,)
-
-                        formatted_message = self.logFormat % (
-                            timestamp,
-                            self.logLevelNames.get(log_level),
-                            source_file,
-                            source_line_number,
-                            line)
-                        self.logHandle.write(formatted_message)
-                else:
-                    formatted_message = self.logFormat % (
+            level_name = self.logLevelNames.get(log_level)
+
+            # check if multiline
+            if line_count > 1:
+                formatted_lines = []
+                for i in range(0, line_count):
+                    # for line in lines:
+                    line = lines[i]
+                    if len(line) <= 0:
+                        continue
+
+                    # if last line:
+                    if i == line_count - 1:
+                        line = '+ %s' % (line, )
+                    elif i > 0:
+                        line = '| %s' % (line,)
+
+                    formatted_lines.append(self.logFormat % (
                         timestamp,
-                        self.logLevelNames.get(log_level),
+                        level_name,
                         source_file,
                         source_line_number,
-                        msg)
-                    self.logHandle.write(formatted_message)
+                        line))
+                formatted_message = "".join(formatted_lines)
+            else:
+                formatted_message = self.logFormat % (
+                    timestamp,
+                    level_name,
+                    source_file,
+                    source_line_number,
+                    msg)
+
+            if self.__writer is not None:
+                self.__writer.write(formatted_message)
+                return
+
+            try:
+                self.logHandle.write(formatted_message)
             except UnicodeEncodeError:
                 if PY2:
                     formatted_message = formatted_message.encode('raw_unicode_escape')
@@ -393,36 +437,67 @@ class Logger:
         """Find the stack frame of the caller.
 
         Find the stack frame of the caller so that we can note the source
-        file name, line number and function name.
+        file name, line number and function name. The source file name of each
+        code object is only determined once.
 
         :return: the source file and line number of the caller
         :rtype: tuple[str, int]
 
         """
-        return_value = ("Unknown", 0)
 
         # get the current frame and descent down until the correct one is found
         # noinspection PyProtectedMember
         current_frame = sys._getframe(3)  # could be _getframe(#) and (3)
-        while hasattr(current_frame, "f_code"):
+        callers = self.__callers
+        while current_frame is not None:
             co = current_frame.f_code
-            source_file = os.path.normcase(co.co_filename)
-            method_name = co.co_name
-            # if current_frame belongs to this logger.py, equals <string> or equals a private log
-            # method (_log or __Log) continue searching.
-            if source_file == "<string>" \
-                    or source_file in os.path.normcase(__file__) \
-                    or "stopwatch.py" in source_file \
-                    or method_name in ("_Log", "__Log", "_log", "__log"):
+            try:
+                source_file = callers[co]
+            except KeyError:
+                source_file = self.__get_source_file(co)
+                callers[co] = source_file
+
+            if source_file is None:
                 current_frame = current_frame.f_back
                 continue
-            else:
-                # get the source_path and source_file
-                (source_path, source_file) = os.path.split(source_file)
-                return_value = (source_file, current_frame.f_lineno)
-                break
+            return source_file, current_frame.f_lineno
+
+        return "Unknown", 0
+
+    def __get_source_file(self, co):
+        """ Determines the source file name of a code object.
+
+        :param co:  The code object of a frame.
+
+        :return: The file name of the source or None if the code object belongs to this
+                 logger.py, equals <string> or is a private log method (_log or __Log).
+        :rtype: str|None
+
+        """
+
+        source_file = os.path.normcase(co.co_filename)
+        if source_file == "<string>" \
+                or source_file in self.__loggerFile \
+                or "stopwatch.py" in source_file \
+                or co.co_name in ("_Log", "__Log", "_log", "__log"):
+            return None
+
+        return os.path.split(source_file)[1]
+
+    def __get_timestamp(self):
+        """ Returns the formatted time, which is only formatted once per second.
+
+        :return: The formatted current time.
+        :rtype: str
+
+        """
 
-        return return_value
+        now = int(time.time())
+        timestamp = self.__timestamp
+        if timestamp[0] != now:
+            timestamp = (now, time.strftime(self.timeFormat, time.localtime(now)))
+            self.__timestamp = timestamp
+        return timestamp[1]
 
     def __open_log(self):
         """ Opens the log file for appending.
@@ -474,6 +549,8 @@ class Logger:
             else:
                 self.logHandle = io.open(self.logFileName, "w", encoding='utf-8')
 
+        self.__writer = _LogWriter(self.logHandle, self.dualLog)
+        self.__writer.start()
         return
 
     def __process_exc_info(self, msg, **kwargs):
@@ -493,3 +570,87 @@ class Logger:
             msg = "%s\n%s" % (msg, traceback.format_exc())
 
         return msg
+
+
+class _LogWriter(threading.Thread):
+    def __init__(self, log_handle, dual_logger=None):
+        """ A background thread that writes the queued log lines to the log file in batches. It
+        takes all lines that were queued while it was writing and writes them at once.
+
+        :param log_handle:                  The file object to write to.
+        :param function|None dual_logger:   A function that is used to report write errors.
+
+        """
+
+        threading.Thread.__init__(self, name="LogWriter")
+        self.daemon = True
+
+        self.__logHandle = log_handle
+        self.__dualLog = dual_logger
+        # appending to and popping from a deque are thread-safe and much cheaper than a Queue
+        self.__lines = deque()
+        self.__linesQueued = threading.Event()
+        self.__stopped = False
+
+    def write(self, text):
+        """ Queues text for writing.
+
+        :param str text:    The formatted log lines.
+
+        """
+
+        self.__lines.append(text)
+        # the writer clears the event before taking the lines, so no lines are missed.
+        if not self.__linesQueued.is_set():
+            self.__linesQueued.set()
+
+    def close(self):
+        """ Writes all queued lines and stops the thread. """
+
+        self.__stopped = True
+        self.__linesQueued.set()
+        self.join()
+
+    def run(self):
+        while True:
+            self.__linesQueued.wait()
+            self.__linesQueued.clear()
+            stopped = self.__stopped
+
+            lines = []
+            while self.__lines:
+                lines.append(self.__lines.popleft())
+
+            try:
+                self.__write_lines(lines)
+                self.__logHandle.flush()
+            except:
+                if self.__dualLog is None:
+                    traceback.print_exc()
+                else:
+                    self.__dualLog("Retrospect Logger :: Error writing in Logger.py:")
+                    self.__dualLog(traceback.format_exc())
+
+            if stopped:
+                return
+
+    def __write_lines(self, lines):
+        """ Writes the lines in a single write. If that fails due to the encoding, they are
+        written one by one.
+
+        :param list[str] lines:     The lines to write.
+
+        """
+
+        try:
+            self.__logHandle.write("".join(lines))
+            return
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            if not PY2:
+                raise
+
+        for line in lines:
+            try:
+                self.__logHandle.write(line)
+            except UnicodeEncodeError:
+                self.__logHandle.write(line.encode('raw_unicode_escape'))
@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: CC-BY-NC-SA-4.0
 
 import os
+import operator
 from datetime import datetime
 import binascii
 from functools import reduce
@@ -37,7 +38,29 @@ class MediaItem:
 
     LabelTrackNumber = "TrackNumber"
     LabelDuration = "Duration"
-    ExpiresAt = LanguageHelper.get_localized_string(LanguageHelper.ExpiresAt)
+    ExpiresAt = None    # : The localized "Expires at" label, resolved on first use.
+
+    # Listings can contain thousands of items, so the items don't have a __dict__. The containers
+    # and the GUID are only created when they are used. Old-style classes (Python 2) ignore this.
+    __state = ("name", "tv_show_title", "url", "actionUrl", "description", "thumb", "fanart",
+               "icon", "type", "dontGroup", "isLive", "isGeoLocked", "isDrmProtected",
+               "isPaid", "isCloaked", "complete",
+               "__date", "__timestamp", "__expires_datetime", "__infoLabels",
+               "__mediaItemParts", "__items", "__httpHeaders", "__metaData")
+    __slots__ = __state + ("__guid", "__guidValue", "__guidTitle", "__guidUrl")
+
+    # The (mangled) names of the pickled slots, and the names in the pickled state. These are the
+    # names of the __dict__ before the slots were introduced, so the lazily created containers
+    # use their public names.
+    __pickled_slots = tuple("_MediaItem%s" % (s, ) if s.startswith("__") else s for s in __state)
+    __lazy_names = {
+        "_MediaItem__mediaItemParts": "MediaItemParts",
+        "_MediaItem__items": "items",
+        "_MediaItem__httpHeaders": "HttpHeaders",
+        "_MediaItem__metaData": "metaData"
+    }
+    __state_names = tuple(map(__lazy_names.get, __pickled_slots, __pickled_slots))
+    __state_getter = operator.attrgetter(*__pickled_slots)
 
     def __dir__(self):
         """ Required in order for the Pickler().Validate to work! """
@@ -90,7 +113,7 @@ class MediaItem:
         self.tv_show_title = tv_show_title
         self.url = url
         self.actionUrl = None
-        self.MediaItemParts = []
+        self.__mediaItemParts = None              # : see MediaItemParts
         self.description = ""
         self.thumb = ""                           # : The local or remote image for the thumbnail of episode
         self.fanart = ""                          # : The fanart url
@@ -106,24 +129,123 @@ class MediaItem:
         self.isGeoLocked = False                  # : if set to True, the item is GeoLocked to the channels language (o)
         self.isDrmProtected = False               # : if set to True, the item is DRM protected and cannot be played (^)
         self.isPaid = False                       # : if set to True, the item is a Paid item and cannot be played (*)
-        self.__infoLabels = dict()                # : Additional Kodi InfoLabels
+        self.__infoLabels = None                  # : Additional Kodi InfoLabels (created when set)
 
         self.complete = False
-        self.items = []
-        self.HttpHeaders = dict()                 # : http headers for the item data retrieval
+        self.__items = None                       # : see items
+        self.__httpHeaders = None                 # : see HttpHeaders
 
         # Items that are not essential for pickled
         self.isCloaked = False
-        self.metaData = dict()                    # : Additional data that is for internal / routing use only
+        self.__metaData = None                    # : see metaData
 
-        # GUID used for identification of the object. Do not set from script, MD5 needed
-        # to prevent UTF8 issues
-        try:
-            self.guid = "%s%s" % (EncodingHelper.encode_md5(title), EncodingHelper.encode_md5(url or ""))
-        except:
-            Logger.error("Error setting GUID for title:'%s' and url:'%s'. Falling back to UUID", title, url, exc_info=True)
-            self.guid = self.__get_uuid()
-        self.guidValue = int("0x%s" % (self.guid,), 0)
+        # GUID used for identification of the object. It is only calculated when it is used, from
+        # the title and url that were used to create the item.
+        self.__guid = None
+        self.__guidValue = None
+        self.__guidTitle = title
+        self.__guidUrl = url
+
+    @property
+    def MediaItemParts(self):
+        """ The MediaItemParts of this item.
+
+        :rtype: list[MediaItemPart]
+
+        """
+
+        if self.__mediaItemParts is None:
+            self.__mediaItemParts = []
+        return self.__mediaItemParts
+
+    @MediaItemParts.setter
+    def MediaItemParts(self, value):
+        self.__mediaItemParts = value
+
+    @property
+    def items(self):
+        """ The child items of this item.
+
+        :rtype: list[MediaItem]
+
+        """
+
+        if self.__items is None:
+            self.__items = []
+        return self.__items
+
+    @items.setter
+    def items(self, value):
+        self.__items = value
+
+    @property
+    def HttpHeaders(self):
+        """ The http headers for the item data retrieval.
+
+        :rtype: dict[str,str]
+
+        """
+
+        if self.__httpHeaders is None:
+            self.__httpHeaders = dict()
+        return self.__httpHeaders
+
+    @HttpHeaders.setter
+    def HttpHeaders(self, value):
+        self.__httpHeaders = value
+
+    @property
+    def metaData(self):
+        """ Additional data that is for internal / routing use only.
+
+        :rtype: dict[str,any]
+
+        """
+
+        if self.__metaData is None:
+            self.__metaData = dict()
+        return self.__metaData
+
+    @metaData.setter
+    def metaData(self, value):
+        self.__metaData = value
+
+    @property
+    def guid(self):
+        """ GUID used for identification of the object. Do not set from script, MD5 needed
+        to prevent UTF8 issues.
+
+        :rtype: str
+
+        """
+
+        if self.__guid is None:
+            title, url = self.__guidTitle, self.__guidUrl
+            try:
+                self.__guid = "%s%s" % (EncodingHelper.encode_md5(title), EncodingHelper.encode_md5(url or ""))
+            except:
+                Logger.error("Error setting GUID for title:'%s' and url:'%s'. Falling back to UUID", title, url, exc_info=True)
+                self.__guid = self.__get_uuid()
+            self.__guidTitle = self.__guidUrl = None
+        return self.__guid
+
+    @guid.setter
+    def guid(self, value):
+        self.__guid = value
+        self.__guidValue = None
+        self.__guidTitle = self.__guidUrl = None
+
+    @property
+    def guidValue(self):
+        """ The GUID as an integer.
+
+        :rtype: int
+
+        """
+
+        if self.__guidValue is None:
+            self.__guidValue = int("0x%s" % (self.guid,), 0)
+        return self.__guidValue
 
     def append_single_stream(self, url, bitrate=0, subtitle=None):
         """ Appends a single stream to a new MediaPart of this MediaItem.
@@ -198,7 +320,7 @@ class MediaItem:
         :rtype: bool
         """
 
-        return MediaItem.LabelTrackNumber in self.__infoLabels
+        return self.__infoLabels is not None and MediaItem.LabelTrackNumber in self.__infoLabels
 
     def has_date(self):
         """ Returns if a date was set
@@ -234,6 +356,8 @@ class MediaItem:
 
         """
 
+        if self.__infoLabels is None:
+            self.__infoLabels = dict()
         self.__infoLabels[label] = value
 
     def set_season_info(self, season, episode):
@@ -248,6 +372,8 @@ class MediaItem:
             Logger.warning("Cannot set EpisodeInfo without season and episode")
             return
 
+        if self.__infoLabels is None:
+            self.__infoLabels = dict()
         self.__infoLabels["Episode"] = int(episode)
         self.__infoLabels["Season"] = int(season)
         return
@@ -385,7 +511,7 @@ class MediaItem:
             kodi_year = 0
 
         # Get all the info labels starting with the ones set and then add the specific ones
-        info_labels = self.__infoLabels.copy()
+        info_labels = dict(self.__infoLabels or ())
         info_labels["Title"] = name
         if kodi_date:
             info_labels["Date"] = kodi_date
@@ -665,6 +791,8 @@ class MediaItem:
         title = ""
 
         if self.__expires_datetime is not None:
+            if MediaItem.ExpiresAt is None:
+                MediaItem.ExpiresAt = LanguageHelper.get_localized_string(LanguageHelper.ExpiresAt)
             expires = "{}: {}".format(MediaItem.ExpiresAt, self.__expires_datetime.strftime("%Y-%m-%d %H:%M"))
             description_prefix.append(("gold", expires))
 
@@ -749,29 +877,58 @@ class MediaItem:
 
         return name
 
+    def __getstate__(self):
+        """ Returns the state to pickle: the same dictionary (with the same names) as the
+        `__dict__` that was pickled before the slots were introduced. Containers that were never
+        used are left out.
+
+        :return: The state of the item.
+        :rtype: dict[str,any]
+
+        """
+
+        # Python 2 items are old-style and have a __dict__ with all attributes.
+        state = getattr(self, "__dict__", None)
+        if state is not None:
+            state = dict(state)
+            state["guid"] = self.guid
+            return state
+
+        state = dict(zip(MediaItem.__state_names, MediaItem.__state_getter(self)))
+        for name in MediaItem.__lazy_names.values():
+            if state[name] is None:
+                del state[name]
+        state["guid"] = self.guid
+        return state
+
     def __setstate__(self, state):
         """ Sets the current MediaItem's state based on the pickled value. However, it also adds
         newly added class variables so old items won't brake.
 
-        @param state: a default Pickle __dict__
+        @param state: a pickled state (from `__getstate__`, or the __dict__ of an item that was
+                      pickled before the slots were introduced).
         """
 
-        # creating a new MediaItem here should not cause too much performance issues, as not very many
-        # will be depickled.
-
-        m = MediaItem("", "")
-        self.__dict__ = m.__dict__
-        self.__dict__.update(state)
+        # creating a new MediaItem is cheap, as the GUID is not calculated.
+        MediaItem.__init__(self, "", "")
+        for name, value in state.items():
+            if name == "guidValue":
+                # derived from the guid
+                continue
 
-    # We are not using the __getstate__ for now
-    # def __getstate__(self):
-    #     return self.__dict__
+            try:
+                setattr(self, name, value)
+            except AttributeError:
+                # attributes that no longer exist
+                Logger.trace("Ignoring unknown pickled attribute: %s", name)
 
 
 # Don't make this an MediaItem(object) as it breaks the pickles
 class MediaItemPart:
     """Class that represents a MediaItemPart"""
 
+    __slots__ = ("Name", "MediaStreams", "Subtitle", "HttpHeaders", "Properties")
+
     def __init__(self, name, url="", bitrate=0, subtitle=None, *args):
         """ Creates a MediaItemPart with <name> with at least one MediaStream
         instantiated with the values <url> and <bitrate>.
@@ -927,6 +1084,31 @@ class MediaItemPart:
         # if we reach this point they are equal.
         return True
 
+    def __getstate__(self):
+        """ Returns the state to pickle, the same dictionary as the `__dict__` that was pickled
+        before the slots were introduced.
+
+        :return: The state of the part.
+        :rtype: dict[str,any]
+
+        """
+
+        return dict((name, getattr(self, name)) for name in MediaItemPart.__slots__)
+
+    def __setstate__(self, state):
+        """ Sets the state of the part from a pickled state.
+
+        :param dict[str,any] state: The pickled state (or __dict__ of older parts).
+
+        """
+
+        MediaItemPart.__init__(self, "")
+        for name, value in state.items():
+            try:
+                setattr(self, name, value)
+            except AttributeError:
+                Logger.trace("Ignoring unknown pickled attribute: %s", name)
+
     def __str__(self):
         """ String representation for the MediaPart
 
@@ -952,6 +1134,8 @@ class MediaItemPart:
 class MediaStream:
     """Class that represents a Mediastream with <url> and a specific <bitrate>"""
 
+    __slots__ = ("Url", "Bitrate", "Properties", "Adaptive")
+
     def __init__(self, url, bitrate=0, *args):
         """Initialises a new MediaStream
 
@@ -1007,6 +1191,31 @@ class MediaStream:
 
         return self.Url == other.Url
 
+    def __getstate__(self):
+        """ Returns the state to pickle, the same dictionary as the `__dict__` that was pickled
+        before the slots were introduced.
+
+        :return: The state of the stream.
+        :rtype: dict[str,any]
+
+        """
+
+        return dict((name, getattr(self, name)) for name in MediaStream.__slots__)
+
+    def __setstate__(self, state):
+        """ Sets the state of the stream from a pickled state.
+
+        :param dict[str,any] state: The pickled state (or __dict__ of older streams).
+
+        """
+
+        MediaStream.__init__(self, "")
+        for name, value in state.items():
+            try:
+                setattr(self, name, value)
+            except AttributeError:
+                Logger.trace("Ignoring unknown pickled attribute: %s", name)
+
     def __str__(self):
         """ String representation
 
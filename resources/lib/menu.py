@@ -29,6 +29,7 @@ from resources.lib.helpers.languagehelper import LanguageHelper
 from resources.lib.locker import LockWithDialog
 from resources.lib.cloaker import Cloaker
 from resources.lib.xbmcwrapper import XbmcWrapper
+from resources.lib.urihandler import UriHandler
 from resources.lib.actions import keyword
 from resources.lib.actions import action
 
@@ -295,6 +296,10 @@ class Menu(ActionParser):
         if exc_val:
             Logger.critical("Error in menu handling: %s", str(exc_val), exc_info=True)
 
+        # persist changed cookies and cache index, if the menu action used the UriHandler
+        if UriHandler.instance() is not None:
+            UriHandler.flush()
+
         # make sure we leave no references behind
         AddonSettings.clear_cached_addon_settings_object()
         # close the log to prevent locking on next call
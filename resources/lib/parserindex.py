@@ -0,0 +1,216 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import re
+import threading
+
+from resources.lib.parserdata import ParserData
+
+
+class ParserIndex(object):
+    # compiled indexes, shared by all channel instances with the same registrations
+    __indexes = {}
+    __indexLock = threading.Lock()
+
+    # Regexes that can't be combined with other regexes: numbered back references (and
+    # conditional groups) refer to the wrong groups once combined, and global inline flags
+    # (like `(?x)`) are no longer leading, so they would apply to all regexes (or fail).
+    __notCombinable = re.compile(r"\\[1-9]|\(\?P=|\(\?\(|\(\?[aiLmsux]+\)")
+
+    @staticmethod
+    def get_index(data_parsers):
+        """ Returns the compiled index for the registered data parsers. Indexes only depend on
+        the URLs and match types of the parsers, so they are cached and shared between all
+        channel instances (and classes) that registered the same URLs.
+
+        :param dict[str,list[ParserData]] data_parsers: The registered data parsers per URL.
+
+        :return: The compiled index.
+        :rtype: ParserIndex
+
+        """
+
+        signature = tuple(
+            (key, tuple((d.MatchType, d.Match) for d in parsers))
+            for key, parsers in data_parsers.items()
+        )
+
+        index = ParserIndex.__indexes.get(signature)
+        if index is not None:
+            return index
+
+        with ParserIndex.__indexLock:
+            index = ParserIndex.__indexes.get(signature)
+            if index is None:
+                index = ParserIndex(signature)
+                ParserIndex.__indexes[signature] = index
+            return index
+
+    def __init__(self, signature):
+        """ Compiles the registrations of data parsers into lookup structures:
+
+        * a prefix trie (with compressed edges) for the `MatchStart` parsers.
+        * a dictionary for the `MatchExact` parsers.
+        * a single regex alternation for the `MatchRegex` parsers.
+        * a list for the `MatchContains` and `MatchEnd` parsers.
+
+        The keys are ranked just like they were tried before: longest first and in the order
+        of registration for keys of the same length.
+
+        :param tuple signature: The URLs and the (match type, match) of their parsers.
+
+        """
+
+        # sorted() is stable, so keys of equal length keep their registration order.
+        self.keys = [key for key, _ in sorted(signature, key=lambda s: len(s[0]), reverse=True)]
+        ranks = dict((key, rank) for rank, key in enumerate(self.keys))
+
+        self.__trie = {}
+        self.__trieRank = None
+        self.__exact = {}
+        self.__others = []
+        regexes = []
+
+        for key, parsers in signature:
+            rank = ranks[key]
+            for match_type, match in parsers:
+                if match_type == ParserData.MatchStart:
+                    self.__add_prefix(match, rank)
+                elif match_type == ParserData.MatchExact:
+                    self.__exact[match] = min(rank, self.__exact.get(match, rank))
+                elif match_type == ParserData.MatchRegex:
+                    regexes.append((rank, match))
+                else:
+                    self.__others.append((rank, match_type, match))
+
+        self.__others.sort(key=lambda o: o[0])
+        self.__regex, self.__regexRanks, self.__regexes = self.__compile_regexes(sorted(regexes))
+
+    def find(self, url):
+        """ Finds the URL (key) of the registered data parsers that should be used for the URL.
+
+        :param str url: The URL to match.
+
+        :return: The registered URL whose data parsers match, or None if none of them matches.
+        :rtype: str|None
+
+        """
+
+        best = self.__find_prefix(url)
+
+        exact = self.__exact.get(url)
+        if exact is not None and (best is None or exact < best):
+            best = exact
+
+        for rank, match_type, match in self.__others:
+            if best is not None and rank >= best:
+                break
+
+            if match_type == ParserData.MatchEnd:
+                if url.endswith(match):
+                    best = rank
+            elif match in url:
+                best = rank
+
+        regex_rank = self.__find_regex(url)
+        if regex_rank is not None and (best is None or regex_rank < best):
+            best = regex_rank
+
+        if best is None:
+            return None
+        return self.keys[best]
+
+    def __add_prefix(self, prefix, rank):
+        if not prefix:
+            self.__trieRank = min(rank, rank if self.__trieRank is None else self.__trieRank)
+            return
+
+        # each node maps the first character of an edge to [label, rank, child node]
+        node = self.__trie
+        while True:
+            edge = node.get(prefix[0])
+            if edge is None:
+                node[prefix[0]] = [prefix, rank, {}]
+                return
+
+            label = edge[0]
+            common = 0
+            max_common = min(len(label), len(prefix))
+            while common < max_common and label[common] == prefix[common]:
+                common += 1
+
+            if common < len(label):
+                # split the edge at the common part
+                tail = [label[common:], edge[1], edge[2]]
+                edge[0] = label[:common]
+                edge[1] = None
+                edge[2] = {label[common]: tail}
+
+            if common == len(prefix):
+                edge[1] = rank if edge[1] is None else min(edge[1], rank)
+                return
+
+            prefix = prefix[common:]
+            node = edge[2]
+
+    def __find_prefix(self, url):
+        best = self.__trieRank
+        node = self.__trie
+        position = 0
+        length = len(url)
+        while position < length:
+            edge = node.get(url[position])
+            if edge is None or not url.startswith(edge[0], position):
+                break
+
+            rank = edge[1]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+            position += len(edge[0])
+            node = edge[2]
+        return best
+
+    def __find_regex(self, url):
+        if self.__regex is not None:
+            result = self.__regex.match(url)
+            if result is None:
+                return None
+            return self.__regexRanks[result.lastindex]
+
+        for rank, regex in self.__regexes:
+            if regex.match(url) is not None:
+                return rank
+        return None
+
+    def __compile_regexes(self, regexes):
+        """ Compiles the regexes into a single alternation. Each regex is wrapped in its own
+        group, the last closed group of a match then identifies the first matching regex.
+
+        :param list[tuple[int,str]] regexes: The ranked regexes, ordered by rank.
+
+        :return: The alternation and the rank for each of its groups. If the regexes could not
+                 be combined, the individually compiled regexes are returned.
+        :rtype: tuple
+
+        """
+
+        if not regexes:
+            return None, None, []
+
+        flags = re.DOTALL | re.IGNORECASE
+        compiled = [(rank, re.compile(regex, flags)) for rank, regex in regexes]
+        if any(ParserIndex.__notCombinable.search(regex) for _, regex in regexes):
+            return None, None, compiled
+
+        group = 1
+        group_ranks = {}
+        alternatives = []
+        for rank, regex in compiled:
+            group_ranks[group] = rank
+            alternatives.append("({0})".format(regex.pattern))
+            group += regex.groups + 1
+
+        try:
+            return re.compile("|".join(alternatives), flags), group_ranks, compiled
+        except re.error:
+            # for instance duplicate group names
+            return None, None, compiled
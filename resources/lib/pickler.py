@@ -11,10 +11,14 @@ import os
 import io
 import sys
 import base64
+import struct
+import time
+import zlib
 from functools import reduce
 
 from resources.lib.regexer import Regexer
 from resources.lib.logger import Logger
+from resources.lib.helpers.filehelper import FileHelper
 from resources.lib.mediaitem import MediaItem
 
 
@@ -39,15 +43,20 @@ class Pickler:
 
     __store_separator = "--"
 
+    # The indexed store format: a magic marker, the length of the header, the pickled header
+    # with the {guid: (block offset, block length, offset, length)} index and then the blocks
+    # of (lightly) compressed pickled items.
+    __store_magic = b"RPS1"
+    __store_header = struct.Struct(">4sI")
+    __store_block_size = 32
+
     def __init__(self, pickle_store_path=None):
         # store some vars for speed optimization
         self.__pickleContainer = dict()  # : storage for pickled items to prevent duplicate pickling
         self.__pickle_store_path = pickle_store_path
-        self.__compress = True
-        if self.__compress:
-            self.__ext = "store.z"
-        else:
-            self.__ext = "store"
+        self.__ext = "store.i"
+        # Stores written before the indexed format was introduced.
+        self.__legacy_ext = "store.z"
 
     def de_pickle_media_item(self, hex_string):
         """ De-serializes a serialized mediaitem.
@@ -161,11 +170,13 @@ class Pickler:
         import glob
         import time
 
-        pickles_path = os.path.join(
-            self.__pickle_store_path, "pickles", "*", "*", "*.{}".format(self.__ext))
+        pickles_paths = [
+            os.path.join(self.__pickle_store_path, "pickles", "*", "*", "*.{}".format(ext))
+            for ext in (self.__ext, self.__legacy_ext)
+        ]
 
         cache_time = age * 30 * 24 * 60 * 60
-        for filename in glob.glob(pickles_path):
+        for filename in [f for p in pickles_paths for f in glob.glob(p)]:
             create_time = os.path.getctime(filename)
             pickle_store_id = os.path.split(filename)[1].split(".", 1)[0]
             if create_time + cache_time < time.time():
@@ -179,7 +190,7 @@ class Pickler:
         """ Store the MediaItems in the given store path
 
         :param str store_guid:              The guid used for storage
-        :param MediaItem parent:            The parent item
+        :param MediaItem|None parent:       The parent item (None for the main list)
         :param list[MediaItem] children:    The child items
 
         :rtype: str
@@ -202,21 +213,102 @@ class Pickler:
         if not os.path.isdir(pickles_dir):
             os.makedirs(pickles_dir)
 
-        content = {
-            "parent": parent,
-            "children": {item.guid: item for item in children}
-        }
+        # Each item is pickled individually, so a single item can be read without unpickling the
+        # others. Compressing each pickle on its own is slow and hardly compresses, so they are
+        # compressed in small blocks of items.
+        blocks = []
+        offset = 0
+        index = {}
+        # the main list of a channel has no parent item
+        items = children if parent is None else [parent] + children
+        for start in range(0, len(items), Pickler.__store_block_size):
+            block = []
+            block_index = {}
+            position = 0
+            for item in items[start:start + Pickler.__store_block_size]:
+                record = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+                block_index[item.guid] = (position, len(record))
+                block.append(record)
+                position += len(record)
+
+            block = zlib.compress(b"".join(block), zlib.Z_BEST_SPEED)
+            for guid, (position, length) in block_index.items():
+                index[guid] = (offset, len(block), position, length)
+            blocks.append(block)
+            offset += len(block)
+
+        header = pickle.dumps({"parent": None if parent is None else parent.guid,
+                               "url": None if parent is None else parent.url,
+                               "count": len(children),
+                               "items": index},
+                              protocol=pickle.HIGHEST_PROTOCOL)
+        content = [Pickler.__store_header.pack(Pickler.__store_magic, len(header)), header]
+        FileHelper.write_atomic(pickles_path, b"".join(content + blocks))
+        return
 
-        if self.__compress:
-            pickle_content = pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL)
-            import zlib
-            with io.open(pickles_path, 'wb+') as fp:
-                fp.write(zlib.compress(pickle_content, zlib.Z_BEST_COMPRESSION))
-        else:
-            with io.open(pickles_path, "wb+") as fp:
-                pickle.dump(content, fp, protocol=pickle.HIGHEST_PROTOCOL)
+    def retrieve_media_items(self, store_guid, parent_url, max_age):
+        """ Retrieves all the child items that were stored with the given store guid, if they
+        were stored for the same parent url and are not older than `max_age`.
 
-        return
+        :param str store_guid:          The guid used for storage.
+        :param str|None parent_url:     The url of the parent item (None for the main list).
+        :param int max_age:             The maximum age (in seconds) of the stored items.
+
+        :return: The child items in their original order or None if no (fresh) items were found.
+        :rtype: list[MediaItem]|None
+
+        """
+
+        if self.__pickle_store_path is None:
+            return None
+
+        pickles_dir, pickles_path = self.__get_pickle_path(store_guid)
+        try:
+            age = time.time() - os.path.getmtime(pickles_path)
+        except OSError:
+            return None
+
+        if age > max_age:
+            Logger.debug("PickleStore: Items in '%s' are too old (%d seconds)", pickles_path, age)
+            return None
+
+        try:
+            with io.open(pickles_path, 'rb') as fp:
+                magic, header_length = Pickler.__store_header.unpack(
+                    fp.read(Pickler.__store_header.size))
+                if magic != Pickler.__store_magic:
+                    raise ValueError("Invalid PickleStore file")
+
+                header = pickle.loads(fp.read(header_length))
+                # stores without a url were written before the items could be retrieved at once
+                if "url" not in header or header["url"] != parent_url:
+                    Logger.debug("PickleStore: Items in '%s' were stored for another url", pickles_path)
+                    return None
+
+                blocks = fp.read()
+
+            # sort them by their block and position within the block to restore the order
+            records = sorted(
+                (record, guid) for guid, record in header["items"].items() if guid != header["parent"])
+            if len(records) != header["count"]:
+                # items with duplicate guids only have a single record.
+                Logger.debug("PickleStore: Items in '%s' are incomplete", pickles_path)
+                return None
+
+            items = []
+            block = None
+            block_offset = None
+            for (offset, block_length, position, length), _ in records:
+                if offset != block_offset:
+                    block = zlib.decompress(blocks[offset:offset + block_length])
+                    block_offset = offset
+                items.append(pickle.loads(block[position:position + length]))
+        except:
+            Logger.error("Error opening '%s'", pickles_path, exc_info=True)
+            return None
+
+        Logger.debug("PickleStore: Read %d items from '%s'", len(items), pickles_path)
+        return items
 
     def is_pickle_store_id(self, pickle):
         """ Checks if a Pickle string is an actual pickle or a reference to a PickleStore entry
@@ -231,17 +323,50 @@ class Pickler:
     def __retrieve_media_item_from_store(self, storage_location):
         store_guid, item_guid = storage_location.split(Pickler.__store_separator)
         pickles_dir, pickles_path = self.__get_pickle_path(store_guid)
+        if not os.path.isfile(pickles_path):
+            return self.__retrieve_media_item_from_legacy_store(store_guid, item_guid)
+
         Logger.debug("PickleStore: Reading %s from '%s'", item_guid, pickles_path)
 
         try:
-            if self.__compress:
-                import zlib
-                with io.open(pickles_path, 'rb') as fp:
-                    pickle_bytes = zlib.decompress(fp.read())
-                    content = pickle.loads(pickle_bytes)
-            else:
-                with io.open(pickles_path, "rb") as fp:
-                    content = pickle.load(fp)
+            with io.open(pickles_path, 'rb') as fp:
+                magic, header_length = Pickler.__store_header.unpack(
+                    fp.read(Pickler.__store_header.size))
+                if magic != Pickler.__store_magic:
+                    raise ValueError("Invalid PickleStore file")
+
+                index = pickle.loads(fp.read(header_length))
+                record = index["items"].get(item_guid)
+                if record is None:
+                    return None
+
+                offset, block_length, position, length = record
+                fp.seek(Pickler.__store_header.size + header_length + offset)
+                block = zlib.decompress(fp.read(block_length))
+                return pickle.loads(block[position:position + length])
+        except:
+            Logger.error("Error opening '%s'", pickles_path, exc_info=True)
+            return None
+
+    def __retrieve_media_item_from_legacy_store(self, store_guid, item_guid):
+        """ Retrieves an item from a store that was written before the indexed store format. These
+        could still be referenced by Kodi favourites.
+
+        :param str store_guid:  The guid of the store.
+        :param str item_guid:   The guid of the item.
+
+        :return: The item or None.
+        :rtype: MediaItem|None
+
+        """
+
+        pickles_dir, pickles_path = self.__get_pickle_path(store_guid, self.__legacy_ext)
+        Logger.debug("PickleStore: Reading %s from legacy '%s'", item_guid, pickles_path)
+
+        try:
+            with io.open(pickles_path, 'rb') as fp:
+                pickle_bytes = zlib.decompress(fp.read())
+                content = pickle.loads(pickle_bytes)
         except:
             Logger.error("Error opening '%s'", pickles_path, exc_info=True)
             return None
@@ -250,10 +375,10 @@ class Pickler:
         item_pickle = items.get(item_guid)
         return item_pickle
 
-    def __get_pickle_path(self, store_guid):
+    def __get_pickle_path(self, store_guid, ext=None):
         # file storage is always lower case
         store_guid = store_guid.lower()
-        pickles_file = "{}.{}".format(store_guid, self.__ext)
+        pickles_file = "{}.{}".format(store_guid, ext or self.__ext)
 
         pickles_dir = os.path.join(
             self.__pickle_store_path, "pickles", store_guid[0:2], store_guid[2:4])
@@ -71,8 +71,12 @@ class Plugin(ActionParser):
             # check for cache folder
             env_ctrl.cache_check()
 
-            # do some cache cleanup
-            env_ctrl.cache_clean_up(Config.cacheDir, Config.cacheValidTime)
+            # do some cache cleanup, the http cache uses its own index for that.
+            cache_store = UriHandler.instance().cacheStore
+            if cache_store:
+                cache_store.purge(Config.cacheValidTime)
+            env_ctrl.cache_clean_up(Config.cacheDir, Config.cacheValidTime,
+                                    exclude=[cache_store.cachePath] if cache_store else None)
 
             # empty picklestore
             self.pickler.purge_store(Config.addonId)
@@ -85,6 +85,68 @@ class Regexer(object):
             Logger.critical('error regexing', exc_info=True)
             return []
 
+    @staticmethod
+    def iter_regex(regex, data):
+        """ Performs a regular expression and lazily yields the same matches that `do_regex`
+        would return, so callers can process them while the data is still being searched.
+
+        :param list[str|unicode]|str|unicode regex:     The regex to perform on the data.
+        :param str|unicode data:                        The data to perform the regex on.
+
+        :return: A generator of the matches.
+        :rtype: collections.Iterator[str|tuple|dict[str|unicode,str|unicode]]
+
+        """
+
+        try:
+            if not isinstance(regex, (tuple, list)):
+                for result in Regexer.__iter_regex(regex, data):
+                    yield result
+                return
+
+            count = 0
+            for r in regex:
+                found = False
+                for result in Regexer.__iter_regex(r, data):
+                    found = True
+                    if isinstance(result, tuple):
+                        yield (count,) + result
+                    else:
+                        yield count, result
+
+                # just like do_regex: only non-dictionary regexes without results don't count
+                if found or "?P<" in r:
+                    count += 1
+        except:
+            Logger.critical('error regexing', exc_info=True)
+
+    @staticmethod
+    def __iter_regex(regex, data):
+        """ Yields the matches of a single regex in the same format as findall (non-dictionary
+        regexes) or finditer with groupdict (dictionary regexes).
+
+        :param str|unicode regex:   The regex to perform on the data.
+        :param str|unicode data:    The data to perform the regex on.
+
+        :rtype: collections.Iterator[str|tuple|dict[str|unicode,str|unicode]]
+
+        """
+
+        compiled_regex = Regexer.__get_compiled_regex(regex)
+        if "?P<" in regex:
+            for x in compiled_regex.finditer(data):
+                yield x.groupdict()
+        elif compiled_regex.groups == 0:
+            for x in compiled_regex.finditer(data):
+                yield x.group(0)
+        elif compiled_regex.groups == 1:
+            for x in compiled_regex.finditer(data):
+                yield x.group(1) or ""
+        else:
+            # findall uses empty strings for groups that did not participate
+            for x in compiled_regex.finditer(data):
+                yield x.groups("")
+
     @staticmethod
     def __do_regex(regex, data):
         """ does the actual regex for non-dictionary regexes 
@@ -126,10 +188,8 @@ class Regexer(object):
         @return: a compiled regex
         """
 
-        if regex in Regexer.__compiledRegexes:
-            Logger.debug("Re-using cached Compiled Regex object")
-            compiled_regex = Regexer.__compiledRegexes[regex]
-        else:
+        compiled_regex = Regexer.__compiledRegexes.get(regex)
+        if compiled_regex is None:
             Logger.trace("Compiling Regex object and storing in cache")
             compiled_regex = re.compile(regex, re.DOTALL + re.IGNORECASE)
             Regexer.__compiledRegexes[regex] = compiled_regex
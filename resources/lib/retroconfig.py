@@ -1,7 +1,7 @@
 # SPDX-License-Identifier: CC-BY-NC-SA-4.0
 
 import os
-import xml.dom.minidom
+import xml.etree.ElementTree
 
 import xbmc
 import xbmcvfs
@@ -72,13 +72,14 @@ class Config:
 
     # must be single quotes for build script
     __addonXmlPath = os.path.join(rootDir, 'addon.xml')
-    __addonXmlcontents = xml.dom.minidom.parse(__addonXmlPath)
-    for addonentry in __addonXmlcontents.getElementsByTagName("addon"):
-        addonId = str(addonentry.getAttribute("id"))          # : The ID the addon has in Kodi (from addon.xml)
-        __version = addonentry.getAttribute("version")        # : The Version of the addon (from addon.xml) in text
-        version = Version(version=__version)                  # : The Version of the addon (from addon.xml)
-        #noinspection PyRedeclaration
-        appName = str(addonentry.getAttribute("name"))        # : The name from the addon (from addon.xml)
+    # ElementTree (with its C parser) loads much faster than minidom, which matters as the
+    # Config is loaded on every start of the add-on.
+    __addonXmlContents = xml.etree.ElementTree.parse(__addonXmlPath).getroot()
+    addonId = str(__addonXmlContents.get("id"))               # : The ID the addon has in Kodi (from addon.xml)
+    __version = __addonXmlContents.get("version")             # : The Version of the addon (from addon.xml) in text
+    version = Version(version=__version)                      # : The Version of the addon (from addon.xml)
+    #noinspection PyRedeclaration
+    appName = str(__addonXmlContents.get("name"))             # : The name from the addon (from addon.xml)
 
     updateUrl = "https://api.github.com/repos/retrospect-addon/plugin.video.retrospect/releases"
 
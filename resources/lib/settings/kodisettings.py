@@ -1,16 +1,37 @@
 # SPDX-License-Identifier: CC-BY-NC-SA-4.0
 
+import io
+import os
+import xml.etree.ElementTree
+
 import xbmcaddon
 
 from . import settingsstore
 
 
 class KodiSettings(settingsstore.SettingsStore):
-    def __init__(self, logger, addon_id=None):
+    def __init__(self, logger, addon_id=None, profile_dir=None):
+        """ The settings that are stored by Kodi.
+
+        If the profile folder of the add-on is specified, the user's `settings.xml` in there is
+        read at once into a snapshot when the first setting is requested. Settings are then
+        looked up in that snapshot and only settings that are not in there are requested from
+        Kodi (and then added to it). Without it, Kodi is asked for each lookup. As a store is
+        only kept during a single add-on invocation, the snapshot is not older than the
+        invocation.
+
+        :param Logger logger:       A logger instance.
+        :param str addon_id:        The id of the add-on (None for the current one).
+        :param str profile_dir:     The profile folder of the add-on (None to disable the snapshot).
+
+        """
+
         super(KodiSettings, self).__init__(logger)
 
         self.__channel_setting_format = "channel_{0}_{1}"
         self.__addon_settings = xbmcaddon.Addon() if addon_id is None else xbmcaddon.Addon(addon_id)
+        self.__settings_file = os.path.join(profile_dir, "settings.xml") if profile_dir else None
+        self.__snapshot = None
 
     def set_setting(self, setting_id, setting_value, channel=None):
         setting_value = str(setting_value)
@@ -18,11 +39,13 @@ class KodiSettings(settingsstore.SettingsStore):
         if channel:
             channel_setting_id = self.__channel_setting_format.format(channel.guid, setting_id)
             self.__addon_settings.setSetting(channel_setting_id, str(setting_value))
+            self.__update_snapshot(channel_setting_id, setting_value)
             self._logger.trace("Kodi Channel Setting Updated: %s.%s(%s)='%s'",
                                channel.id, setting_id, channel_setting_id,
                                self._get_safe_print_value(setting_id, setting_value))
         else:
             self.__addon_settings.setSetting(setting_id, str(setting_value))
+            self.__update_snapshot(setting_id, setting_value)
             self._logger.trace("Kodi Setting Updated: %s='%s'", setting_id,
                                self._get_safe_print_value(setting_id, setting_value))
 
@@ -45,14 +68,20 @@ class KodiSettings(settingsstore.SettingsStore):
     def get_setting(self, setting_id, channel=None, default=None):
         if channel:
             channel_setting_id = self.__channel_setting_format.format(channel.guid, setting_id)
-            setting_value = self.__addon_settings.getSetting(channel_setting_id)
-            self._logger.trace("Kodi Channel Setting: %s.%s(%s)='%s'",
-                               channel.id, setting_id, channel_setting_id,
-                               self._get_safe_print_value(setting_id, setting_value))
+            setting_value = self.__get_snapshot_value(channel_setting_id)
+            if setting_value is None:
+                setting_value = self.__addon_settings.getSetting(channel_setting_id)
+                self.__update_snapshot(channel_setting_id, setting_value)
+                self._logger.trace("Kodi Channel Setting: %s.%s(%s)='%s'",
+                                   channel.id, setting_id, channel_setting_id,
+                                   self._get_safe_print_value(setting_id, setting_value))
         else:
-            setting_value = self.__addon_settings.getSetting(setting_id)
-            self._logger.trace("Kodi Setting: %s='%s'", setting_id,
-                               self._get_safe_print_value(setting_id, setting_value))
+            setting_value = self.__get_snapshot_value(setting_id)
+            if setting_value is None:
+                setting_value = self.__addon_settings.getSetting(setting_id)
+                self.__update_snapshot(setting_id, setting_value)
+                self._logger.trace("Kodi Setting: %s='%s'", setting_id,
+                                   self._get_safe_print_value(setting_id, setting_value))
 
         return setting_value or default
 
@@ -62,6 +91,48 @@ class KodiSettings(settingsstore.SettingsStore):
     def open_settings(self):
         self.__addon_settings.openSettings()
 
+    def __get_snapshot_value(self, setting_id):
+        """ Returns the value of a setting from the snapshot. The snapshot is created from the
+        user's settings file when it is first needed.
+
+        Kodi 18+ stores the values as text of the <setting> elements, Kodi 17 uses the `value`
+        attribute.
+
+        :param str setting_id:  The id of the setting.
+
+        :return: The value or None if the setting is not in the snapshot.
+        :rtype: str|None
+
+        """
+
+        if self.__snapshot is not None:
+            return self.__snapshot.get(setting_id)
+
+        if not self.__settings_file:
+            return None
+
+        snapshot = {}
+        if os.path.isfile(self.__settings_file):
+            try:
+                with io.open(self.__settings_file, mode="rb") as fp:
+                    root = xml.etree.ElementTree.parse(fp).getroot()
+                for element in root.iter("setting"):
+                    element_id = element.get("id")
+                    if element_id:
+                        snapshot[element_id] = element.get("value", element.text) or ""
+                self._logger.debug("Read %s Kodi settings from: %s", len(snapshot), self.__settings_file)
+            except:
+                # Kodi itself will be asked for each setting
+                self._logger.error("Error reading Kodi settings from: %s", self.__settings_file, exc_info=True)
+                snapshot = {}
+
+        self.__snapshot = snapshot
+        return snapshot.get(setting_id)
+
+    def __update_snapshot(self, setting_id, setting_value):
+        if self.__snapshot is not None:
+            self.__snapshot[setting_id] = setting_value
+
     # this really only works if no reference to the <store> object is kept somewhere.
     def __del__(self):
         if self.__addon_settings is not None:
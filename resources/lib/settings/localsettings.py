@@ -4,17 +4,38 @@ import os
 import io
 import json
 import shutil
+import threading
 
 from . import settingsstore
+from resources.lib.helpers.filehelper import FileHelper
 
 
 class LocalSettings(settingsstore.SettingsStore):
     __settings = None
+    # the settings per channel id, loaded from their own files when they are first needed
+    __channels = {}
+    # the channel ids (or None for the general settings) with changes that were not flushed
+    __dirty = set()
+    __lock = threading.RLock()
 
     __SETTINGS_KEY = "settings"
     __CHANNELS_KEY = "channels"
+    __CHANNELS_FOLDER = "channels"
 
     def __init__(self, addon_data_folder, logger):
+        """ The settings that Retrospect stores itself, in the add-on data folder.
+
+        Changes are kept in memory and are only written once `flush` is called (which happens
+        when the cached settings stores are cleared at the end of each add-on invocation). The
+        general settings are stored in `settings.json` and each channel has its own file in the
+        `channels` folder, so reading the settings of one channel does not involve parsing the
+        settings of all other channels.
+
+        :param str addon_data_folder:   The add-on data folder.
+        :param Logger logger:           A logger instance.
+
+        """
+
         super(LocalSettings, self).__init__(logger)
 
         if not addon_data_folder or not os.path.isdir(addon_data_folder):
@@ -22,6 +43,7 @@ class LocalSettings(settingsstore.SettingsStore):
 
         self.addon_data_folder = addon_data_folder
         self.local_settings_file = os.path.join(self.addon_data_folder, "settings.json")
+        self.channel_settings_folder = os.path.join(self.addon_data_folder, LocalSettings.__CHANNELS_FOLDER)
 
         # load the settings each time. A new instance will use the same __settings object, but
         # each new install will cause a reload of the settings from disk. In theory there should
@@ -29,24 +51,20 @@ class LocalSettings(settingsstore.SettingsStore):
         self.__load_settings()
 
     def set_setting(self, setting_id, setting_value, channel=None):
-        if channel is None:
-            LocalSettings.__settings[LocalSettings.__SETTINGS_KEY][setting_id] = setting_value
-            self._logger.debug("Local Setting Updated: %s: '%s'",
-                               setting_id,
-                               self._get_safe_print_value(setting_id, setting_value))
-        else:
-            if channel.id not in LocalSettings.__settings[LocalSettings.__CHANNELS_KEY]:
-                LocalSettings.__settings[LocalSettings.__CHANNELS_KEY][channel.id] = {}
-
-            LocalSettings.__settings[LocalSettings.__CHANNELS_KEY][channel.id][setting_id] = \
-                setting_value
-
-            self._logger.debug("Local Channel Setting Updated: %s:%s: '%s'",
-                               channel.id, setting_id,
-                               self._get_safe_print_value(setting_id, setting_value))
-
-        # store the file
-        self.__store_settings()
+        with LocalSettings.__lock:
+            if channel is None:
+                LocalSettings.__settings[LocalSettings.__SETTINGS_KEY][setting_id] = setting_value
+                LocalSettings.__dirty.add(None)
+                self._logger.debug("Local Setting Updated: %s: '%s'",
+                                   setting_id,
+                                   self._get_safe_print_value(setting_id, setting_value))
+            else:
+                self.__get_channel_settings(channel.id)[setting_id] = setting_value
+                LocalSettings.__dirty.add(channel.id)
+
+                self._logger.debug("Local Channel Setting Updated: %s:%s: '%s'",
+                                   channel.id, setting_id,
+                                   self._get_safe_print_value(setting_id, setting_value))
         return setting_value
 
     def get_boolean_setting(self, setting_id, channel=None, default=None):
@@ -57,12 +75,12 @@ class LocalSettings(settingsstore.SettingsStore):
 
     def get_setting(self, setting_id, channel=None, default=None):
         if channel is None:
-            setting_value = LocalSettings.__settings["settings"].get(setting_id, default)
+            setting_value = LocalSettings.__settings[LocalSettings.__SETTINGS_KEY].get(setting_id, default)
 
             self._logger.trace("Local Setting: %s='%s'", setting_id,
                                self._get_safe_print_value(setting_id, setting_value))
         else:
-            channel_settings = LocalSettings.__settings["channels"].get(channel.id, {})
+            channel_settings = self.__get_channel_settings(channel.id)
             setting_value = channel_settings.get(setting_id, default)
             self._logger.trace("Local Channel Setting: %s.%s='%s'", channel.id, setting_id,
                                self._get_safe_print_value(setting_id, setting_value))
@@ -76,59 +94,152 @@ class LocalSettings(settingsstore.SettingsStore):
     def get_localized_string(self, string_id):
         raise NotImplementedError()
 
+    def flush(self):
+        """ Writes the changed settings files. Each file is written atomically. """
+
+        with LocalSettings.__lock:
+            if not LocalSettings.__dirty:
+                return
+
+            # the channel files first, so migrated channel settings are stored before they are
+            # removed from the general settings file.
+            for channel_id in LocalSettings.__dirty - {None}:
+                self.__store_settings(self.__get_channel_settings_file(channel_id),
+                                      LocalSettings.__channels[channel_id])
+
+            if None in LocalSettings.__dirty:
+                if LocalSettings.__settings is None or not list(LocalSettings.__settings.keys()):
+                    raise ValueError("Empty settings object cannot save.")
+                self.__store_settings(self.local_settings_file, LocalSettings.__settings)
+
+            self._logger.debug("Flushed %s local settings file(s)", len(LocalSettings.__dirty))
+            LocalSettings.__dirty.clear()
+
     # this really only works if no reference to the <store> object is kept somewhere.
     def __del__(self):
+        # pending changes are written, not discarded
+        try:
+            self.flush()
+        except:
+            self._logger.error("Error flushing the Local settings-store", exc_info=True)
+
         if LocalSettings.__settings is not None:
             del LocalSettings.__settings
             LocalSettings.__settings = None
+        LocalSettings.__channels = {}
+        LocalSettings.__dirty = set()
         self._logger.debug("Removed Local settings-store")
 
     def __str__(self):
         return "LocalSettings store: {0}".format(self.local_settings_file)
 
+    def __get_channel_settings(self, channel_id):
+        """ Returns the settings of a channel, reading them from disk if needed.
+
+        :param str channel_id:  The id of the channel.
+
+        :return: The settings of the channel.
+        :rtype: dict[str,any]
+
+        """
+
+        channel_settings = LocalSettings.__channels.get(channel_id)
+        if channel_settings is not None:
+            return channel_settings
+
+        with LocalSettings.__lock:
+            channel_settings = LocalSettings.__channels.get(channel_id)
+            if channel_settings is None:
+                channel_settings = self.__read_settings(self.__get_channel_settings_file(channel_id)) or {}
+                LocalSettings.__channels[channel_id] = channel_settings
+            return channel_settings
+
+    def __get_channel_settings_file(self, channel_id):
+        return os.path.join(self.channel_settings_folder, "{0}.json".format(channel_id))
+
     def __load_settings(self):
-        if not os.path.isfile(self.local_settings_file):
-            LocalSettings.__settings = self.__empty_settings()
-            self._logger.warning("No local settings file found: %s", self.local_settings_file)
-            return
+        with LocalSettings.__lock:
+            # don't lose changes of a previous instance
+            if LocalSettings.__settings is not None:
+                self.flush()
+            LocalSettings.__channels = {}
+            LocalSettings.__dirty = set()
+
+            settings = self.__read_settings(self.local_settings_file)
+            if settings is None:
+                LocalSettings.__settings = self.__empty_settings()
+                return
+
+            LocalSettings.__settings = settings
+            settings.setdefault(LocalSettings.__SETTINGS_KEY, {})
+            channels = settings.pop(LocalSettings.__CHANNELS_KEY, None)
+            if channels:
+                self.__migrate_channels(channels)
+
+    def __migrate_channels(self, channels):
+        """ Moves the channel settings from the general settings file into their own files. If
+        a channel already has its own file, that one has the most recent settings.
+
+        :param dict[str,dict[str,any]] channels: The settings per channel id.
+
+        """
+
+        self._logger.info("Moving the settings of %s channels to: %s",
+                          len(channels), self.channel_settings_folder)
+        for channel_id, channel_settings in channels.items():
+            if os.path.isfile(self.__get_channel_settings_file(channel_id)):
+                continue
+            LocalSettings.__channels[channel_id] = channel_settings
+            LocalSettings.__dirty.add(channel_id)
+
+        # the general settings file will be stored without the channels.
+        LocalSettings.__dirty.add(None)
+
+    def __read_settings(self, path):
+        """ Reads a settings file.
+
+        :param str path:    The path of the settings file.
+
+        :return: The settings or None if there were no settings.
+        :rtype: dict[str,any]|None
+
+        """
+
+        if not os.path.isfile(path):
+            self._logger.warning("No local settings file found: %s", path)
+            return None
 
         try:
-            with io.open(self.local_settings_file, mode="rb") as fp:
+            with io.open(path, mode="rb") as fp:
                 content = fp.read()
                 if not content:
-                    LocalSettings.__settings = self.__empty_settings()
-                    self._logger.warning("Empty local settings file found: %s", self.local_settings_file)
-                    return
+                    self._logger.warning("Empty local settings file found: %s", path)
+                    return None
 
                 # Print the content might expose secret settings. See self._secure_setting_ids
                 # self._logger.Trace("Loading settings: %s", content)
-                LocalSettings.__settings = json.loads(content, encoding='utf-8')
+                return json.loads(content.decode("utf-8"))
         except:
             self._logger.error("Error loading JSON settings. Resetting all settings.", exc_info=True)
-            LocalSettings.__settings = self.__empty_settings()
-            backup = self.local_settings_file.replace(".json", ".error.json")
+            backup = path.replace(".json", ".error.json")
             self._logger.warning("Creating backup of settings file: %s", backup)
-            shutil.copy(
-                self.local_settings_file,
-                backup
-            )
-            self.__store_settings()
-            return
+            shutil.copy(path, backup)
+            os.remove(path)
+            return None
 
-    def __store_settings(self):
-        if LocalSettings.__settings is None or not list(LocalSettings.__settings.keys()):
-            raise ValueError("Empty settings object cannot save.")
+    def __store_settings(self, path, settings):
+        folder = os.path.dirname(path)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
 
-        # open the file as binary file, as json.dumps will already encode as utf-8 bytes
-        with io.open(self.local_settings_file, mode='w+b') as fp:
-            content = json.dumps(LocalSettings.__settings, indent=4).encode('utf-8')
-            fp.write(content)
+        # compact json, as json.dumps will already encode as utf-8 bytes
+        content = json.dumps(settings, separators=(",", ":")).encode('utf-8')
+        FileHelper.write_atomic(path, content)
 
-            # Print the content might expose secret settings. See self._secure_setting_ids
-            # self._logger.Debug("Storing settings: %s", content)
+        # Print the content might expose secret settings. See self._secure_setting_ids
+        # self._logger.Debug("Storing settings: %s", content)
 
     def __empty_settings(self):
         return {
-            LocalSettings.__SETTINGS_KEY: {},
-            LocalSettings.__CHANNELS_KEY: {}
+            LocalSettings.__SETTINGS_KEY: {}
         }
@@ -88,6 +88,11 @@ class SettingsStore(object):
 
         pass
 
+    def flush(self):
+        """ Persists the changed settings, for stores that do not do that immediately. """
+
+        pass
+
     def _get_safe_print_value(self, setting_id, setting_value):
         """ Makes sure we strip out the sensitive data while logging.
 
@@ -130,7 +130,7 @@ class YouTube(object):
             else:
                 url = "%s&signature=%s" % (video_url, signature)
 
-            Logger.debug("Found stream {}={:01.2f}kbps for {}".format(quality, bitrate, url))
+            Logger.debug("Found stream %s=%01.2fkbps for %s", quality, bitrate, url)
             you_tube_streams.append((url, bitrate))
 
         return you_tube_streams
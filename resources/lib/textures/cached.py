@@ -4,13 +4,20 @@ import hashlib
 import shutil
 import os
 import io
+import traceback
 
 from resources.lib.backtothefuture import PY2
+from resources.lib.helpers.filehelper import FileHelper
 from resources.lib.helpers.jsonhelper import JsonHelper
+from resources.lib.helpers.threadhelper import ThreadHelper
 from resources.lib.textures import TextureHandler
 
 
 class Cached(TextureHandler):
+    # The default number of concurrent downloads and retries per texture
+    MaxWorkers = 8
+    Retries = 2
+
     # we should keep track of which ones we already used in this session, so we can refetch it in a purge situation.
     __retrievedTexturePaths = []
 
@@ -96,11 +103,15 @@ class Cached(TextureHandler):
 
         return len(self.__textureQueue)
 
-    def fetch_textures(self, dialog_call_back=None):
-        """ Fetches all the needed textures
+    def fetch_textures(self, dialog_call_back=None, max_workers=None, retries=None):
+        """ Fetches all the needed textures. The remote textures are fetched concurrently.
 
         :param dialog_call_back:    Callback method with signature
                                      Function(self, retrieved, total, perc, completed, status)
+        :param int max_workers:     The maximum number of concurrent downloads (defaults to
+                                    Cached.MaxWorkers).
+        :param int retries:         The number of retries for a failed texture (defaults to
+                                    Cached.Retries).
 
         :return: the number of bytes fetched
         :rtype: int
@@ -115,16 +126,30 @@ class Cached(TextureHandler):
         bytes_transferred = 0
         textures_total = len(self.__textureQueue)
         textures_completed = 0
+        max_workers = Cached.MaxWorkers if max_workers is None else max_workers
+        retries = Cached.Retries if retries is None else retries
 
-        for uri, texture_path in self.__textureQueue.items():
+        def fetch(texture):
+            uri, texture_path = texture
             self._logger.debug("Fetching texture for '%s' to '%s'", uri, texture_path)
             if os.path.isfile(uri):
                 shutil.copyfile(uri, texture_path)
-            else:
-                bytes_transferred += self.__fetch_texture(uri, texture_path)
+                return 0
+            return self.__fetch_texture(uri, texture_path, retries)
+
+        # The progress is reported from this thread, as it updates the UI.
+        fetched = ThreadHelper.imap_unordered(
+            fetch, list(self.__textureQueue.items()), max_workers=max_workers, name="TextureFetcher")
+        for (uri, texture_path), size, error in fetched:
             textures_completed += 1
-            file_name = os.path.split(texture_path)[-1]
+            if error is None:
+                bytes_transferred += size
+                self.__textureQueue.pop(uri, None)
+            else:
+                self._logger.error("Error fetching texture '%s':\n%s",
+                                   uri, "".join(traceback.format_exception(*error)))
 
+            file_name = os.path.split(texture_path)[-1]
             if dialog_call_back and dialog_call_back(
                     textures_completed,
                     textures_total,
@@ -132,6 +157,7 @@ class Cached(TextureHandler):
                     False,
                     file_name):
                 self._logger.warning("Texture retrieval cancelled")
+                fetched.close()
                 break
 
         return bytes_transferred
@@ -206,22 +232,32 @@ class Cached(TextureHandler):
 
         return uri.startswith("special://")
 
-    def __fetch_texture(self, uri, texture_path):
+    def __fetch_texture(self, uri, texture_path, retries):
         """ Fetches a texture
 
-        @param uri:         string - The uri to fetch from
-        @param texture_path: string - The path to store to
+        :param str uri:             The uri to fetch from.
+        :param str texture_path:    The path to store to.
+        :param int retries:         The number of retries if fetching fails.
+
+        :return: The number of bytes fetched.
+        :rtype: int
 
         """
 
-        image_bytes = self.__uriHandler.open(uri, no_cache=True)
-        if image_bytes:
-            with io.open(texture_path, mode='wb') as fs:
-                if isinstance(image_bytes, bytes):
-                    fs.write(image_bytes)
-                else:
-                    fs.write(image_bytes.encode())
+        image_bytes = None
+        for attempt in range(retries + 1):
+            if attempt:
+                self._logger.warning("Retrying texture (%s/%s): %s", attempt, retries, uri)
+            image_bytes = self.__uriHandler.open(uri, no_cache=True)
+            if image_bytes and not self.__uriHandler.status.error:
+                break
+            image_bytes = None
 
+        if image_bytes:
+            if not isinstance(image_bytes, bytes):
+                image_bytes = image_bytes.encode()
+            # Write atomically, so Kodi never reads half-written textures
+            FileHelper.write_atomic(texture_path, image_bytes)
             self._logger.debug("Retrieved texture: %s", uri)
         else:
             # fallback to local cache.
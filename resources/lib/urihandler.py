@@ -2,21 +2,11 @@
 
 import os
 import time
+import threading
 
-from resources.lib.backtothefuture import PY2
-if PY2:
-    # noinspection PyCompatibility,PyUnresolvedReferences
-    from cookielib import Cookie, CookieJar, MozillaCookieJar
-else:
-    # noinspection PyCompatibility
-    from http.cookiejar import Cookie, CookieJar, MozillaCookieJar
 from collections import namedtuple
 
-import requests
-import requests.cookies
-import requests.utils
-
-from resources.lib.connectivity.cachehttpadapter import CacheHTTPAdapter
+from resources.lib.backtothefuture import PY2
 from resources.lib.connectivity.streamcache import StreamCache
 from resources.lib.logger import Logger
 from resources.lib.proxyinfo import ProxyInfo
@@ -36,14 +26,19 @@ class UriHandler(object):
 
     @staticmethod
     def create_uri_handler(cache_dir=None, web_time_out=30,
-                           cookie_jar=None, ignore_ssl_errors=False):
+                           cookie_jar=None, ignore_ssl_errors=False, cache_max_size=None,
+                           fixtures=None):
         """ Initialises the UriHandler class
 
         Keyword Arguments:
-        :param str cache_dir:           A path for http caching. If specified, caching will be used.
-        :param int web_time_out:        Timeout for requests in seconds.
-        :param str|unicode cookie_jar:  The path to the cookie jar (in case of file storage).
-        :param bool ignore_ssl_errors:  Ignore any SSL certificate errors.
+        :param str cache_dir:               A path for http caching. If specified, caching will be used.
+        :param int cache_max_size:          The maximum size in bytes of the http cache.
+        :param int web_time_out:            Timeout for requests in seconds.
+        :param str|unicode cookie_jar:      The path to the cookie jar (in case of file storage).
+        :param bool ignore_ssl_errors:      Ignore any SSL certificate errors.
+        :param FixtureArchive fixtures:     Record all responses into, or replay them from, this
+                                            archive (for tests and benchmarks). The http cache is
+                                            not used then.
 
         :return: A new UriHandler object
         :rtype: _RequestsHandler
@@ -52,11 +47,13 @@ class UriHandler(object):
 
         # Only create a new handler if we did not have, or if the user options changed
         if UriHandler.__handler is None or \
-                UriHandler.instance().ignoreSslErrors != ignore_ssl_errors:
+                UriHandler.instance().ignoreSslErrors != ignore_ssl_errors or \
+                UriHandler.instance().fixtures is not fixtures:
 
             handler = _RequestsHandler(
                 cache_dir=cache_dir, web_time_out=web_time_out, cookie_jar=cookie_jar,
-                ignore_ssl_errors=ignore_ssl_errors
+                ignore_ssl_errors=ignore_ssl_errors, cache_max_size=cache_max_size,
+                fixtures=fixtures
             )
 
             UriHandler.__handler = handler
@@ -104,19 +101,24 @@ class UriHandler(object):
 
     @staticmethod
     def open(uri, proxy=None, params=None, data=None, json=None,
-             referer=None, additional_headers=None, no_cache=False, force_text=False):
+             referer=None, additional_headers=None, no_cache=False, force_text=False,
+             stale_while_revalidate=False, cache_key_headers=None):
         """ Open an URL Async using a thread
 
-        :param str uri:                   The URI to download.
-        :param str params|bytes:          Data to send with the request (open(uri, params)).
-        :param dict[str, any]|str data:   Data to send with the request (open(uri, data)).
-        :param dict[str, any] json:       Json to send with the request (open(uri, params)).
-        :param ProxyInfo proxy:           The address and port (proxy.address.ext:port) of a
-                                          proxy server that should be used.
-        :param str referer:               The http referer to use.
-        :param dict additional_headers:   The optional headers.
-        :param bool no_cache:             Should cache be disabled.
-        :param bool force_text:           In case no content type is specified, force text.
+        :param str uri:                     The URI to download.
+        :param str params|bytes:            Data to send with the request (open(uri, params)).
+        :param dict[str, any]|str data:     Data to send with the request (open(uri, data)).
+        :param dict[str, any] json:         Json to send with the request (open(uri, params)).
+        :param ProxyInfo proxy:             The address and port (proxy.address.ext:port) of a
+                                            proxy server that should be used.
+        :param str referer:                 The http referer to use.
+        :param dict additional_headers:     The optional headers.
+        :param bool no_cache:               Should cache be disabled.
+        :param bool force_text:             In case no content type is specified, force text.
+        :param bool stale_while_revalidate: Return a stale cached response immediately and
+                                            revalidate it in the background.
+        :param list[str] cache_key_headers: Additional request headers (besides the default
+                                            ones) that are part of the cache key.
 
         :return: The data that was retrieved from the URI.
         :rtype: str|unicode
@@ -124,7 +126,8 @@ class UriHandler(object):
         """
 
         return UriHandler.instance().open(uri, proxy, params, data, json,
-                                          referer, additional_headers, no_cache, force_text)
+                                          referer, additional_headers, no_cache, force_text,
+                                          stale_while_revalidate, cache_key_headers)
 
     @staticmethod
     def header(uri, proxy=None, referer=None, additional_headers=None):
@@ -179,6 +182,13 @@ class UriHandler(object):
         :rtype: cookielib.Cookie
         """
 
+        if PY2:
+            # noinspection PyCompatibility,PyUnresolvedReferences
+            from cookielib import Cookie
+        else:
+            # noinspection PyCompatibility
+            from http.cookiejar import Cookie
+
         Logger.debug("Setting a cookie with this data:\n"
                      "name:   '%s'\n"
                      "value:  '%s'\n"
@@ -246,10 +256,6 @@ class UriHandler(object):
         else:
             cookie_jar.clear(name=name, domain=domain)
 
-        if UriHandler.instance().cookieJarFile:
-            # noinspection PyUnresolvedReferences
-            cookie_jar.save()
-
     @staticmethod
     def clear_cookies(session_only=False):
         """ Clears the current cookies from the CookieJar.
@@ -265,10 +271,11 @@ class UriHandler(object):
             Logger.debug("Clearing all cookies")
             cookie_jar.clear()
 
-        if UriHandler.instance().cookieJarFile:
-            Logger.debug("Saving cookies to cookie jar file")
-            # noinspection PyUnresolvedReferences
-            cookie_jar.save()
+    @staticmethod
+    def flush():
+        """ Persists the changed cookies and the http cache index. """
+
+        UriHandler.instance().flush()
 
     @staticmethod
     def get_extension_from_url(url):
@@ -296,49 +303,108 @@ class UriHandler(object):
 class _RequestsHandler(object):
 
     def __init__(self, cache_dir=None, web_time_out=30, cookie_jar=None,
-                 ignore_ssl_errors=False):
-        """ Initialises the UriHandler class
+                 ignore_ssl_errors=False, cache_max_size=None, fixtures=None):
+        """ Initialises the UriHandler class.
+
+        Requests (and the http.cookiejar it uses) take a considerable part of the start-up time
+        of the add-on, so they are only imported, and the cookie jar is only loaded, once they
+        are actually needed.
 
         Keyword Arguments:
         :param str cache_dir:         A path for http caching. If specified, caching will be used.
+        :param int cache_max_size:    The maximum size in bytes of the http cache.
         :param int web_time_out:      Timeout for requests in seconds
         :param str cookie_jar:        The path to the cookie jar (in case of file storage)
         :param ignore_ssl_errors:     Ignore any SSL certificate errors.
+        :param FixtureArchive fixtures: Record all responses into, or replay them from, this
+                                        archive.
 
         """
 
         self.id = int(time.time())
 
-        if cookie_jar:
-            self.cookieJar = MozillaCookieJar(cookie_jar)
-            if not os.path.isfile(cookie_jar):
-                self.cookieJar.save()
-            self.cookieJar.load()
-            self.cookieJarFile = True
-        else:
-            self.cookieJar = CookieJar()
-            self.cookieJarFile = False
+        self.cookieJarFile = bool(cookie_jar)
+        self.__cookieJarPath = cookie_jar
+        self.__cookieJar = None
+        self.__cookieJarLock = threading.Lock()
 
         self.cacheDir = cache_dir
         self.cacheStore = None
         if cache_dir:
-            self.cacheStore = StreamCache(cache_dir)
+            self.cacheStore = StreamCache(cache_dir, max_size=cache_max_size or StreamCache.DefaultMaxSize)
             Logger.debug("Opened %s", self.cacheStore)
         else:
             Logger.debug("No cache-store provided. Cached disabled.")
 
+        self.fixtures = fixtures
+        if fixtures is not None:
+            Logger.warning("Using %s", fixtures)
+
         self.userAgent = "Mozilla/5.0 (Windows; U; Windows NT 6.1; en-GB; rv:1.9.2.13) Gecko/20101203 Firefox/3.6.13 (.NET CLR 3.5.30729)"
         self.webTimeOut = web_time_out                # max duration of request
         self.ignoreSslErrors = ignore_ssl_errors      # ignore SSL errors
         if self.ignoreSslErrors:
             Logger.warning("Ignoring all SSL errors in Python")
 
-        # status of the most recent call
-        self.status = UriStatus(code=0, url=None, error=False, reason=None)
+        # status of the most recent call (per thread, so concurrent calls don't mix them up)
+        self.__local = threading.local()
+
+        # long lived sessions (and thus connection pools) per proxy/verify/cache combination
+        self.__sessions = {}
+        self.__sessionLock = threading.Lock()
+        # connection statistics: the last seen counters per pool and the totals
+        self.__poolCounters = {}
+        self.newConnections = 0
+        self.reusedConnections = 0
 
         # for download animation
         self.__animationIndex = -1
 
+    @property
+    def cookieJar(self):
+        """ The cookie jar, which is loaded on first use.
+
+        :rtype: CookieJar|PersistentCookieJar
+
+        """
+
+        with self.__cookieJarLock:
+            if self.__cookieJar is not None:
+                return self.__cookieJar
+
+            if self.cookieJarFile:
+                from resources.lib.connectivity.persistentcookiejar import PersistentCookieJar
+                cookie_jar = PersistentCookieJar(self.__cookieJarPath)
+                if not os.path.isfile(self.__cookieJarPath):
+                    cookie_jar.save()
+                cookie_jar.load()
+            else:
+                if PY2:
+                    # noinspection PyCompatibility,PyUnresolvedReferences
+                    from cookielib import CookieJar
+                else:
+                    # noinspection PyCompatibility
+                    from http.cookiejar import CookieJar
+                cookie_jar = CookieJar()
+
+            self.__cookieJar = cookie_jar
+            return cookie_jar
+
+    @property
+    def status(self):
+        """ The status of the most recent call made from the current thread.
+
+        :rtype: UriStatus
+
+        """
+
+        return getattr(self.__local, "status", None) or \
+            UriStatus(code=0, url=None, error=False, reason=None)
+
+    @status.setter
+    def status(self, value):
+        self.__local.status = value
+
     def download(self, uri, filename, folder, progress_callback=None, proxy=None, params="",
                  data="", json="", referer=None, additional_headers=None):
         """ Downloads a remote file
@@ -388,16 +454,20 @@ class _RequestsHandler(object):
         else:
             chunk_size = 1024 if total_size == 0 else total_size // 100
         cancel = False
-        with open(download_path, 'wb') as fd:
-            for chunk in r.iter_content(chunk_size=chunk_size):
-                fd.write(chunk)
-                retrieved_bytes += len(chunk)
-
-                if progress_callback:
-                    cancel = self.__do_progress_callback(progress_callback, retrieved_bytes, total_size, False)
-                if cancel:
-                    Logger.warning("Download of %s aborted", uri)
-                    break
+        try:
+            with open(download_path, 'wb') as fd:
+                for chunk in r.iter_content(chunk_size=chunk_size):
+                    fd.write(chunk)
+                    retrieved_bytes += len(chunk)
+
+                    if progress_callback:
+                        cancel = self.__do_progress_callback(progress_callback, retrieved_bytes, total_size, False)
+                    if cancel:
+                        Logger.warning("Download of %s aborted", uri)
+                        break
+        finally:
+            # release the (streamed) connection, also when cancelled or failed
+            r.close()
 
         if cancel:
             if os.path.isfile(download_path):
@@ -410,7 +480,8 @@ class _RequestsHandler(object):
         return download_path
 
     def open(self, uri, proxy=None, params=None, data=None, json=None,
-             referer=None, additional_headers=None, no_cache=False, force_text=False):
+             referer=None, additional_headers=None, no_cache=False, force_text=False,
+             stale_while_revalidate=False, cache_key_headers=None):
         """ Open an URL Async using a thread
 
         :param str uri:                         The URI to download.
@@ -423,6 +494,10 @@ class _RequestsHandler(object):
         :param dict|None additional_headers:    The optional headers.
         :param bool no_cache:                   Should cache be disabled.
         :param bool force_text:                 In case no content type is specified, force text.
+        :param bool stale_while_revalidate:     Return a stale cached response immediately and
+                                                revalidate it in the background.
+        :param list[str] cache_key_headers:     Additional request headers (besides the default
+                                                ones) that are part of the cache key.
 
         :return: The data that was retrieved from the URI.
         :rtype: str|unicode
@@ -430,7 +505,9 @@ class _RequestsHandler(object):
         """
         r = self.__requests(uri, proxy=proxy, params=params, data=data, json=json,
                             referer=referer, additional_headers=additional_headers,
-                            no_cache=no_cache, stream=False)
+                            no_cache=no_cache, stream=False,
+                            stale_while_revalidate=stale_while_revalidate,
+                            cache_key_headers=cache_key_headers)
         if r is None:
             return ""
 
@@ -468,84 +545,190 @@ class _RequestsHandler(object):
 
         """
 
-        with requests.session() as s:
-            s.cookies = self.cookieJar
-            s.verify = not self.ignoreSslErrors
+        proxies = self.__get_proxies(proxy, uri)
+        headers = self.__get_headers(referer, additional_headers)
+        s = self.__get_session(proxies, no_cache=True)
 
-            proxies = self.__get_proxies(proxy, uri)
-            headers = self.__get_headers(referer, additional_headers)
+        Logger.info("Performing a HEAD for %s", uri)
+        r = s.head(uri, proxies=proxies, headers=headers, allow_redirects=True,
+                   timeout=self.webTimeOut)
+        self.__update_connection_statistics()
 
-            Logger.info("Performing a HEAD for %s", uri)
-            r = s.head(uri, proxies=proxies, headers=headers, allow_redirects=True,
-                       timeout=self.webTimeOut)
+        content_type = r.headers.get("Content-Type", "")
+        real_url = r.url
 
-            content_type = r.headers.get("Content-Type", "")
-            real_url = r.url
+        self.status = UriStatus(code=r.status_code, url=uri, error=not r.ok, reason=r.reason)
 
-            self.status = UriStatus(code=r.status_code, url=uri, error=not r.ok, reason=r.reason)
-            if self.cookieJarFile:
-                # noinspection PyUnresolvedReferences
-                self.cookieJar.save()
+        if r.ok:
+            Logger.info("%s resulted in '%s %s' (%s) for %s",
+                        r.request.method, r.status_code, r.reason, r.elapsed, r.url)
+            return content_type, real_url
+        else:
+            Logger.error("%s failed with in '%s %s' (%s) for %s",
+                         r.request.method, r.status_code, r.reason, r.elapsed, r.url)
+            return "", ""
 
-            if r.ok:
-                Logger.info("%s resulted in '%s %s' (%s) for %s",
-                            r.request.method, r.status_code, r.reason, r.elapsed, r.url)
-                return content_type, real_url
-            else:
-                Logger.error("%s failed with in '%s %s' (%s) for %s",
-                             r.request.method, r.status_code, r.reason, r.elapsed, r.url)
-                return "", ""
+    def flush(self):
+        """ Persists the cookies to the cookie jar file, if any of them changed, and stores the
+        http cache index. """
+
+        # noinspection PyUnresolvedReferences
+        if self.cookieJarFile and self.__cookieJar is not None and self.__cookieJar.flush():
+            Logger.debug("Saved changed cookies to cookie jar file")
+
+        if self.fixtures is not None:
+            self.fixtures.save()
+
+        if self.cacheStore:
+            from resources.lib.connectivity.cachehttpadapter import CacheHTTPAdapter
+
+            # background revalidations could still update the cache
+            for s in list(self.__sessions.values()):
+                for adapter in set(s.adapters.values()):
+                    if isinstance(adapter, CacheHTTPAdapter):
+                        adapter.wait_for_revalidations(self.webTimeOut)
+            self.cacheStore.flush()
+
+    def log_connection_statistics(self):
+        """ Logs the number of new and reused (keep-alive) connections of the pooled sessions. """
+
+        self.__update_connection_statistics()
+        Logger.info("UriHandler connections: %s new, %s reused",
+                    self.newConnections, self.reusedConnections)
 
     # noinspection PyUnusedLocal
     def __requests(self, uri, proxy, params, data, json, referer,
-                   additional_headers, no_cache, stream):
+                   additional_headers, no_cache, stream, stale_while_revalidate=False,
+                   cache_key_headers=None):
+
+        proxies = self.__get_proxies(proxy, uri)
+        s = self.__get_session(proxies, no_cache, cache_key_headers)
+
+        headers = self.__get_headers(referer, additional_headers)
+        if stale_while_revalidate and self.cacheStore and not no_cache and self.fixtures is None:
+            from resources.lib.connectivity.cachehttpadapter import CacheHTTPAdapter
+            headers[CacheHTTPAdapter.StaleWhileRevalidateHeader] = "true"
+
+        if params is not None:
+            # Old UriHandler behaviour. Set form header to keep compatible
+            if "content-type" not in headers:
+                headers["content-type"] = "application/x-www-form-urlencoded"
+
+            Logger.info("Performing a POST with '%s' for %s", headers["content-type"], uri)
+            r = s.post(uri, data=params, proxies=proxies, headers=headers,
+                       stream=stream, timeout=self.webTimeOut)
+        elif data is not None:
+            # Normal Requests compatible data object
+            Logger.info("Performing a POST with '%s' for %s", headers.get("content-type", "<No Content-Type>"), uri)
+            r = s.post(uri, data=data, proxies=proxies, headers=headers,
+                       stream=stream, timeout=self.webTimeOut)
+        elif json is not None:
+            Logger.info("Performing a json POST with '%s' for %s", headers.get("content-type", "<No Content-Type>"), uri)
+            r = s.post(uri, json=json, proxies=proxies, headers=headers,
+                       stream=stream, timeout=self.webTimeOut)
+        else:
+            Logger.info("Performing a GET for %s", uri)
+            r = s.get(uri, proxies=proxies, headers=headers,
+                      stream=stream, timeout=self.webTimeOut)
+
+        if r.ok:
+            Logger.info("%s resulted in '%s %s' (%s) for %s",
+                        r.request.method, r.status_code, r.reason, r.elapsed, r.url)
+        else:
+            Logger.error("%s failed with '%s %s' (%s) for %s",
+                         r.request.method, r.status_code, r.reason, r.elapsed, r.url)
+
+        self.__update_connection_statistics()
+        self.status = UriStatus(code=r.status_code, url=r.url, error=not r.ok, reason=r.reason)
+        return r
+
+    def __get_session(self, proxies, no_cache, cache_key_headers=None):
+        """ Returns a long lived session for the given proxy settings. The session, and thus its
+        connection pools, are re-used for all calls so connections are kept alive.
+
+        :param dict[str,str]|None proxies:          The proxies that are used.
+        :param bool no_cache:                       Should the cache be bypassed.
+        :param list[str]|None cache_key_headers:    Additional request headers that are part of
+                                                    the cache key.
+
+        :return: A session with the cookiejar (and cache or fixture adapter if needed) configured.
+        :rtype: requests.Session
 
-        with requests.session() as s:
+        """
+
+        # recorded or replayed traffic should not depend on the state of the cache
+        use_cache = self.cacheStore is not None and not no_cache and self.fixtures is None
+        verify = not self.ignoreSslErrors
+        proxy_key = tuple(sorted(proxies.items())) if proxies else None
+        # each set of cache key headers has its own cache adapter (and thus session)
+        key_headers = tuple(sorted(set(h.lower() for h in cache_key_headers or ()))) if use_cache else ()
+        session_key = (proxy_key, verify, use_cache, key_headers)
+
+        with self.__sessionLock:
+            s = self.__sessions.get(session_key)
+            if s is not None:
+                return s
+
+            Logger.debug("Creating new pooled session for proxies=%s, verify=%s, cache=%s, "
+                         "key headers=%s", proxy_key, verify, use_cache, key_headers)
+            import requests
+            from resources.lib.connectivity.cachehttpadapter import CacheHTTPAdapter
+
+            s = requests.session()
             s.cookies = self.cookieJar
-            s.verify = not self.ignoreSslErrors
-            if self.cacheStore and not no_cache:
-                Logger.trace("Adding the %s to the request", self.cacheStore)
-                s.mount("https://", CacheHTTPAdapter(self.cacheStore))
-                s.mount("http://", CacheHTTPAdapter(self.cacheStore))
-
-            proxies = self.__get_proxies(proxy, uri)
-
-            headers = self.__get_headers(referer, additional_headers)
-
-            if params is not None:
-                # Old UriHandler behaviour. Set form header to keep compatible
-                if "content-type" not in headers:
-                    headers["content-type"] = "application/x-www-form-urlencoded"
-
-                Logger.info("Performing a POST with '%s' for %s", headers["content-type"], uri)
-                r = s.post(uri, data=params, proxies=proxies, headers=headers,
-                           stream=stream, timeout=self.webTimeOut)
-            elif data is not None:
-                # Normal Requests compatible data object
-                Logger.info("Performing a POST with '%s' for %s", headers.get("content-type", "<No Content-Type>"), uri)
-                r = s.post(uri, data=data, proxies=proxies, headers=headers,
-                           stream=stream, timeout=self.webTimeOut)
-            elif json is not None:
-                Logger.info("Performing a json POST with '%s' for %s", headers.get("content-type", "<No Content-Type>"), uri)
-                r = s.post(uri, json=json, proxies=proxies, headers=headers,
-                           stream=stream, timeout=self.webTimeOut)
-            else:
-                Logger.info("Performing a GET for %s", uri)
-                r = s.get(uri, proxies=proxies, headers=headers,
-                          stream=stream, timeout=self.webTimeOut)
+            s.verify = verify
+            if self.fixtures is not None:
+                from resources.lib.connectivity.fixturehttpadapter import FixtureHTTPAdapter
+
+                Logger.trace("Adding the %s to the session", self.fixtures)
+                adapter = FixtureHTTPAdapter(self.fixtures)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+            elif use_cache:
+                Logger.trace("Adding the %s to the session", self.cacheStore)
+                adapter = CacheHTTPAdapter(
+                    self.cacheStore, key_headers=CacheHTTPAdapter.DefaultKeyHeaders + key_headers,
+                    cookie_jar=self.cookieJar)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+
+            self.__sessions[session_key] = s
+            return s
+
+    def __update_connection_statistics(self):
+        """ Updates the new and reused connection counters using the counters of the underlying
+        urllib3 connection pools of all sessions. """
+
+        with self.__sessionLock:
+            for s in self.__sessions.values():
+                adapters = set(s.adapters.values())
+                for adapter in adapters:
+                    managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+                    for manager in managers:
+                        if manager is None:
+                            continue
+
+                        for pool_key in manager.pools.keys():
+                            pool = manager.pools.get(pool_key)
+                            if pool is None:
+                                continue
+                            self.__update_pool_counters(pool)
+
+    def __update_pool_counters(self, pool):
+        """ Adds the changes in the counters of a connection pool to the totals.
+
+        :param urllib3.HTTPConnectionPool pool:     The pool to process.
 
-            if r.ok:
-                Logger.info("%s resulted in '%s %s' (%s) for %s",
-                            r.request.method, r.status_code, r.reason, r.elapsed, r.url)
-            else:
-                Logger.error("%s failed with '%s %s' (%s) for %s",
-                             r.request.method, r.status_code, r.reason, r.elapsed, r.url)
+        """
 
-            self.status = UriStatus(code=r.status_code, url=r.url, error=not r.ok, reason=r.reason)
-            if self.cookieJarFile:
-                # noinspection PyUnresolvedReferences
-                self.cookieJar.save()
-            return r
+        connections = getattr(pool, "num_connections", 0)
+        requests_made = getattr(pool, "num_requests", 0)
+        last_connections, last_requests = self.__poolCounters.get(id(pool), (0, 0))
+        self.__poolCounters[id(pool)] = (connections, requests_made)
+
+        new_connections = connections - last_connections
+        self.newConnections += new_connections
+        self.reusedConnections += max(0, (requests_made - last_requests) - new_connections)
 
     def __get_headers(self, referer, additional_headers):
         headers = {}
@@ -10,4 +10,18 @@ def autorun_retrospect():
     return
 
 
+def run_service():
+    """ Runs the service loop that warms the caches while Kodi is idle. """
+
+    from resources.lib.initializer import Initializer
+    Initializer.set_unicode()
+
+    from resources.lib.cachewarmer import CacheWarmingService
+
+    # a new Addon() object is needed for each read to get the current settings
+    service = CacheWarmingService(xbmc.Monitor(), lambda setting_id: xbmcaddon.Addon().getSetting(setting_id))
+    service.run()
+
+
 autorun_retrospect()
+run_service()
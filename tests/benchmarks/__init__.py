@@ -0,0 +1,108 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks of the add-on. Each benchmark is a module that is run from the root of the add-on,
+with the same environment as the unit tests (KODI_HOME and KODI_INTERACTIVE=0), using:
+
+    python -m tests.benchmarks.<benchmark> [options]
+
+The helpers in here take care of the logger, the timings and the memory measurements, so all
+benchmarks measure (and report) them in the same way.
+
+"""
+
+import time
+import tracemalloc
+
+from resources.lib.logger import Logger
+
+
+def start_logger(name, min_log_level=Logger.LVL_ERROR):
+    """ Creates the logger for a benchmark. Only errors are logged by default, so the logging
+    itself does not influence the timings.
+
+    :param str name:            The name of the benchmark.
+    :param int min_log_level:   The minimum level to log.
+
+    """
+
+    Logger.create_logger(None, name, min_log_level=min_log_level)
+
+
+def stop_logger():
+    """ Closes the logger of a benchmark. """
+
+    Logger.instance().close_log()
+
+
+def time_action(action, repeat=1, setup=None):
+    """ Times an action. Memory tracing should not be active, as it slows down the action.
+
+    :param action:              The action to time.
+    :type action:               () -> any
+    :param int repeat:          The number of times to run the action.
+    :param setup:               An optional action that is run (untimed) before each run.
+    :type setup:                () -> any
+
+    :return: The average duration in seconds and the result of the last run.
+    :rtype: tuple[float,any]
+
+    """
+
+    duration = 0
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = action()
+        duration += time.perf_counter() - start
+    return duration / repeat, result
+
+
+def peak_memory(action, setup=None):
+    """ Runs an action once while tracing the memory allocations.
+
+    :param action:              The action to measure.
+    :type action:               () -> any
+    :param setup:               An optional action that is run (untraced) before the action.
+    :type setup:                () -> any
+
+    :return: The peak memory in bytes and the result of the action.
+    :rtype: tuple[int,any]
+
+    """
+
+    if setup is not None:
+        setup()
+
+    tracemalloc.start()
+    try:
+        result = action()
+        return tracemalloc.get_traced_memory()[1], result
+    finally:
+        tracemalloc.stop()
+
+
+def measure(name, action, repeat=1, setup=None, memory=False):
+    """ Times an action and prints the average duration. The peak memory is measured in a
+    separate run, so the tracing does not influence the timings.
+
+    :param str name:            The name to print.
+    :param action:              The action to measure.
+    :type action:               () -> any
+    :param int repeat:          The number of times to run the action for the timing.
+    :param setup:               An optional action that is run (unmeasured) before each run.
+    :type setup:                () -> any
+    :param bool memory:         Also measure the peak memory.
+
+    :return: The result of the last timed run.
+    :rtype: any
+
+    """
+
+    duration, result = time_action(action, repeat, setup)
+    line = "{0:<36} {1:8.2f} ms".format(name, duration * 1000)
+    if memory:
+        peak, _ = peak_memory(action, setup)
+        line = "{0} {1:8.1f} MB peak".format(line, peak / 1024.0 / 1024.0)
+    print(line)
+    return result
@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks storing and retrieving a large (20MB) response via the CacheHTTPAdapter. """
+
+import io
+import shutil
+import tempfile
+
+import requests
+
+from resources.lib.connectivity.cachehttpadapter import CacheHTTPAdapter
+from resources.lib.connectivity.streamcache import StreamCache
+from tests.benchmarks import measure, start_logger, stop_logger
+from tests.localhttpserver import LocalHttpServer
+
+BODY_SIZE = 20 * 1024 * 1024
+
+
+def legacy_store(session, url, cache_path):
+    """ Emulates the previous implementation: 128 byte chunks to disk and read back into memory. """
+
+    response = session.get(url, stream=True)
+    with io.open(cache_path, "wb") as fp:
+        for chunk in response.iter_content(chunk_size=128):
+            fp.write(chunk)
+    with io.open(cache_path, "rb") as fp:
+        response.raw = io.BytesIO(fp.read())
+    response._content = False
+    response._content_consumed = False
+    return response.content
+
+
+def main():
+    start_logger("bench_cachehttpadapter")
+    body = b"x" * BODY_SIZE
+    server = LocalHttpServer()
+    server.add_route("/large", body, headers={"Cache-Control": "max-age=3600"})
+    server.start()
+
+    cache_dir = tempfile.mkdtemp(prefix="retro_bench_")
+    try:
+        plain = requests.Session()
+        measure("legacy store + re-read", lambda: legacy_store(
+            plain, server.url("/large"), "{0}/legacy".format(cache_dir)), memory=True)
+
+        session = requests.Session()
+        cache_store = StreamCache(cache_dir, max_size=4 * BODY_SIZE)
+        adapter = CacheHTTPAdapter(cache_store)
+        session.mount("http://", adapter)
+        url = server.url("/large")
+        # the cache is cleared before each run, so each one is stored
+        content = measure("store (single pass)", lambda: session.get(url).content,
+                          setup=cache_store.clear, memory=True)
+        assert content == body
+        content = measure("cache hit (single read)", lambda: session.get(url).content, memory=True)
+        assert content == body
+
+        def streamed():
+            size = 0
+            for chunk in session.get(url, stream=True).iter_content(chunk_size=CacheHTTPAdapter.ChunkSize):
+                size += len(chunk)
+            return size
+
+        size = measure("cache hit (streamed)", streamed, memory=True)
+        assert size == BODY_SIZE
+        # the legacy and the storing runs are timed and measured separately
+        assert len(server.requests) == 4
+    finally:
+        server.stop()
+        shutil.rmtree(cache_dir)
+        stop_logger()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks the channels offline, using recorded HTTP traffic. For each channel it times the
+main list, a representative folder (the first folder of the main list) and the resolution of a
+video (the first video of that folder), and it reports the wall time, the number of HTTP
+requests, the bytes of the responses that were parsed and the peak memory. The peak memory is
+measured in a second replay of the traffic, as tracing the memory slows down the channel code.
+
+The traffic is stored per channel in `tests/benchmarks/fixtures/<channel id>.zip`. Record it
+(this needs network access) using:
+
+    python -m tests.benchmarks.bench_channels --record [channel id ...]
+
+And replay it, without network access, using:
+
+    python -m tests.benchmarks.bench_channels [--output results.json] [channel id ...]
+
+Channels without a recording are skipped when replaying. The exit code is 1 if any of the
+channels failed.
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import traceback
+
+from resources.lib.logger import Logger
+from tests.benchmarks import peak_memory, start_logger, stop_logger, time_action
+
+FIXTURE_FOLDER = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class ChannelResult(object):
+    def __init__(self, channel_id):
+        self.channel_id = channel_id
+        self.timings = {}
+        self.requests = 0
+        self.bytes = 0
+        self.peak = 0
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "timings": self.timings,
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "peak": self.peak,
+            "error": self.error
+        }
+
+
+def find_folder(items):
+    for item in items:
+        if item.type == "folder" and not item.isLive and item.url and item.url.startswith("http"):
+            return item
+    return None
+
+
+def find_video(items):
+    for item in items:
+        if item.is_playable() and item.url:
+            return item
+    return None
+
+
+def run_channel(channel_info, archive, timings=None):
+    from resources.lib.retroconfig import Config
+    from resources.lib.textures import TextureHandler
+    from resources.lib.urihandler import UriHandler
+
+    UriHandler.create_uri_handler(fixtures=archive)
+    TextureHandler.set_texture_handler(Config, Logger.instance(), UriHandler.instance())
+
+    def measure(name, action, *args):
+        duration, value = time_action(lambda: action(*args))
+        if timings is not None:
+            timings[name] = duration
+        return value
+
+    try:
+        channel = channel_info.get_channel()
+        measure("init", channel.init_channel)
+        items = measure("main list", channel.process_folder_list, None)
+
+        folder = find_folder(items)
+        if folder is not None:
+            items = measure("folder", channel.process_folder_list, folder)
+
+        video = find_video(items)
+        if video is not None:
+            measure("video", channel.process_video_item, video)
+        return None
+    except:
+        return traceback.format_exc()
+
+
+def benchmark_channel(channel_info, archive):
+    from resources.lib.connectivity.fixturearchive import FixtureArchive
+
+    result = ChannelResult(channel_info.id)
+    try:
+        result.error = run_channel(channel_info, archive, result.timings)
+    finally:
+        result.requests = archive.requests
+        result.bytes = archive.bytes
+        # a failed recording should not replace a working one
+        archive.close(save=result.error is None)
+
+    if result.error is None:
+        # measure the memory separately (replaying the same traffic), as tracing slows down the
+        # channel code and would skew the timings.
+        archive = FixtureArchive(archive.path, FixtureArchive.Replay)
+        try:
+            result.peak, result.error = peak_memory(lambda: run_channel(channel_info, archive))
+        finally:
+            archive.close(save=False)
+    return result
+
+
+def report(result):
+    timings = " ".join(
+        "{0}={1:.1f}ms".format(name, duration * 1000) for name, duration in result.timings.items())
+    print("{0:<40} {1:4d} requests {2:9.1f} kB {3:7.1f} MB peak  {4}{5}".format(
+        result.channel_id, result.requests, result.bytes / 1024.0, result.peak / 1024.0 / 1024.0,
+        timings, "  FAILED" if result.error else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the channels using recorded HTTP traffic.")
+    parser.add_argument("--record", action="store_true", help="record the traffic (needs network access)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("channels", nargs="*", help="the ids of the channels (default: all)")
+    arguments = parser.parse_args()
+
+    start_logger("bench_channels")
+    from resources.lib.connectivity.fixturearchive import FixtureArchive
+    from resources.lib.helpers.channelimporter import ChannelIndex
+
+    results = {}
+    failed = False
+    for channel_info in ChannelIndex.get_register().get_channels():
+        if arguments.channels and channel_info.id not in arguments.channels:
+            continue
+
+        path = os.path.join(FIXTURE_FOLDER, "{}.zip".format(channel_info.id))
+        if arguments.record:
+            archive = FixtureArchive(path, FixtureArchive.Record)
+        elif os.path.isfile(path):
+            archive = FixtureArchive(path, FixtureArchive.Replay)
+        else:
+            continue
+
+        result = benchmark_channel(channel_info, archive)
+        report(result)
+        if result.error:
+            print(result.error)
+            failed = True
+        results[result.channel_id] = result.to_dict()
+
+    if not results:
+        print("No recorded channels found in {}".format(FIXTURE_FOLDER))
+
+    if arguments.output:
+        with open(arguments.output, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+
+    from resources.lib.addonsettings import AddonSettings
+    AddonSettings.clear_cached_addon_settings_object()
+    stop_logger()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
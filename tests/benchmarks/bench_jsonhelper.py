@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks extracting an embedded JSON state object from HTML pages, using the previous
+non-greedy DOTALL regex plus a JSON parse and using JsonHelper.from_embedded.
+
+The pages are generated with the sizes of typical pages (an iPlayer A-Z page is about 2MB, an SVT
+Play page with __svtplay state is up to 5MB), with the state object in the middle of the page.
+
+"""
+
+import json
+
+from resources.lib.helpers.jsonhelper import JsonHelper
+from resources.lib.regexer import Regexer
+from tests.benchmarks import measure, start_logger, stop_logger
+
+PAGE_SIZES = (512 * 1024, 2 * 1024 * 1024, 5 * 1024 * 1024)
+REPEAT = 5
+
+
+def create_page(size):
+    programmes = []
+    state = {"header": {"title": "A-Z"}, "programmes": programmes}
+    i = 0
+    state_size = 0
+    while state_size < size / 2:
+        programmes.append({
+            "id": "p0{:06d}".format(i),
+            "title": "Programme {} with \"quotes\" and {{braces}}".format(i),
+            "synopsis": "A synopsis " * 10,
+            "images": {"standard": "https://example.com/images/{recipe}/p0%06d.jpg" % i}
+        })
+        state_size += len(json.dumps(programmes[-1]))
+        i += 1
+    filler = "<div class=\"item\"><a href=\"/programme\">Some HTML</a></div>\n"
+    html = filler * (size // 4 // len(filler))
+    return "<html><body>{0}<script>window.__IPLAYER_REDUX_STATE__ = {1};</script>{0}</body></html>"\
+        .format(html, json.dumps(state))
+
+
+def main():
+    start_logger("bench_jsonhelper")
+    json_regex = r'window.__IPLAYER_REDUX_STATE__ = (.*?);\s*</script>'
+    marker = "window.__IPLAYER_REDUX_STATE__ = "
+
+    for size in PAGE_SIZES:
+        page = create_page(size)
+        print("Page of {:.1f}MB".format(len(page) / 1024.0 / 1024.0))
+        regex_json = measure("  regex + JsonHelper",
+                             lambda: JsonHelper(Regexer.do_regex(json_regex, page)[0]), REPEAT)
+        embedded_json = measure("  JsonHelper.from_embedded",
+                                lambda: JsonHelper.from_embedded(page, marker), REPEAT)
+        assert regex_json.json == embedded_json.json
+
+    stop_logger()
+
+
+if __name__ == "__main__":
+    main()
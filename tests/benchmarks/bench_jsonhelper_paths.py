@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks creating a JsonHelper for large API responses and retrieving the parser paths
+from it, using the previous approach (strip, slice for JSONP, decode and resolve the path
+arguments on each call) and using the current one (no copies, bytes input and compiled paths).
+
+The responses are generated with the structure and sizes of typical catalogue responses (NPO
+and NRK pages of tiles, SVT GraphQL responses with nested selections) as no recorded responses
+are shipped with the add-on.
+
+"""
+
+import json
+
+from resources.lib.helpers.jsonhelper import JsonHelper
+from tests.benchmarks import measure, start_logger, stop_logger
+
+REPEAT = 5
+
+
+def create_tiles(count):
+    return [{
+        "id": "tile-{:06d}".format(i),
+        "title": "Programme {}".format(i),
+        "description": "A description " * 20,
+        "images": [{"url": "https://example.com/{0}/{1}.jpg".format(i, w), "width": w}
+                   for w in (320, 640, 1280)]
+    } for i in range(count)]
+
+
+def create_responses():
+    tiles = create_tiles(6000)
+    npo = json.dumps({"page": 1, "tiles": tiles}, indent=1)
+    svt = json.dumps({"data": {"selectionsForWeb": [
+        {"id": "selection-{}".format(s), "items": tiles[s::8]} for s in range(8)]}})
+    nrk = "jsonp_callback_1370950605750({0});".format(
+        json.dumps({"_embedded": {"series": tiles}}))
+
+    return (
+        ("NPO tiles", npo.encode("utf-8"), ("tiles",)),
+        ("SVT GraphQL", svt.encode("utf-8"), ("data", "selectionsForWeb", 0, "items")),
+        ("NRK catalogue (JSONP)", nrk, ("_embedded", "series"))
+    )
+
+
+def previous(data, path):
+    # what JsonHelper did before: decode bytes, strip and slice for JSONP, then decode.
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    data = data.strip()
+    if not data.startswith("{") and not data.startswith("["):
+        data = data[data.find("(") + 1:data.rfind(")")]
+    json_data = json.loads(data)
+    for key in path:
+        json_data = json_data[key]
+    return json_data
+
+
+def current(data, path):
+    return JsonHelper(data).get_value(JsonHelper.compile_path(*path))
+
+
+def main():
+    start_logger("bench_jsonhelper_paths")
+
+    for name, data, path in create_responses():
+        print("{0} of {1:.1f}MB".format(name, len(data) / 1024.0 / 1024.0))
+        previous_result = measure("  strip + slice + json.loads", lambda: previous(data, path),
+                                  REPEAT, memory=True)
+        current_result = measure("  JsonHelper + compiled path", lambda: current(data, path),
+                                 REPEAT, memory=True)
+        assert previous_result == current_result
+
+    stop_logger()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks the settings lookups of a 2.000 item listing: the per listing lookups of
+`process_folder_list` and the per item lookups of `FolderAction` and `MediaItem.get_kodi_item`.
+It compares asking Kodi (`xbmcaddon.Addon.getSetting`) for each lookup with the settings
+snapshot. Note that the Kodi stub is a lot cheaper to call than the actual Kodi C++ side.
+
+"""
+
+from resources.lib.logger import Logger
+from tests.benchmarks import start_logger, stop_logger, time_action
+
+ITEM_COUNT = 2000
+REPEAT = 5
+
+
+def listing():
+    from resources.lib.addonsettings import AddonSettings
+
+    AddonSettings.hide_drm_items()
+    AddonSettings.hide_premium_items()
+    AddonSettings.hide_restricted_folders()
+    AddonSettings.show_cloaked_items()
+    AddonSettings.get_list_limit()
+    for _ in range(ITEM_COUNT):
+        AddonSettings.use_thumbs_as_fanart()
+        AddonSettings.hide_fanart()
+
+
+def measure_listing(name, profile_dir):
+    import xbmcaddon
+    from resources.lib.addonsettings import AddonSettings, KODI
+    from resources.lib.settings.kodisettings import KodiSettings
+
+    # count the calls into Kodi
+    calls = [0]
+    get_setting = xbmcaddon.Addon.getSetting
+
+    def counting_get_setting(self, setting_id):
+        calls[0] += 1
+        return get_setting(self, setting_id)
+
+    def invocation():
+        # a new store for each invocation of the add-on
+        stores = AddonSettings._AddonSettings__setting_stores
+        stores[KODI] = KodiSettings(Logger.instance(), profile_dir=profile_dir)
+        listing()
+        AddonSettings.clear_cached_addon_settings_object()
+
+    xbmcaddon.Addon.getSetting = counting_get_setting
+    duration, _ = time_action(invocation, REPEAT)
+    xbmcaddon.Addon.getSetting = get_setting
+    print("{0:<34} {1:8.1f} ms {2:6d} Kodi calls".format(name, duration * 1000, calls[0] // REPEAT))
+
+
+def main():
+    start_logger("bench_kodisettings")
+    from resources.lib.retroconfig import Config
+
+    measure_listing("Listing without snapshot", None)
+    measure_listing("Listing with snapshot", Config.profileDir)
+
+    stop_logger()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks the Logger by replaying all lines of tests/data/largelogfile.log, with all levels
+enabled and with only INFO and higher enabled. It reports the time spent in the log calls and the
+total time including closing the log (after which all lines were written to disk).
+
+The Logger itself is benchmarked, so the shared benchmark logger is not used.
+
+"""
+
+import io
+import os
+import tempfile
+import time
+
+from resources.lib.logger import Logger
+
+REPEAT = 10
+
+LOG_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "largelogfile.log")
+
+
+def read_workload():
+    levels = {
+        "TRACE": Logger.LVL_TRACE,
+        "DEBUG": Logger.LVL_DEBUG,
+        "INFO": Logger.LVL_INFO,
+        "WARNING": Logger.LVL_WARNING,
+        "ERROR": Logger.LVL_ERROR,
+        "CRITICAL": Logger.LVL_CRITICAL
+    }
+
+    workload = []
+    with io.open(LOG_FILE, "r", encoding="utf-8") as fp:
+        for line in fp:
+            parts = line.rstrip("\n").split(" - ", 4)
+            if len(parts) != 5:
+                continue
+            level = levels.get(parts[1].strip("[] "))
+            if level is not None:
+                workload.append((level, parts[4]))
+    return workload
+
+
+def replay(workload, log_file, min_log_level):
+    log_methods = {
+        Logger.LVL_TRACE: Logger.trace,
+        Logger.LVL_DEBUG: Logger.debug,
+        Logger.LVL_INFO: Logger.info,
+        Logger.LVL_WARNING: Logger.warning,
+        Logger.LVL_ERROR: Logger.error,
+        Logger.LVL_CRITICAL: Logger.critical
+    }
+
+    Logger.create_logger(log_file, "bench_logger", min_log_level=min_log_level)
+    start = time.perf_counter()
+    for level, message in workload:
+        log_methods[level]("%s", message)
+    calls = time.perf_counter() - start
+    Logger.instance().close_log()
+    return calls, time.perf_counter() - start
+
+
+def measure_replay(name, workload, log_file, min_log_level):
+    calls = total = 0
+    for _ in range(REPEAT):
+        duration = replay(workload, log_file, min_log_level)
+        calls += duration[0]
+        total += duration[1]
+    print("{0:<28} {1:8.2f} ms calls {2:8.2f} ms total".format(
+        name, calls * 1000 / REPEAT, total * 1000 / REPEAT))
+
+
+def main():
+    workload = read_workload()
+    print("Replaying {} log lines".format(len(workload)))
+
+    log_file = tempfile.mktemp(prefix="retro_bench_", suffix=".log")
+    try:
+        measure_replay("all levels", workload, log_file, Logger.LVL_TRACE)
+        measure_replay("info and higher", workload, log_file, Logger.LVL_INFO)
+    finally:
+        for path in (log_file, log_file.replace(".log", ".old.log")):
+            if os.path.isfile(path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
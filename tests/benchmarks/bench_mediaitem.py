@@ -0,0 +1,48 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks creating 10.000 MediaItems (like a large A-Z listing of which a part is filtered
+away afterwards), their memory use and pickling them for the PickleStore.
+
+"""
+
+import pickle
+
+from tests.benchmarks import measure, peak_memory, start_logger, stop_logger
+
+ITEM_COUNT = 10000
+REPEAT = 5
+
+
+def create_items(media_item_class):
+    items = []
+    for i in range(ITEM_COUNT):
+        item = media_item_class("Program {}".format(i), "https://example.com/program/{}".format(i))
+        item.description = "A description of program {}".format(i)
+        item.thumb = "https://example.com/images/{}.jpg".format(i)
+        item.complete = True
+        items.append(item)
+    return items
+
+
+def main():
+    start_logger("bench_mediaitem")
+    from resources.lib.mediaitem import MediaItem
+
+    measure("Create {} items".format(ITEM_COUNT), lambda: create_items(MediaItem), REPEAT)
+    measure("Create and filter 2/3 of them", lambda: [i for i in create_items(MediaItem)
+                                                      if i.guid.startswith(("0", "1", "2", "3", "4"))],
+            REPEAT)
+    measure("Hash {} items".format(ITEM_COUNT), lambda: set(create_items(MediaItem)), REPEAT)
+
+    size, items = peak_memory(lambda: create_items(MediaItem))
+    print("{0:<36} {1:8.1f} MB".format("Memory of {} items".format(ITEM_COUNT), size / 1024.0 / 1024.0))
+
+    data = measure("Pickle {} items".format(ITEM_COUNT),
+                   lambda: [pickle.dumps(i, protocol=pickle.HIGHEST_PROTOCOL) for i in items], REPEAT)
+    measure("Unpickle {} items".format(ITEM_COUNT), lambda: [pickle.loads(d) for d in data], REPEAT)
+    print("{0:<36} {1:8.1f} kB".format("Pickled size", sum(len(d) for d in data) / 1024.0))
+
+    stop_logger()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks resolving the data parsers of all shipped channels, by trying all registered URLs
+in order (the previous way) and by using the compiled ParserIndex. The URLs are those found in
+the channel tests, the registered URLs themselves and some variants of them. Both should return
+the same data parsers.
+
+"""
+
+import glob
+import io
+import os
+import re
+
+from resources.lib.logger import Logger
+from tests.benchmarks import start_logger, stop_logger, time_action
+
+REPEAT = 20
+
+
+def read_url_fixtures():
+    """ Reads the channel id, code and the URLs used by the channel tests.
+
+    :rtype: dict[tuple[str,str],list[str]]
+
+    """
+
+    fixtures = {}
+    test_path = os.path.join(os.path.dirname(__file__), "..", "channel_tests")
+    for test_file in glob.glob(os.path.join(test_path, "test_chn_*.py")):
+        with io.open(test_file, encoding="utf-8") as fp:
+            content = fp.read()
+
+        channel = re.search(r'__init__\(methodName, "([^"]+)", (?:"([^"]+)"|None)\)', content)
+        if channel is None:
+            continue
+        urls = re.findall(r'"((?:https?://|#)[^"]+)"', content)
+        fixtures[(channel.group(1), channel.group(2))] = urls
+    return fixtures
+
+
+def get_urls(channel, fixtures):
+    urls = list(fixtures.get((channel.id, channel.channelCode), []))
+    for key, parsers in channel.dataParsers.items():
+        if all(p.MatchType == "Regex" for p in parsers):
+            continue
+        urls += [key, key + "/some/path?page=2", "https://www.example.com/" + key]
+    urls.append("https://www.example.com/not/registered")
+    return urls
+
+
+def legacy_find(data_parsers, url):
+    for key in sorted(data_parsers.keys(), key=len, reverse=True):
+        if [d for d in data_parsers[key] if d.matches(url)]:
+            return key
+    return None
+
+
+def measure_lookups(name, lookups, find):
+    def lookup_all():
+        for data_parsers, url in lookups:
+            find(data_parsers, url)
+
+    duration, _ = time_action(lookup_all, REPEAT)
+    print("{0:<28} {1:8.2f} ms {2:8.2f} us/lookup".format(
+        name, duration * 1000, duration * 1000000 / len(lookups)))
+
+
+def main():
+    start_logger("bench_parserindex", min_log_level=Logger.LVL_CRITICAL)
+    from resources.lib.urihandler import UriHandler
+    from resources.lib.textures import TextureHandler
+    from resources.lib.retroconfig import Config
+    from resources.lib.helpers.channelimporter import ChannelIndex
+    from resources.lib.parserindex import ParserIndex
+
+    UriHandler.create_uri_handler(ignore_ssl_errors=False)
+    TextureHandler.set_texture_handler(Config, Logger.instance(), UriHandler.instance())
+
+    fixtures = read_url_fixtures()
+    lookups = []
+    channels = 0
+    for channel_info in ChannelIndex.get_register().get_channels(include_disabled=True):
+        channel = channel_info.get_channel()
+        if channel is None or not channel.dataParsers:
+            continue
+
+        channels += 1
+        for url in get_urls(channel, fixtures):
+            lookups.append((channel.dataParsers, url))
+
+    mismatches = [url for data_parsers, url in lookups
+                  if legacy_find(data_parsers, url) != ParserIndex.get_index(data_parsers).find(url)]
+    print("{} lookups for {} channels, {} mismatches".format(len(lookups), channels, len(mismatches)))
+
+    # compiling is done once per channel (class) and per process
+    all_data_parsers = list(dict((id(d), d) for d, _ in lookups).values())
+    # noinspection PyUnresolvedReferences
+    duration, indexes = time_action(
+        lambda: dict((id(d), ParserIndex.get_index(d)) for d in all_data_parsers),
+        setup=ParserIndex._ParserIndex__indexes.clear)
+    print("{0:<28} {1:8.2f} ms {2:8.2f} us/channel".format(
+        "compile indexes", duration * 1000, duration * 1000000 / len(all_data_parsers)))
+
+    measure_lookups("try keys in order", lookups, legacy_find)
+    measure_lookups("parser index", lookups, lambda d, u: indexes[id(d)].find(u))
+
+    from resources.lib.addonsettings import AddonSettings
+    AddonSettings.clear_cached_addon_settings_object()
+    stop_logger()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks writing a listing of 1000 items to the PickleStore and reading a single item from
+it, for both the indexed format and the previous single-pickle format.
+
+"""
+
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import zlib
+
+from tests.benchmarks import measure, start_logger, stop_logger
+
+ITEM_COUNT = 1000
+REPEAT = 20
+
+
+def create_items(media_item_class):
+    parent = media_item_class("A-Z", "https://example.com/az")
+    children = []
+    for i in range(ITEM_COUNT):
+        item = media_item_class("Program {}".format(i), "https://example.com/program/{}".format(i))
+        item.description = "A description of program {} ".format(i) * 5
+        item.thumb = "https://example.com/images/{}.jpg".format(i)
+        item.set_info_label("Genre", "Documentary")
+        children.append(item)
+    return parent, children
+
+
+def legacy_store(pickles_path, parent, children):
+    content = {"parent": parent, "children": {item.guid: item for item in children}}
+    with io.open(pickles_path, "wb+") as fp:
+        fp.write(zlib.compress(pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL),
+                               zlib.Z_BEST_COMPRESSION))
+
+
+def main():
+    start_logger("bench_pickler")
+    from resources.lib.mediaitem import MediaItem
+    from resources.lib.pickler import Pickler
+
+    store_path = tempfile.mkdtemp(prefix="retro_bench_")
+    try:
+        parent, children = create_items(MediaItem)
+        pickler = Pickler(store_path)
+        legacy_guid = "00000000-0000-0000-0000-000000000000"
+        indexed_guid = "11111111-1111-1111-1111-111111111111"
+        legacy_dir = os.path.join(store_path, "pickles", "00", "00")
+        os.makedirs(legacy_dir)
+        legacy_path = os.path.join(legacy_dir, "{}.store.z".format(legacy_guid))
+
+        measure("legacy write", lambda: legacy_store(legacy_path, parent, children), REPEAT)
+        measure("indexed write", lambda: pickler.store_media_items(indexed_guid, parent, children), REPEAT)
+
+        item_guid = children[ITEM_COUNT // 2].guid
+        measure("legacy read (1 item)", lambda: pickler.de_pickle_media_item(
+            "{}--{}".format(legacy_guid, item_guid)), REPEAT)
+        measure("indexed read (1 item)", lambda: pickler.de_pickle_media_item(
+            "{}--{}".format(indexed_guid, item_guid)), REPEAT)
+
+        indexed_path = os.path.join(store_path, "pickles", "11", "11", "{}.store.i".format(indexed_guid))
+        print("{0:<36} {1:8d} bytes".format("legacy size", os.path.getsize(legacy_path)))
+        print("{0:<36} {1:8d} bytes".format("indexed size", os.path.getsize(indexed_path)))
+    finally:
+        shutil.rmtree(store_path)
+        from resources.lib.addonsettings import AddonSettings
+        AddonSettings.clear_cached_addon_settings_object()
+        stop_logger()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks feeding the matches of a regex on a large HTML page to a creator, by first
+collecting all matches (Regexer.do_regex) and by streaming them (Regexer.iter_regex). It reports
+the time to the first item, the total time and the peak memory used.
+
+"""
+
+import time
+
+from resources.lib.logger import Logger
+from tests.benchmarks import peak_memory, start_logger, stop_logger, time_action
+
+ITEM_COUNT = 20000
+REPEAT = 5
+
+REGEX = r'<div class="item">\s*<a href="(?<url>[^"]+)"[^>]*>\s*<img src="(?<thumb>[^"]+)"[^>]*>' \
+        r'\s*<h3>(?<title>[^<]+)</h3>\s*</a>\s*<p class="description">(?<description>[^<]*)</p>' \
+        r'\s*<span class="date">(?<date>[^<]+)</span>'
+
+
+def create_page():
+    items = []
+    for i in range(ITEM_COUNT):
+        items.append(
+            '<div class="item">\n  <a href="/video/{0}" class="link">\n'
+            '    <img src="https://example.com/images/{0}.jpg" alt="">\n'
+            '    <h3>Video number {0}</h3>\n  </a>\n'
+            '  <p class="description">{1}</p>\n'
+            '  <span class="date">2020-01-{2:02d}</span>\n</div>\n'.format(
+                i, "A description of the video. " * 5, i % 28 + 1))
+    return "<html><body>{}</body></html>".format("".join(items))
+
+
+def creator(result_set):
+    return result_set["url"], result_set["title"]
+
+
+def process(results):
+    """ Feeds the results to the creator, just like Channel.process_folder_list does.
+
+    :return: The items and the number of seconds until the first item was created.
+
+    """
+
+    start = time.perf_counter()
+    first = None
+    items = []
+    for result in results():
+        items.append(creator(result))
+        if first is None:
+            first = time.perf_counter() - start
+    return items, first
+
+
+def measure_results(name, results):
+    firsts = []
+    total, _ = time_action(lambda: firsts.append(process(results)[1]), REPEAT)
+    peak, _ = peak_memory(lambda: process(results))
+
+    print("{0:<20} first item {1:8.2f} ms  total {2:8.2f} ms  peak memory {3:6.1f} MB".format(
+        name, sum(firsts) * 1000 / REPEAT, total * 1000, peak / 1024.0 / 1024.0))
+
+
+def main():
+    start_logger("bench_regexer", min_log_level=Logger.LVL_CRITICAL)
+    from resources.lib.regexer import Regexer
+
+    data = create_page()
+    regex = Regexer.from_expresso(REGEX)
+    print("Page of {:.1f} MB with {} items".format(len(data) / 1024.0 / 1024.0, ITEM_COUNT))
+
+    measure_results("do_regex", lambda: Regexer.do_regex(regex, data))
+    measure_results("iter_regex", lambda: Regexer.iter_regex(regex, data))
+    stop_logger()
+
+
+if __name__ == "__main__":
+    main()
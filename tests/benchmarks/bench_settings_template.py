@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks the generation of the add-on settings.xml for the full shipped channel set: a
+cold generation (no cached sections), a generation where a channel was added or removed, a
+generation without any changes and the `TemplateHelper` indexing and transform of the generated
+settings.xml (with its templated `visible` attribute restored).
+
+The settings.xml is generated in a temporary copy of the add-on folder structure, so the shipped
+resources/settings.xml is never touched. The `--output <file>` option writes the generated
+settings.xml to a file, so it can be compared with the output of other versions.
+
+"""
+
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+from resources.lib.logger import Logger
+from tests.benchmarks import measure, start_logger, stop_logger
+
+REPEAT = 10
+
+
+class BenchConfig(object):
+    rootDir = None
+    profileDir = None
+    version = None
+
+
+def get_channels(root_dir):
+    from resources.lib.chn_class import ChannelInfo
+
+    channels = []
+    channel_path = os.path.join(root_dir, "channels")
+    for channel_pack in sorted(os.listdir(channel_path)):
+        if not channel_pack.startswith("channel."):
+            continue
+
+        for channel_set in sorted(os.listdir(os.path.join(channel_path, channel_pack))):
+            channel_set_info_path = os.path.join(
+                channel_path, channel_pack, channel_set, "chn_{}.json".format(channel_set))
+            if not os.path.isfile(channel_set_info_path):
+                continue
+
+            with io.open(channel_set_info_path, mode="rb") as fp:
+                json_data = json.loads(fp.read().decode("utf-8"))
+            channels += ChannelInfo.from_json(channel_set_info_path, json_data)
+    return channels
+
+
+def main():
+    start_logger("bench_settings_template")
+    from resources.lib.retroconfig import Config
+    from resources.lib.addonsettings import AddonSettings
+    from resources.lib.helpers.templatehelper import TemplateHelper
+
+    channels = get_channels(Config.rootDir)
+    print("Generating settings for {0} channels".format(len(channels)))
+
+    work_dir = tempfile.mkdtemp(prefix="retro_bench_")
+    config = BenchConfig()
+    config.rootDir = os.path.join(work_dir, "addon")
+    config.profileDir = os.path.join(work_dir, "profile")
+    config.version = Config.version
+    os.makedirs(os.path.join(config.rootDir, "resources", "data"))
+    os.makedirs(config.profileDir)
+    template = os.path.join("resources", "data", "settings_template.xml")
+    shutil.copyfile(os.path.join(Config.rootDir, template), os.path.join(config.rootDir, template))
+    settings_xml = os.path.join(config.rootDir, "resources", "settings.xml")
+
+    # make sure all the caches are gone
+    def cold():
+        for path in os.listdir(config.profileDir):
+            os.remove(os.path.join(config.profileDir, path))
+
+    # the first channel is alternately removed and added
+    channel_lists = [channels, channels[1:]]
+
+    def toggle_channel():
+        channel_lists.reverse()
+
+    def update():
+        AddonSettings.update_add_on_settings_with_channels(list(channel_lists[0]), config)
+
+    measure("Cold generation", update, REPEAT, cold)
+    measure("Added or removed channel", update, REPEAT, toggle_channel)
+    measure("Unchanged channels", update, REPEAT)
+
+    with io.open(settings_xml, mode="r", encoding="utf-8") as fp:
+        template_content = re.sub(r'visible="eq\(-?\d+,\)"', 'visible="eq(%config_channel%,)"', fp.read())
+    helper = TemplateHelper(Logger.instance(), template=template_content)
+    measure("TemplateHelper index",
+            lambda: TemplateHelper(Logger.instance(), template=template_content), REPEAT)
+    measure("TemplateHelper transform", helper.transform, REPEAT)
+
+    if "--output" in sys.argv:
+        # generate the settings for the original channels
+        cold()
+        channels = get_channels(Config.rootDir)
+        AddonSettings.update_add_on_settings_with_channels(channels, config)
+        shutil.copyfile(settings_xml, sys.argv[sys.argv.index("--output") + 1])
+
+    shutil.rmtree(work_dir)
+    stop_logger()
+
+
+if __name__ == "__main__":
+    main()
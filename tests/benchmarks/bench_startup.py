@@ -0,0 +1,39 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Reports the import times of `run_addon` and of each of the actions, including the slowest
+add-on modules. It uses `python -X importtime` in a new interpreter for each measurement.
+
+The median import time of each action should stay within `IMPORT_BUDGET` milliseconds. Locally
+these imports take about 40 ms, while importing `requests` and friends took more than 120 ms.
+The exit code is 1 if any of them is over budget.
+
+"""
+
+import sys
+
+from tests.importprofiler import profile_imports, RUN_ADDON_MODULES, ACTION_MODULES
+
+REPEAT = 5
+IMPORT_BUDGET = 100
+
+
+def report(name, modules):
+    profiles = [profile_imports(modules) for _ in range(REPEAT)]
+    totals = sorted(p.total for p in profiles)
+    median = totals[len(totals) // 2]
+    over_budget = median > IMPORT_BUDGET
+    print("{0:<28} {1:8.2f} ms (median of {2}){3}".format(
+        name, median, REPEAT, "  OVER BUDGET" if over_budget else ""))
+    for import_time in profiles[0].slowest(5, "resources"):
+        print("    {0:<44} {1:8.2f} ms".format(import_time.name, import_time.cumulative / 1000.0))
+    return over_budget
+
+
+def main():
+    over_budget = report("run_addon", RUN_ADDON_MODULES)
+    for name, modules in sorted(ACTION_MODULES.items()):
+        over_budget = report(name, RUN_ADDON_MODULES + modules) or over_budget
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks the SubtitleHelper converters on a generated 2-hour subtitle (a cue every ~3
+seconds) in all supported source formats, and the conversion of a HLS subtitle playlist with
+one-minute WebVTT segments that are served from a local HTTP server with some latency. The HLS
+conversion is done with a single download thread and with the default number of threads.
+
+"""
+
+import json
+import time
+
+from tests.benchmarks import start_logger, stop_logger, time_action
+
+DURATION = 2 * 60 * 60 * 1000
+SEGMENT_DURATION = 60 * 1000
+SEGMENT_LATENCY = 0.02
+REPEAT = 3
+
+
+def get_cues():
+    cues = []
+    start = 1000
+    index = 0
+    while start < DURATION:
+        end = start + 2500
+        text = ["Line {0} &amp; some more text".format(index)]
+        if index % 2:
+            text.append("-And a <i>second</i> line {0}".format(index))
+        cues.append((start, end, text))
+        start = end + 500
+        index += 1
+    return cues
+
+
+def format_time(millis, separator="."):
+    return "{0:02d}:{1:02d}:{2:02d}{3}{4:03d}".format(
+        millis // 3600000, millis // 60000 % 60, millis // 1000 % 60, separator, millis % 1000)
+
+
+def get_web_vtt(cues):
+    parts = ["WEBVTT\n"]
+    for start, end, text in cues:
+        parts.append("\n{0} --> {1} align:middle\n{2}\n".format(
+            format_time(start), format_time(end), "\n".join(text)))
+    return "".join(parts)
+
+
+def get_subtitles(cues):
+    def dc_time(millis):
+        return "{0}:{1:03d}".format(format_time(millis)[:8], millis % 1000 // 4)
+
+    return {
+        "webvtt": get_web_vtt(cues),
+        "ttml": "<tt><body><div>{0}</div></body></tt>".format("".join(
+            '<p begin="{0}" end="{1}" style="s1">{2}</p>\r\n'.format(
+                format_time(start), format_time(end), "<br />".join(text))
+            for start, end, text in cues)),
+        "sami": "<sami><body>{0}</body></sami>".format("".join(
+            '<sync start="{0}"><p class="sub">{1}</p></sync>\n<sync start="{2}">&nbsp;\n'.format(
+                start, text[0], end)
+            for start, end, text in cues)),
+        "json": json.dumps(
+            [{"startMillis": start, "endMillis": end, "text": "\n".join(text), "posX": 0.5}
+             for start, end, text in cues], separators=(",", ":")),
+        "dcsubtitle": "<dcsubtitle>{0}</dcsubtitle>".format("".join(
+            '<subtitle spotnumber="{0}" timein="{1}" timeout="{2}" fadeuptime="20">\n{3}</subtitle>\n'.format(
+                index + 1, dc_time(start), dc_time(end),
+                "".join('<text direction="horizontal">{0}</text>\n'.format(t) for t in text))
+            for index, (start, end, text) in enumerate(cues)))
+    }
+
+
+def measure_conversion(name, action):
+    duration, result = time_action(action, REPEAT)
+    print("{0:<36} {1:8.2f} ms {2:9d} chars".format(name, duration * 1000, len(result)))
+
+
+def main():
+    start_logger("bench_subtitlehelper")
+    from resources.lib.urihandler import UriHandler
+    from resources.lib.helpers.subtitlehelper import SubtitleHelper
+    from tests.localhttpserver import LocalHttpServer
+
+    UriHandler.create_uri_handler()
+    # noinspection PyUnresolvedReferences
+    transform = SubtitleHelper._SubtitleHelper__transform
+
+    cues = get_cues()
+    print("Converting {0} cues".format(len(cues)))
+    for sub_format, raw in get_subtitles(cues).items():
+        measure_conversion("Convert {0}".format(sub_format),
+                lambda: "".join(transform(raw, sub_format=sub_format, url=None, proxy=None)))
+
+    # the HLS subtitle playlist with its segments
+    server = LocalHttpServer().start()
+
+    def segment(content):
+        def respond(handler):
+            time.sleep(SEGMENT_LATENCY)
+            return 200, {}, content.encode("utf-8")
+        return respond
+
+    playlist = ["#EXTM3U"]
+    for index, start in enumerate(range(0, DURATION, SEGMENT_DURATION)):
+        path = "/subs/{0}.vtt".format(index)
+        segment_cues = [c for c in cues if c[1] > start and c[0] < start + SEGMENT_DURATION]
+        server.add_route(path, segment(get_web_vtt(segment_cues)))
+        playlist += ["#EXTINF:60,", path.rsplit("/", 1)[-1]]
+    playlist = "\n".join(playlist + ["#EXT-X-ENDLIST"])
+    url = server.url("/subs/index.m3u8")
+
+    workers = SubtitleHelper.SegmentWorkers
+    for count in (1, workers):
+        SubtitleHelper.SegmentWorkers = count
+        measure_conversion("Convert m3u8srt ({0} thread(s))".format(count),
+                lambda: "".join(transform(playlist, sub_format="m3u8srt", url=url, proxy=None)))
+    SubtitleHelper.SegmentWorkers = workers
+
+    server.stop()
+    stop_logger()
+
+
+if __name__ == "__main__":
+    main()
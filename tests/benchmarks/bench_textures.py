@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+""" Benchmarks fetching 100 missing textures from a local stand-in for the texture CDN, both
+sequentially and concurrently.
+
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from resources.lib.logger import Logger
+from resources.lib.textures.cached import Cached
+from resources.lib.urihandler import UriHandler
+from tests.benchmarks import start_logger, stop_logger, time_action
+from tests.localhttpserver import LocalHttpServer
+
+TEXTURE_COUNT = 100
+TEXTURE_SIZE = 32 * 1024
+# emulated round trip time of the CDN
+LATENCY = 0.03
+
+
+def serve_texture(handler):
+    time.sleep(LATENCY)
+    return 200, {"Content-Type": "image/png"}, b"\x89PNG" + b"0" * (TEXTURE_SIZE - 4)
+
+
+def fetch_all(server, max_workers):
+    profile_dir = tempfile.mkdtemp(prefix="retro_bench_")
+    try:
+        channel_path = os.path.join(profile_dir, "channel.bench", "bench")
+        texture_handler = Cached(server.base_url, profile_dir, "special://profile",
+                                 Logger.instance(), UriHandler.instance())
+        for i in range(TEXTURE_COUNT):
+            texture_handler._get_texture_uri(channel_path, "texture{0}.png".format(i))
+
+        progress = []
+        duration, size = time_action(lambda: texture_handler.fetch_textures(
+            lambda *args: progress.append(args[0]) and False, max_workers=max_workers))
+
+        assert size == TEXTURE_COUNT * TEXTURE_SIZE, size
+        assert progress == list(range(1, TEXTURE_COUNT + 1))
+        assert texture_handler.number_of_missing_textures() == 0
+        print("{0:>2} worker(s): {1:8.1f} ms for {2} textures".format(
+            max_workers, duration * 1000, TEXTURE_COUNT))
+    finally:
+        shutil.rmtree(profile_dir)
+
+
+def main():
+    start_logger("bench_textures")
+    UriHandler.create_uri_handler()
+
+    server = LocalHttpServer()
+    for i in range(TEXTURE_COUNT):
+        server.add_route("/channel.bench.bench/texture{0}.png".format(i), serve_texture)
+    server.start()
+    try:
+        for max_workers in (1, 4, Cached.MaxWorkers):
+            fetch_all(server, max_workers)
+    finally:
+        server.stop()
+        stop_logger()
+
+
+if __name__ == "__main__":
+    main()
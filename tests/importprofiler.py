@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import os
+import subprocess
+import sys
+from collections import namedtuple
+
+ImportTime = namedtuple("ImportTime", ["name", "self", "cumulative", "level"])
+
+# The modules that `resources.lib.addon.run_addon` imports for every action, before the action
+# itself is known.
+RUN_ADDON_MODULES = (
+    "resources.lib.addon",
+    "resources.lib.retroconfig",
+    "resources.lib.helpers.sessionhelper",
+    "resources.lib.logger",
+    "resources.lib.urihandler",
+    "resources.lib.addonsettings",
+    "resources.lib.textures",
+    "resources.lib.plugin",
+)
+
+# The additional modules that the plugin imports for each action.
+ACTION_MODULES = {
+    "list_channels": ("resources.lib.actions.channellistaction",),
+    "list_category": ("resources.lib.actions.categoryaction",),
+    "list_folder": ("resources.lib.actions.folderaction",),
+    "play_video": ("resources.lib.actions.videoaction",),
+    "favourites": ("resources.lib.actions.favouritesaction",),
+    "context_menu": ("resources.lib.actions.contextaction",),
+}
+
+# The marker that separates the imports of the interpreter start-up from the measured ones.
+__MARKER = "import time: -- importprofiler --"
+
+# The script that runs in a fresh interpreter: it creates a (silent) logger first, just like
+# run_addon does, and then imports the modules. It exits without any clean-up, so only the
+# imports are measured.
+__SCRIPT = """
+import importlib
+import os
+import sys
+
+sys.stderr.write("%s\\n" % ({0!r},))
+sys.stderr.flush()
+
+from resources.lib.logger import Logger
+Logger.create_logger(None, "importprofiler", min_log_level=Logger.LVL_CRITICAL + 1)
+for module in sys.argv[1:]:
+    importlib.import_module(module)
+
+sys.stdout.flush()
+sys.stderr.flush()
+os._exit(0)
+""".format(__MARKER)
+
+
+class ImportProfile(object):
+    def __init__(self, import_times):
+        """ The result of profiling the imports of a set of modules.
+
+        :param list[ImportTime] import_times:   The import times in the order Python reported them.
+
+        """
+
+        self.importTimes = import_times
+        self.modules = dict((t.name, t) for t in import_times)
+
+    @property
+    def total(self):
+        """ The total import time in milliseconds.
+
+        :rtype: float
+
+        """
+
+        return sum(t.self for t in self.importTimes) / 1000.0
+
+    def slowest(self, count=10, prefix=""):
+        """ Returns the modules with the largest cumulative import time.
+
+        :param int count:       The number of modules to return.
+        :param str prefix:      Only return modules whose name starts with this prefix.
+
+        :rtype: list[ImportTime]
+
+        """
+
+        times = [t for t in self.importTimes if t.name.startswith(prefix)]
+        return sorted(times, key=lambda t: t.cumulative, reverse=True)[:count]
+
+    def __contains__(self, module):
+        return module in self.modules
+
+
+def profile_imports(modules):
+    """ Imports the modules in a new Python interpreter (`python -X importtime`) and returns the
+    import times that were reported, excluding the imports of the interpreter start-up. The
+    interpreter uses the same environment as the tests, so the Kodi modules are the stubbed ones.
+
+    :param list[str]|tuple[str] modules:    The modules to import, in order.
+
+    :rtype: ImportProfile
+
+    """
+
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    process = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", __SCRIPT] + list(modules),
+        cwd=root, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError("Importing {} failed:\n{}".format(modules, stderr.decode("utf-8", "replace")))
+
+    import_times = []
+    lines = stderr.decode("utf-8", "replace").splitlines()
+    for line in lines[lines.index(__MARKER) + 1:]:
+        if not line.startswith("import time:"):
+            continue
+
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            # the header line
+            continue
+
+        name = parts[2].rstrip()
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        import_times.append(ImportTime(name.strip(), int(parts[0]), int(parts[1]), level))
+    return ImportProfile(import_times)
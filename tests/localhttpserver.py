@@ -0,0 +1,110 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import threading
+
+from future.utils import PY2
+
+if PY2:
+    # noinspection PyUnresolvedReferences,PyCompatibility
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    # noinspection PyUnresolvedReferences,PyCompatibility
+    from SocketServer import ThreadingMixIn
+else:
+    # noinspection PyUnresolvedReferences,PyCompatibility
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    # noinspection PyUnresolvedReferences,PyCompatibility
+    from socketserver import ThreadingMixIn
+
+
+class LocalHttpServer(ThreadingMixIn, HTTPServer):
+    """ A small local HTTP/1.1 (keep-alive) stand-in for remote servers, so tests can run without
+    network access.
+
+    Routes are registered using `add_route` and all received requests are recorded in
+    `requests` as (method, path, headers) tuples.
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), _LocalHttpRequestHandler)
+        self.routes = {}
+        self.requests = []
+        self.__thread = None
+
+    @property
+    def base_url(self):
+        return "http://127.0.0.1:{0}".format(self.server_address[1])
+
+    def url(self, path):
+        return "{0}{1}".format(self.base_url, path)
+
+    def add_route(self, path, body=b"", status=200, headers=None):
+        """ Registers a response for a path.
+
+        :param str path:                        The path (including query) to respond to.
+        :param bytes|str|callable body:         The body or a callable(handler) that returns a
+                                                (status, headers, body) tuple.
+        :param int status:                      The HTTP status code.
+        :param dict[str,str]|None headers:      Additional response headers.
+
+        """
+
+        if not callable(body) and not isinstance(body, bytes):
+            body = body.encode("utf-8")
+        self.routes[path] = (status, headers or {}, body)
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.serve_forever)
+        self.__thread.daemon = True
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.__thread is not None:
+            self.__thread.join()
+
+
+class _LocalHttpRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # noinspection PyPep8Naming
+    def do_GET(self):
+        self.__respond(send_body=True)
+
+    # noinspection PyPep8Naming
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+        self.__respond(send_body=True)
+
+    # noinspection PyPep8Naming
+    def do_HEAD(self):
+        self.__respond(send_body=False)
+
+    # noinspection PyShadowingBuiltins
+    def log_message(self, format, *args):
+        pass
+
+    def __respond(self, send_body):
+        self.server.requests.append((self.command, self.path, dict(self.headers.items())))
+
+        status, headers, body = self.server.routes.get(self.path, (404, {}, b"Not Found"))
+        if callable(body):
+            status, headers, body = body(self)
+            if not isinstance(body, bytes):
+                body = body.encode("utf-8")
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if "Content-Type" not in headers:
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
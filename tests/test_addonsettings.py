@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import copy
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from resources.lib.logger import Logger
+
+
+class SettingsConfig(object):
+    rootDir = None
+    profileDir = None
+    version = None
+
+
+class TestAddonSettings(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        Logger.create_logger(None, str(cls), min_log_level=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        from resources.lib.addonsettings import AddonSettings
+        AddonSettings.clear_cached_addon_settings_object()
+        Logger.instance().close_log()
+
+    def setUp(self):
+        from resources.lib.retroconfig import Config
+        from resources.lib.channelinfo import ChannelInfo
+
+        # a copy of the add-on structure, so the shipped settings.xml is never touched
+        self.folder = tempfile.mkdtemp(prefix="retro_test_")
+        self.config = SettingsConfig()
+        self.config.rootDir = os.path.join(self.folder, "addon")
+        self.config.profileDir = os.path.join(self.folder, "profile")
+        self.config.version = Config.version
+        os.makedirs(os.path.join(self.config.rootDir, "resources", "data"))
+        os.makedirs(self.config.profileDir)
+        template = os.path.join("resources", "data", "settings_template.xml")
+        shutil.copyfile(os.path.join(Config.rootDir, template), os.path.join(self.config.rootDir, template))
+        self.settings_file = os.path.join(self.config.rootDir, "resources", "settings.xml")
+        self.sections_file = os.path.join(self.config.profileDir, "settings_sections.json")
+
+        # copies, so changing them does not change the cached ChannelInfo objects
+        self.channels = []
+        for channel_set in ("een", "vrtnu"):
+            path = os.path.join(Config.rootDir, "channels", "channel.be", channel_set,
+                                "chn_{}.json".format(channel_set))
+            self.channels += [copy.copy(c) for c in ChannelInfo.from_json(path)]
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def __update(self):
+        from resources.lib.addonsettings import AddonSettings
+        AddonSettings.update_add_on_settings_with_channels(list(self.channels), self.config)
+
+    def __read(self, path):
+        with io.open(path, mode="r", encoding="utf-8") as fp:
+            return fp.read()
+
+    def __read_sections(self):
+        return json.loads(self.__read(self.sections_file))
+
+    def test_unchanged_writes_nothing(self):
+        self.__update()
+        for path in (self.settings_file, self.sections_file):
+            os.utime(path, (1, 1))
+
+        self.__update()
+        self.assertEqual(1, os.path.getmtime(self.settings_file))
+        self.assertEqual(1, os.path.getmtime(self.sections_file))
+
+    def test_changed_channel_settings(self):
+        self.__update()
+        sections = self.__read_sections()
+
+        # a marker in the cached country section shows whether it was generated again
+        changed = dict(sections)
+        changed["countries"] = {"hash": sections["countries"]["hash"],
+                                "value": sections["countries"]["value"] + "<!-- cached countries -->"}
+        with io.open(self.sections_file, mode="wb") as fp:
+            fp.write(json.dumps(changed).encode("utf-8"))
+
+        een = [c for c in self.channels if c.moduleName == "chn_een"][0]
+        een.settings = [{"order": 1, "id": "test_setting", "value": 'label="30099" type="bool" default="true"'}]
+        self.__update()
+
+        new_sections = self.__read_sections()
+        self.assertEqual(sections["countries"]["hash"], new_sections["countries"]["hash"])
+        self.assertNotEqual(sections["channel_settings"]["hash"], new_sections["channel_settings"]["hash"])
+        self.assertNotEqual(sections["channel_selection"]["hash"], new_sections["channel_selection"]["hash"])
+
+        contents = self.__read(self.settings_file)
+        self.assertIn("<!-- cached countries -->", contents)
+        self.assertIn('id="channel_{}_test_setting"'.format(een.guid), contents)
+
+    def test_externally_modified_settings(self):
+        self.__update()
+        contents = self.__read(self.settings_file)
+        with io.open(self.settings_file, mode="w", encoding="utf-8") as fp:
+            fp.write(u"<settings />")
+
+        self.__update()
+        self.assertEqual(contents, self.__read(self.settings_file))
+
+    def test_changed_version(self):
+        from resources.lib.version import Version
+
+        self.__update()
+        sections = self.__read_sections()
+
+        # stale sections of an older add-on version should never be used
+        changed = dict(sections)
+        changed["countries"] = {"hash": sections["countries"]["hash"],
+                                "value": sections["countries"]["value"] + "<!-- cached countries -->"}
+        with io.open(self.sections_file, mode="wb") as fp:
+            fp.write(json.dumps(changed).encode("utf-8"))
+
+        self.config.version = Version("999.0.0")
+        self.__update()
+
+        new_sections = self.__read_sections()
+        for name in ("countries", "channel_settings", "channel_selection"):
+            self.assertNotEqual(sections[name]["hash"], new_sections[name]["hash"])
+        self.assertNotIn("<!-- cached countries -->", self.__read(self.settings_file))
@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import shutil
+import tempfile
+import unittest
+
+from resources.lib.logger import Logger
+from resources.lib.urihandler import UriHandler
+from tests.localhttpserver import LocalHttpServer
+
+
+class _Channel(object):
+    def __init__(self, guid, server):
+        """ A channel stand-in that lists the folders of the local HTTP server. """
+
+        self.guid = guid
+        self.server = server
+
+    def init_channel(self):
+        pass
+
+    def process_folder_list(self, item=None):
+        from resources.lib.mediaitem import MediaItem
+
+        url = self.server.url("/main") if item is None else item.url
+        data = UriHandler.open(url)
+        items = []
+        for name in data.split(","):
+            child = MediaItem(name, self.server.url("/{}".format(name)))
+            child.isLive = name.startswith("live")
+            items.append(child)
+        return items
+
+
+class _ChannelInfo(object):
+    def __init__(self, channel):
+        self.channel = channel
+
+    def get_channel(self):
+        return self.channel
+
+
+class TestCacheWarmer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        Logger.create_logger(None, str(cls), min_log_level=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        from resources.lib.addonsettings import AddonSettings
+        AddonSettings.clear_cached_addon_settings_object()
+        Logger.instance().close_log()
+
+    def setUp(self):
+        from resources.lib.pickler import Pickler
+
+        self.cache_dir = tempfile.mkdtemp(prefix="retro_test_")
+        UriHandler._UriHandler__handler = None
+        UriHandler.create_uri_handler(cache_dir=self.cache_dir)
+        self.pickler = Pickler(self.cache_dir)
+
+        self.server = LocalHttpServer().start()
+        cache_headers = {"Cache-Control": "max-age=3600"}
+        self.server.add_route("/main", "live,folder1,folder2,folder3", headers=cache_headers)
+        for name in ("live", "folder1", "folder2", "folder3"):
+            self.server.add_route("/{}".format(name), "{}-a,{}-b".format(name, name), headers=cache_headers)
+        self.channel = _Channel("ABCDEF01-1234-5678-9ABC-DEF012345678", self.server)
+
+    def tearDown(self):
+        self.server.stop()
+        UriHandler._UriHandler__handler = None
+        shutil.rmtree(self.cache_dir)
+
+    def test_warm(self):
+        from resources.lib.cachewarmer import CacheWarmer
+
+        warmer = CacheWarmer([_ChannelInfo(self.channel)], self.pickler, max_folders=2)
+        self.assertEqual(3, warmer.warm())
+
+        # the live folder is skipped and only 2 folders are warmed
+        self.assertEqual(["/main", "/folder1", "/folder2"], [r[1] for r in self.server.requests])
+
+        # the listings are stored
+        main_list = self.channel.process_folder_list(None)
+        store_id = "{}--{}".format(self.channel.guid, main_list[1].guid)
+        self.assertEqual("folder1", self.pickler.de_pickle_media_item(store_id).name)
+        folder = self.channel.process_folder_list(main_list[1])
+        store_id = "{}--{}".format(main_list[1].guid, folder[0].guid)
+        self.assertEqual("folder1-a", self.pickler.de_pickle_media_item(store_id).name)
+
+        # and listing them again are cache hits
+        self.assertEqual(3, len(self.server.requests))
+        self.assertEqual(2, UriHandler.instance().cacheStore.cacheHits)
+
+    def test_stop(self):
+        from resources.lib.cachewarmer import CacheWarmer
+
+        warmer = CacheWarmer([_ChannelInfo(self.channel)], self.pickler,
+                             should_stop=lambda: len(self.server.requests) >= 2)
+        self.assertEqual(2, warmer.warm())
+        self.assertEqual(["/main", "/folder1"], [r[1] for r in self.server.requests])
+
+    def test_failing_channel(self):
+        from resources.lib.cachewarmer import CacheWarmer
+
+        other_channel = _Channel("01234567-ABCD-EF01-2345-6789ABCDEF01", self.server)
+        other_channel.process_folder_list = None
+        warmer = CacheWarmer([_ChannelInfo(other_channel), _ChannelInfo(self.channel)],
+                             self.pickler, max_folders=1, max_workers=1)
+        self.assertEqual(2, warmer.warm())
+
+    def test_service_check(self):
+        from resources.lib.cachewarmer import CacheWarmingService
+
+        class Service(CacheWarmingService):
+            runs = 0
+
+            def warm(self):
+                Service.runs += 1
+
+        settings = {"cache_warming": "false", "http_cache": "true", "cache_warming_interval": "1"}
+        idle = [False]
+        service = Service(None, settings.get, is_idle=lambda: idle[0])
+
+        # disabled
+        self.assertFalse(service.check())
+        # not idle
+        settings["cache_warming"] = "true"
+        self.assertFalse(service.check())
+
+        idle[0] = True
+        self.assertTrue(service.check())
+        # not due
+        self.assertFalse(service.check())
+        self.assertEqual(1, Service.runs)
@@ -84,3 +84,37 @@ class TestChannelImporter(unittest.TestCase):
         # Fetch a simple channel without channel code
         channel = instance.get_channel("channel.be.een", None)
         self.assertEqual("channel.be.een", channel.id)
+
+    def test_channel_index_persisted(self):
+        from resources.lib.helpers.channelimporter import ChannelIndex
+        from resources.lib.retroconfig import Config
+
+        channels = ChannelIndex().get_channels(include_disabled=True)
+        index_path = os.path.join(Config.profileDir, "channelindex.json")
+        self.assertTrue(os.path.isfile(index_path))
+
+        # a new instance should not scan the channel folders again.
+        instance = ChannelIndex()
+        instance._ChannelIndex__scan_channel_sets = None
+        indexed_channels = instance.get_channels(include_disabled=True)
+        self.assertEqual([c.guid for c in channels], [c.guid for c in indexed_channels])
+        self.assertIsNotNone(instance.get_channel("channel.se.svt", "svt"))
+
+    def test_channel_index_outdated(self):
+        import json
+        from resources.lib.helpers.channelimporter import ChannelIndex
+        from resources.lib.retroconfig import Config
+
+        ChannelIndex().get_channels()
+        index_path = os.path.join(Config.profileDir, "channelindex.json")
+        with open(index_path) as fp:
+            index = json.load(fp)
+        index["key"] = "outdated"
+        index["sets"] = []
+        with open(index_path, "w") as fp:
+            json.dump(index, fp)
+
+        channels = ChannelIndex().get_channels()
+        self.assertGreater(len(channels), 50)
+        with open(index_path) as fp:
+            self.assertNotEqual("outdated", json.load(fp)["key"])
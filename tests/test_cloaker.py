@@ -2,6 +2,8 @@
 
 import unittest
 import os
+import shutil
+import tempfile
 from collections import namedtuple
 
 from resources.lib.cloaker import Cloaker
@@ -18,14 +20,12 @@ class TestCloaker(unittest.TestCase):
         Logger.create_logger(None, str(cls), min_log_level=0)
 
     def setUp(self):
-        self.cloakSettings = "settings.json"
+        # the local settings store also writes a channels folder, so use a folder of our own
+        self.folder = tempfile.mkdtemp(prefix="retro_test_")
         self.channel = ChannelInfo(guid="channel.id", id="channel.id.code")
         self.logger = Logger.instance()
 
-        if os.path.isfile(self.cloakSettings):
-            os.remove(self.cloakSettings)
-
-        self.store = localsettings.LocalSettings(".", logger=self.logger)
+        self.store = localsettings.LocalSettings(self.folder, logger=self.logger)
         self.cloaker = Cloaker(channel=self.channel, settings_store=self.store, logger=self.logger)
 
     def tearDown(self):
@@ -33,8 +33,7 @@ class TestCloaker(unittest.TestCase):
         del self.cloaker
         del self.store
 
-        if os.path.isfile(self.cloakSettings):
-            os.remove(self.cloakSettings)
+        shutil.rmtree(self.folder)
 
     def test_setting_first_time_cloak(self):
         self.assertTrue(self.cloaker.cloak("test-url"))
@@ -0,0 +1,148 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from resources.lib.logger import Logger
+
+
+class _Channel(object):
+    def __init__(self, guid, name):
+        self.guid = guid
+        self.channelName = name
+
+
+class TestFavourites(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        Logger.create_logger(None, str(cls), min_log_level=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        from resources.lib.addonsettings import AddonSettings
+        AddonSettings.clear_cached_addon_settings_object()
+        Logger.instance().close_log()
+
+    def setUp(self):
+        from resources.lib.mediaitem import MediaItem
+        from resources.lib.favourites import Favourites
+        self.favourites_class = Favourites
+
+        self.path = tempfile.mkdtemp(prefix="retro_test_")
+        self.channel = _Channel("ABCDEF01-1234-5678-9ABC-DEF012345678", "Channel 1")
+        self.other_channel = _Channel("01234567-ABCD-EF01-2345-6789ABCDEF01", "Channel 2")
+        self.items = [MediaItem("Item {}".format(i), "https://example.com/{}".format(i))
+                      for i in range(3)]
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def __add(self, favourites, channel, item):
+        favourites.add(channel, item, "plugin://plugin.video.retrospect/?action=listfolder&pickle=abc")
+
+    def test_add_and_list(self):
+        favourites = self.favourites_class(self.path)
+        self.__add(favourites, self.channel, self.items[0])
+        self.__add(favourites, self.channel, self.items[1])
+        self.__add(favourites, self.other_channel, self.items[2])
+
+        # a new instance reads them from the store
+        favourites = self.favourites_class(self.path)
+        items = favourites.list(self.channel)
+        self.assertEqual(2, len(items))
+        self.assertEqual(["Item 0", "Item 1"], sorted(i.name for i in items))
+        pickles = [favourites._Favourites__pickler.pickle_media_item(i) for i in self.items[:2]]
+        self.assertEqual(sorted("plugin://plugin.video.retrospect/?action=listfolder&pickle={}".format(p)
+                                for p in pickles), sorted(i.actionUrl for i in items))
+
+        items = list(favourites.list())
+        self.assertEqual(3, len(items))
+        self.assertIn("Item 2 [Channel 2]", [i.name for i in items])
+        self.assertEqual({self.channel.guid: 2, self.other_channel.guid: 1},
+                         favourites.count_per_channel())
+
+    def test_remove(self):
+        favourites = self.favourites_class(self.path)
+        self.__add(favourites, self.channel, self.items[0])
+        self.__add(favourites, self.other_channel, self.items[0])
+        self.__add(favourites, self.channel, self.items[1])
+
+        favourites.remove(self.items[0])
+        favourites = self.favourites_class(self.path)
+        self.assertEqual(["Item 1"], [i.name for i in favourites.list(self.channel)])
+        self.assertEqual({self.channel.guid: 1}, favourites.count_per_channel())
+
+    def test_list_is_lazy(self):
+        favourites = self.favourites_class(self.path)
+        for item in self.items:
+            self.__add(favourites, self.channel, item)
+
+        loaded = []
+        load = favourites.load
+        favourites.load = lambda *args: loaded.append(args[1]) or load(*args)
+
+        items = favourites.list(self.channel)
+        self.assertEqual(0, len(loaded))
+        self.assertEqual(3, len(list(items)))
+        self.assertEqual(3, len(loaded))
+
+        # iterating again, counting and slicing does not load them again
+        self.assertEqual(3, len(list(items)))
+        self.assertEqual(3, len(items))
+        self.assertEqual(2, len(items[:2]))
+        self.assertEqual(3, len(loaded))
+
+    def test_count_only_valid(self):
+        favourites = self.favourites_class(self.path)
+        self.__add(favourites, self.channel, self.items[0])
+        # a favourite that cannot be de-pickled
+        favourites._Favourites__get_store()[self.channel.guid][self.items[0].guid]["pickle"] = "invalid"
+
+        items = favourites.list(self.channel)
+        self.assertEqual(0, len(items))
+        self.assertEqual([], list(items))
+
+    def test_migrate(self):
+        pickle = self.favourites_class(self.path)._Favourites__pickler.pickle_media_item(self.items[0])
+        for channel, content in ((self.channel, "Channel 1\nItem 0\nplugin://?pickle=%s\n" + pickle),
+                                 (self.other_channel, "Channel 2\n\n\n")):
+            file_path = os.path.join(self.path, "{}-{}.xotfav".format(channel.guid, self.items[0].guid))
+            with io.open(file_path, mode="w", encoding="utf-8") as fp:
+                fp.write(content)
+
+        favourites = self.favourites_class(self.path)
+        self.assertEqual({self.channel.guid: 1, self.other_channel.guid: 1},
+                         favourites.count_per_channel())
+        self.assertEqual(["favourites.json"], os.listdir(self.path))
+
+        # the corrupt favourite is removed once listed
+        items = list(favourites.list())
+        self.assertEqual(["Item 0 [Channel 1]"], [i.name for i in items])
+        self.assertEqual("plugin://?pickle={}".format(pickle), items[0].actionUrl)
+        self.assertEqual({self.channel.guid: 1}, self.favourites_class(self.path).count_per_channel())
+
+    def test_migrate_skips_invalid_names(self):
+        file_path = os.path.join(self.path, "invalid.xotfav")
+        with io.open(file_path, mode="w", encoding="utf-8") as fp:
+            fp.write(u"Channel 1\nItem 0\nplugin://\npickle\n")
+
+        favourites = self.favourites_class(self.path)
+        self.assertEqual({}, favourites.count_per_channel())
+        self.assertEqual(["invalid.xotfav"], os.listdir(self.path))
+
+    def test_corrupt_store(self):
+        with io.open(os.path.join(self.path, "favourites.json"), mode="w", encoding="utf-8") as fp:
+            fp.write(u"{corrupt")
+        file_path = os.path.join(self.path, "{}-{}.xotfav".format(self.channel.guid, self.items[0].guid))
+        with io.open(file_path, mode="w", encoding="utf-8") as fp:
+            fp.write(u"Channel 1\nItem 0\nplugin://\npickle\n")
+
+        # the old favourites are still migrated into a new store
+        favourites = self.favourites_class(self.path)
+        self.assertEqual({self.channel.guid: 1}, favourites.count_per_channel())
+        self.__add(favourites, self.channel, self.items[1])
+        self.assertEqual({self.channel.guid: 2}, self.favourites_class(self.path).count_per_channel())
+        self.assertEqual(["favourites.error.json", "favourites.json"], sorted(os.listdir(self.path)))
@@ -78,3 +78,71 @@ class TestJsonHelper(unittest.TestCase):
         data = '{"records":[{"description":"\u849c\u8089","id":282}]}'
         j = jsonhelper.JsonHelper(data, Logger.instance())
         self.assertEqual("蒜肉", j.get_value("records", 0, "description"))
+
+    def test_extract_embedded(self):
+        data = '<html><script>window.__STATE__ = {"a": "}; </script>", "b": [1, {"c": "\\"{"}]};' \
+               '</script><script>var other = {"d": 1};</script></html>'
+        j = jsonhelper.JsonHelper.from_embedded(data, "window.__STATE__", logger=Logger.instance())
+        self.assertEqual("}; </script>", j.get_value("a"))
+        self.assertEqual('"{', j.get_value("b", 1, "c"))
+        self.assertEqual({"a": "}; </script>", "b": [1, {"c": '"{'}]},
+                         jsonhelper.JsonHelper.loads(j.data))
+
+    def test_extract_embedded_markers(self):
+        data = b'root["second"] = [1, 2];'
+        self.assertEqual([1, 2], jsonhelper.JsonHelper.extract_embedded(
+            data, ("root['first'] = ", 'root["second"] = ')))
+        self.assertIsNone(jsonhelper.JsonHelper.extract_embedded(data, "missing"))
+        self.assertIsNone(jsonhelper.JsonHelper.from_embedded(data, "missing"))
+
+    def test_extract_embedded_last(self):
+        # pages with both roots: the last assignment in the document is used, not the first marker
+        data = 'root["__reduxStore"] = {"a": 1};root["__svtplay"] = {"b": 2};root["__reduxStore"] = {"c": 3};' \
+               'root["other"] = {};'
+        markers = ('root["__svtplay"] = ', 'root["__reduxStore"] = ')
+        self.assertEqual({"b": 2}, jsonhelper.JsonHelper.extract_embedded(data, markers))
+        self.assertEqual({"c": 3}, jsonhelper.JsonHelper.extract_embedded(data, markers, last=True))
+        self.assertEqual({"b": 2}, jsonhelper.JsonHelper.extract_embedded(data[:70], markers, last=True))
+        self.assertIsNone(jsonhelper.JsonHelper.extract_embedded(data, "missing", last=True))
+
+    def test_extract_embedded_members(self):
+        # shaped like a Viafree page: the state has "staticpages" followed by "page" and more
+        data = '<script>window.__initialState__ = {"config": {"page": "wrong"}, ' \
+               '"staticpages": {"page": {"blocks": []}}, ' \
+               '"page": {"blocks": [{"_embedded": {"programs": [1, 2]}, ' \
+               '"allPrograms": {"categories": ["drama"]}}]}, ' \
+               '"translations": {"search": "Search"}};</script>'
+        j = jsonhelper.JsonHelper.from_object(
+            jsonhelper.JsonHelper.extract_embedded(data, '"staticpages":', members=True))
+        self.assertEqual([1, 2], j.get_value("page", "blocks", 0, "_embedded", "programs"))
+        self.assertEqual(["drama"], j.get_value("page", "blocks", 0, "allPrograms", "categories"))
+        self.assertEqual({"page": {"blocks": []}}, j.get_value("staticpages"))
+        self.assertIsNone(jsonhelper.JsonHelper.extract_embedded(data, '"missing":', members=True))
+
+    def test_bytes(self):
+        data = b'  \n{"records":[{"description":"\xe8\x92\x9c\xe8\x82\x89","id":282}]}\n'
+        j = jsonhelper.JsonHelper(data, Logger.instance())
+        self.assertEqual("蒜肉", j.get_value("records", 0, "description"))
+        self.assertEqual('{"records":[{"description":"蒜肉","id":282}]}', j.data)
+
+    def test_no_standard_start_data(self):
+        j = jsonhelper.JsonHelper(b' callback( {"success":true} );', logger=Logger.instance())
+        self.assertEqual({"success": True}, j.json)
+        self.assertEqual('{"success":true}', j.data)
+
+    def test_from_object_data(self):
+        j = jsonhelper.JsonHelper.from_object({"success": True})
+        self.assertEqual('{"success": true}', j.data)
+
+    def test_compile_path(self):
+        path = jsonhelper.JsonHelper.compile_path("test3", "test")
+        self.assertIs(path, jsonhelper.JsonHelper.compile_path("test3", "test"))
+
+        j = jsonhelper.JsonHelper('{"test": [1, 2], "test3": {"test": true}}', logger=Logger.instance())
+        self.assertEqual(True, j.get_value(path))
+        self.assertEqual(2, j.get_value(jsonhelper.JsonHelper.compile_path("test", 1)))
+        self.assertEqual(j.json, j.get_value(jsonhelper.JsonHelper.compile_path()))
+
+        missing = jsonhelper.JsonHelper.compile_path("test3", "test2")
+        self.assertEqual("yes", j.get_value(missing, fallback="yes"))
+        self.assertIsNone(j.get_value(missing))
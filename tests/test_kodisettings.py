@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from collections import namedtuple
+
+from resources.lib.logger import Logger
+from resources.lib.settings.kodisettings import KodiSettings
+
+# Dummy Channel Info object
+ChannelInfo = namedtuple("ChannelInfo", ["guid", "id"])
+
+
+class TestKodiSettings(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        Logger.create_logger(None, str(cls), min_log_level=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        Logger.instance().close_log()
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp(prefix="retro_test_")
+        self.channel = ChannelInfo(guid="GUID", id="channel.id.code")
+
+    def tearDown(self):
+        shutil.rmtree(self.profile_dir)
+
+    def __write_settings(self, content):
+        with io.open(os.path.join(self.profile_dir, "settings.xml"), mode="w", encoding="utf-8") as fp:
+            fp.write(content)
+
+    def test_snapshot(self):
+        self.__write_settings(
+            '<settings version="2">\n'
+            '    <setting id="list_limit">7</setting>\n'
+            '    <setting id="hide_fanart" default="true">false</setting>\n'
+            '    <setting id="empty" default="true" />\n'
+            '    <setting id="channel_GUID_bitrate">&lt;1000&gt;</setting>\n'
+            '</settings>')
+
+        store = KodiSettings(Logger.instance(), profile_dir=self.profile_dir)
+        self.assertEqual(7, store.get_integer_setting("list_limit"))
+        self.assertFalse(store.get_boolean_setting("hide_fanart"))
+        self.assertEqual("default", store.get_setting("empty", default="default"))
+        self.assertEqual("<1000>", store.get_setting("bitrate", channel=self.channel))
+
+        store.set_setting("list_limit", 10)
+        self.assertEqual(10, store.get_integer_setting("list_limit"))
+
+    def test_snapshot_kodi_17(self):
+        self.__write_settings('<settings>\n    <setting id="list_limit" value="3" />\n</settings>')
+
+        store = KodiSettings(Logger.instance(), profile_dir=self.profile_dir)
+        self.assertEqual(3, store.get_integer_setting("list_limit"))
+
+    def test_snapshot_invalid_file(self):
+        self.__write_settings('<settings><setting id="list_limit">3')
+
+        # it falls back to Kodi
+        store = KodiSettings(Logger.instance(), profile_dir=self.profile_dir)
+        self.assertEqual(KodiSettings(Logger.instance()).get_setting("list_limit"),
+                         store.get_setting("list_limit"))
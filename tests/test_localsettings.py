@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from collections import namedtuple
+
+from resources.lib.logger import Logger
+from resources.lib.settings.localsettings import LocalSettings
+
+# Dummy Channel Info object
+ChannelInfo = namedtuple("ChannelInfo", ["guid", "id"])
+
+
+class TestLocalSettings(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        Logger.create_logger(None, str(cls), min_log_level=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        Logger.instance().close_log()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="retro_test_")
+        self.settings_file = os.path.join(self.folder, "settings.json")
+        self.channel = ChannelInfo(guid="channel.guid", id="channel.id.code")
+        self.other_channel = ChannelInfo(guid="other.guid", id="other.id.code")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def __read(self, *path):
+        with io.open(os.path.join(self.folder, *path), mode="rb") as fp:
+            return json.loads(fp.read().decode("utf-8"))
+
+    def test_write_behind(self):
+        store = LocalSettings(self.folder, Logger.instance())
+        store.set_setting("general", 1)
+        store.set_setting("cloaked", {"url": "name"}, channel=self.channel)
+        store.set_setting("cloaked", {"url": "other"}, channel=self.channel)
+        self.assertFalse(os.path.isfile(self.settings_file))
+        self.assertEqual({"url": "other"}, store.get_setting("cloaked", channel=self.channel))
+
+        store.flush()
+        self.assertEqual({"settings": {"general": 1}}, self.__read("settings.json"))
+        self.assertEqual({"cloaked": {"url": "other"}}, self.__read("channels", "channel.id.code.json"))
+        self.assertFalse(os.path.isfile(os.path.join(self.folder, "channels", "other.id.code.json")))
+        with io.open(self.settings_file, mode="rb") as fp:
+            self.assertNotIn(b" ", fp.read())
+
+        # a new store reads them back
+        del store
+        store = LocalSettings(self.folder, Logger.instance())
+        self.assertEqual(1, store.get_setting("general"))
+        self.assertEqual({"url": "other"}, store.get_setting("cloaked", channel=self.channel))
+        self.assertIsNone(store.get_setting("cloaked", channel=self.other_channel))
+
+    def test_migrate(self):
+        with io.open(self.settings_file, mode="wb") as fp:
+            fp.write(json.dumps({
+                "settings": {"general": 1},
+                "channels": {"channel.id.code": {"usage": 2}, "other.id.code": {"usage": 3}}
+            }, indent=4).encode("utf-8"))
+
+        store = LocalSettings(self.folder, Logger.instance())
+        self.assertEqual(2, store.get_setting("usage", channel=self.channel))
+        self.assertEqual(3, store.get_setting("usage", channel=self.other_channel))
+
+        store.flush()
+        del store
+        self.assertEqual({"settings": {"general": 1}}, self.__read("settings.json"))
+        self.assertEqual({"usage": 3}, self.__read("channels", "other.id.code.json"))
+
+        store = LocalSettings(self.folder, Logger.instance())
+        self.assertEqual(2, store.get_setting("usage", channel=self.channel))
+        self.assertEqual(1, store.get_setting("general"))
+
+    def test_corrupt_file(self):
+        with io.open(self.settings_file, mode="wb") as fp:
+            fp.write(b"{corrupt")
+
+        store = LocalSettings(self.folder, Logger.instance())
+        self.assertIsNone(store.get_setting("general"))
+        self.assertTrue(os.path.isfile(os.path.join(self.folder, "settings.error.json")))
+
+    def test_delete_flushes(self):
+        store = LocalSettings(self.folder, Logger.instance())
+        store.set_setting("general", 2)
+        store.set_setting("usage", 3, channel=self.channel)
+        del store
+
+        self.assertEqual({"settings": {"general": 2}}, self.__read("settings.json"))
+        self.assertEqual({"usage": 3}, self.__read("channels", "channel.id.code.json"))
@@ -135,3 +135,45 @@ class TestLogger(unittest.TestCase):
             content = fp.readlines()
             lines = len(content)
             self.assertEqual(6, lines)
+
+    def test_is_enabled(self):
+        self.assertFalse(Logger.is_enabled(Logger.LVL_CRITICAL))
+        self.__logger = Logger.create_logger(self.output_log_file, "test_is_enabled",
+                                             min_log_level=Logger.LVL_INFO)
+        self.assertFalse(Logger.is_enabled(Logger.LVL_TRACE))
+        self.assertFalse(Logger.is_enabled(Logger.LVL_DEBUG))
+        self.assertTrue(Logger.is_enabled(Logger.LVL_INFO))
+        self.assertTrue(Logger.is_enabled(Logger.LVL_ERROR))
+
+    def test_caller(self):
+        self.__logger = Logger.create_logger(self.output_log_file, "test_caller")
+        for _ in range(2):
+            Logger.info("Caller")
+        Logger.instance().close_log()
+
+        with io.open(self.output_log_file, 'r') as fp:
+            lines = fp.readlines()
+        self.assertEqual(3, len(lines))
+        self.assertEqual(lines[0][20:], lines[1][20:])
+        self.assertIn("- test_logger.py ", lines[0])
+
+    def test_write_from_threads(self):
+        import threading
+
+        self.__logger = Logger.create_logger(self.output_log_file, "test_write_from_threads")
+
+        def log_lines(name):
+            for i in range(100):
+                Logger.info("%s line %s", name, i)
+
+        threads = [threading.Thread(target=log_lines, args=(str(t),)) for t in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        Logger.instance().close_log()
+
+        with io.open(self.output_log_file, 'r') as fp:
+            lines = fp.readlines()
+        self.assertEqual(401, len(lines))
+        self.assertTrue(lines[-1].rstrip().endswith("Flushing and closing logfile."))
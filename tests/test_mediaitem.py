@@ -0,0 +1,98 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import pickle
+import unittest
+from datetime import datetime
+
+from resources.lib.logger import Logger
+
+
+class TestMediaItem(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        Logger.create_logger(None, str(cls), min_log_level=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        from resources.lib.addonsettings import AddonSettings
+        AddonSettings.clear_cached_addon_settings_object()
+        Logger.instance().close_log()
+
+    def setUp(self):
+        from resources.lib.mediaitem import MediaItem
+        from resources.lib.helpers.encodinghelper import EncodingHelper
+        self.media_item_class = MediaItem
+        self.guid = "%s%s" % (EncodingHelper.encode_md5(" Title "), EncodingHelper.encode_md5("https://example.com"))
+
+    def test_no_dict(self):
+        item = self.media_item_class("Title", "https://example.com")
+        self.assertFalse(hasattr(item, "__dict__"))
+        self.assertRaises(AttributeError, setattr, item, "Complete", True)
+
+    def test_lazy_guid(self):
+        item = self.media_item_class(" Title ", "https://example.com")
+        self.assertEqual("Title", item.name)
+
+        # the guid uses the original title and url
+        item.name = "Other title"
+        item.url = "https://example.com/other"
+        self.assertEqual(self.guid, item.guid)
+        self.assertEqual(int(self.guid, 16), item.guidValue)
+        self.assertEqual(hash(int(self.guid, 16)), hash(item))
+        self.assertEqual(self.media_item_class(" Title ", "https://example.com"), item)
+        self.assertNotEqual(self.media_item_class("Title", "https://example.com"), item)
+
+    def test_lazy_containers(self):
+        item = self.media_item_class("Title", "https://example.com")
+        self.assertFalse(item.has_info())
+        self.assertFalse(item.has_track())
+        self.assertFalse(item.has_media_item_parts())
+
+        item.HttpHeaders["Referer"] = "https://example.com"
+        item.metaData = {"key": "value"}
+        item.append_single_stream("https://example.com/stream.m3u8")
+        self.assertEqual({"Referer": "https://example.com"}, item.HttpHeaders)
+        self.assertEqual({"key": "value"}, item.metaData)
+        self.assertTrue(item.has_media_item_parts())
+        self.assertEqual([], item.items)
+
+    def test_pickle(self):
+        item = self.media_item_class(" Title ", "https://example.com", type="video")
+        item.set_info_label("Genre", "Documentary")
+        item.set_date(2020, 1, 2)
+        part = item.append_single_stream("https://example.com/stream.m3u8", 1200)
+        part.HttpHeaders["Referer"] = "https://example.com"
+
+        copy = pickle.loads(pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(self.guid, copy.guid)
+        self.assertEqual("Title", copy.name)
+        self.assertEqual("video", copy.type)
+        self.assertTrue(copy.has_info())
+        self.assertEqual(item._MediaItem__timestamp, copy._MediaItem__timestamp)
+        self.assertEqual(item.MediaItemParts, copy.MediaItemParts)
+        self.assertEqual({"Referer": "https://example.com"}, copy.MediaItemParts[0].HttpHeaders)
+        self.assertEqual(1200, copy.MediaItemParts[0].MediaStreams[0].Bitrate)
+
+    def test_setstate_from_dict(self):
+        # the __dict__ of an item that was pickled before MediaItem had slots
+        state = {
+            "name": "Title", "tv_show_title": None, "url": "https://example.com",
+            "actionUrl": None, "MediaItemParts": [], "description": "Description",
+            "thumb": "", "fanart": "", "icon": "", "type": "video", "dontGroup": False,
+            "isLive": True, "isGeoLocked": False, "isDrmProtected": False, "isPaid": False,
+            "_MediaItem__date": "02-01-2020", "_MediaItem__timestamp": datetime(2020, 1, 2),
+            "_MediaItem__expires_datetime": None, "_MediaItem__infoLabels": {"Genre": "News"},
+            "complete": True, "items": [], "HttpHeaders": {}, "isCloaked": False,
+            "metaData": {"key": "value"}, "guid": self.guid, "guidValue": int(self.guid, 16),
+            "removedAttribute": True
+        }
+
+        item = self.media_item_class.__new__(self.media_item_class)
+        item.__setstate__(state)
+        self.assertEqual("Description", item.description)
+        self.assertTrue(item.isLive)
+        self.assertTrue(item.has_date())
+        self.assertTrue(item.has_info())
+        self.assertEqual({"key": "value"}, item.metaData)
+        self.assertEqual(self.guid, item.guid)
+        self.assertEqual(int(self.guid, 16), item.guidValue)
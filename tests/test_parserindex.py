@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import unittest
+
+from resources.lib.parserdata import ParserData
+from resources.lib.parserindex import ParserIndex
+
+
+class TestParserIndex(unittest.TestCase):
+    def setUp(self):
+        self.data_parsers = {}
+
+    def test_prefix(self):
+        self.__add("https://example.com/")
+        self.__add("https://example.com/programs")
+        self.__add("https://example.com/programs/a")
+        self.__add("https://example.org/")
+
+        self.__assert_find("https://example.com/programs/a/1", "https://example.com/programs/a")
+        self.__assert_find("https://example.com/programs/b", "https://example.com/programs")
+        self.__assert_find("https://example.com/video", "https://example.com/")
+        self.__assert_find("https://example.org/", "https://example.org/")
+        self.__assert_find("https://example.net/", None)
+
+    def test_match_types(self):
+        self.__add("https://example.com/")
+        self.__add("https://example.com/live", ParserData.MatchExact)
+        self.__add(".m3u8", ParserData.MatchEnd)
+        self.__add("/episodes/", ParserData.MatchContains)
+        self.__add(r"https://example.com/(\w+)/(\d+)$", ParserData.MatchRegex)
+        self.__add("#alphalisting", ParserData.MatchExact)
+
+        self.__assert_find("https://example.com/live", "https://example.com/live")
+        self.__assert_find("https://example.com/live/x", "https://example.com/")
+        self.__assert_find("https://example.net/stream.m3u8", ".m3u8")
+        self.__assert_find("https://example.net/show/episodes/", "/episodes/")
+        self.__assert_find("https://example.com/video/123", r"https://example.com/(\w+)/(\d+)$")
+        self.__assert_find("https://example.com/video/abc", "https://example.com/")
+
+    def test_mixed_types_for_one_key(self):
+        self.__add("https://example.com/api")
+        self.__add("https://example.com/api", ParserData.MatchExact)
+
+        self.__assert_find("https://example.com/api", "https://example.com/api")
+        self.__assert_find("https://example.com/api/2", "https://example.com/api")
+
+    def test_equal_length_keeps_registration_order(self):
+        self.__add("abc", ParserData.MatchContains)
+        self.__add("xyz", ParserData.MatchContains)
+
+        self.__assert_find("xyz-abc", "abc")
+
+    def test_regex_order(self):
+        self.__add(r"https://(example)\.com/(a)?.*", ParserData.MatchRegex)
+        self.__add(r"https://example\.com/.+", ParserData.MatchRegex)
+        self.__add(r"https://(?P<host>example)\.com/b", ParserData.MatchRegex)
+
+        # longer keys go first
+        self.__assert_find("https://example.com/b", r"https://(?P<host>example)\.com/b")
+        self.__assert_find("https://EXAMPLE.com/", r"https://(example)\.com/(a)?.*")
+        self.__assert_find("https://example.net/", None)
+
+    def test_regex_with_back_reference(self):
+        self.__add(r"https://(\w+)\.com/\1$", ParserData.MatchRegex)
+        self.__add(r"https://\w+\.com/.+$", ParserData.MatchRegex)
+
+        self.__assert_find("https://example.com/example", r"https://(\w+)\.com/\1$")
+        self.__assert_find("https://example.com/other", r"https://\w+\.com/.+$")
+
+    def test_regex_with_conditional_group(self):
+        self.__add(r"https://(other)\.example\.com/.+$", ParserData.MatchRegex)
+        self.__add(r"https://(www\.)?example\.com/(?(1)www|plain)$", ParserData.MatchRegex)
+
+        self.__assert_find("https://www.example.com/www", r"https://(www\.)?example\.com/(?(1)www|plain)$")
+        self.__assert_find("https://example.com/plain", r"https://(www\.)?example\.com/(?(1)www|plain)$")
+        self.__assert_find("https://example.com/www", None)
+
+    def test_regex_with_inline_flags(self):
+        self.__add(r"https://example\.com/with space$", ParserData.MatchRegex)
+        self.__add(r"(?x) https://example\.org/ verbose $", ParserData.MatchRegex)
+
+        # the verbose flag only applies to its own regex
+        self.__assert_find("https://example.com/with space", r"https://example\.com/with space$")
+        self.__assert_find("https://example.com/withspace", None)
+        self.__assert_find("https://example.org/verbose", r"(?x) https://example\.org/ verbose $")
+
+    def test_index_is_shared(self):
+        self.__add("https://example.com/")
+        index = ParserIndex.get_index(self.data_parsers)
+        self.assertIs(index, ParserIndex.get_index(dict(self.data_parsers)))
+
+        self.__add("https://example.com/other")
+        self.assertIsNot(index, ParserIndex.get_index(self.data_parsers))
+
+    def __add(self, url, match_type=ParserData.MatchStart):
+        data = ParserData(url)
+        data.MatchType = match_type
+        self.data_parsers.setdefault(url, []).append(data)
+
+    def __assert_find(self, url, expected):
+        self.assertEqual(expected, ParserIndex.get_index(self.data_parsers).find(url))
+
+        # it should match the result of trying each key in order
+        legacy = None
+        for key in sorted(self.data_parsers.keys(), key=len, reverse=True):
+            if [d for d in self.data_parsers[key] if d.matches(url)]:
+                legacy = key
+                break
+        self.assertEqual(legacy, expected)
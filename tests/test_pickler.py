@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import zlib
+
+from resources.lib.logger import Logger
+
+
+class TestPickler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        Logger.create_logger(None, str(cls), min_log_level=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        from resources.lib.addonsettings import AddonSettings
+        AddonSettings.clear_cached_addon_settings_object()
+        Logger.instance().close_log()
+
+    def setUp(self):
+        from resources.lib.mediaitem import MediaItem
+        from resources.lib.pickler import Pickler
+        self.pickler_class = Pickler
+
+        self.store_path = tempfile.mkdtemp(prefix="retro_test_")
+        self.store_guid = "ABCDEF01-1234-5678-9ABC-DEF012345678"
+        self.parent = MediaItem("Parent", "https://example.com/parent")
+        self.children = [MediaItem("Child {}".format(i), "https://example.com/{}".format(i))
+                         for i in range(10)]
+
+    def tearDown(self):
+        shutil.rmtree(self.store_path)
+
+    def test_store_and_retrieve(self):
+        pickler = self.pickler_class(self.store_path)
+        pickler.store_media_items(self.store_guid, self.parent, self.children)
+
+        for child in (self.children[0], self.children[5], self.children[-1]):
+            store_id = "{}--{}".format(self.store_guid, child.guid)
+            self.assertTrue(pickler.is_pickle_store_id(store_id))
+            item = pickler.de_pickle_media_item(store_id)
+            self.assertEqual(child.name, item.name)
+            self.assertEqual(child.url, item.url)
+            self.assertIsNone(pickler.validate(item))
+
+    def test_store_without_parent(self):
+        pickler = self.pickler_class(self.store_path)
+        pickler.store_media_items(self.store_guid, None, self.children)
+
+        item = pickler.de_pickle_media_item("{}--{}".format(self.store_guid, self.children[2].guid))
+        self.assertEqual(self.children[2].name, item.name)
+
+    def test_retrieve_missing(self):
+        pickler = self.pickler_class(self.store_path)
+        pickler.store_media_items(self.store_guid, self.parent, self.children)
+        self.assertIsNone(pickler.de_pickle_media_item("{}--{}".format(self.store_guid, "missing")))
+
+    def test_retrieve_legacy_store(self):
+        store_guid = self.store_guid.lower()
+        store_dir = os.path.join(self.store_path, "pickles", store_guid[0:2], store_guid[2:4])
+        os.makedirs(store_dir)
+        content = {"parent": self.parent, "children": {c.guid: c for c in self.children}}
+        with io.open(os.path.join(store_dir, "{}.store.z".format(store_guid)), "wb") as fp:
+            fp.write(zlib.compress(pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL)))
+
+        pickler = self.pickler_class(self.store_path)
+        item = pickler.de_pickle_media_item("{}--{}".format(self.store_guid, self.children[3].guid))
+        self.assertEqual(self.children[3].name, item.name)
+
+    def test_retrieve_all_items(self):
+        from resources.lib.mediaitem import MediaItem
+        children = [MediaItem("Child {}".format(i), "https://example.com/{}".format(i)) for i in range(70)]
+
+        pickler = self.pickler_class(self.store_path)
+        pickler.store_media_items(self.store_guid, self.parent, children)
+        items = pickler.retrieve_media_items(self.store_guid, self.parent.url, 60)
+        self.assertEqual([c.guid for c in children], [i.guid for i in items])
+        self.assertEqual(children[-1].name, items[-1].name)
+
+        # another url or too old
+        self.assertIsNone(pickler.retrieve_media_items(self.store_guid, "https://example.com/other", 60))
+        self.assertIsNone(pickler.retrieve_media_items(self.store_guid, self.parent.url, -1))
+
+        # the main list
+        pickler.store_media_items(self.store_guid, None, children[:5])
+        items = pickler.retrieve_media_items(self.store_guid, None, 60)
+        self.assertEqual([c.guid for c in children[:5]], [i.guid for i in items])
+
+    def test_retrieve_all_items_with_duplicates(self):
+        pickler = self.pickler_class(self.store_path)
+        pickler.store_media_items(self.store_guid, self.parent, self.children + self.children[:1])
+        self.assertIsNone(pickler.retrieve_media_items(self.store_guid, self.parent.url, 60))
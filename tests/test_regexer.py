@@ -0,0 +1,48 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import types
+import unittest
+
+from resources.lib.logger import Logger
+from resources.lib.regexer import Regexer
+
+
+class TestRegexer(unittest.TestCase):
+    data = '<a href="/1">One</a><a href="/2" class="x">Two</a><a href="/3">Three</a><b>Four</b>'
+
+    @classmethod
+    def setUpClass(cls):
+        Logger.create_logger(None, str(cls), min_log_level=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        Logger.instance().close_log()
+
+    def test_iter_is_lazy(self):
+        results = Regexer.iter_regex(r'href="([^"]+)"', self.data)
+        self.assertIsInstance(results, types.GeneratorType)
+        self.assertEqual("/1", next(results))
+
+    def test_iter_no_groups(self):
+        self.__assert_same(r'<a[^>]+>')
+
+    def test_iter_single_group(self):
+        self.__assert_same(r'href="([^"]+)"')
+
+    def test_iter_multiple_groups(self):
+        self.__assert_same(r'href="([^"]+)"(?: class="([^"]+)")?>([^<]+)')
+
+    def test_iter_dictionary(self):
+        self.__assert_same(r'href="(?P<url>[^"]+)"(?: class="(?P<class>[^"]+)")?>(?P<title>[^<]+)')
+
+    def test_iter_multiple_regexes(self):
+        self.__assert_same([
+            r'<b>([^<]+)',
+            r'<i>([^<]+)',
+            r'href="(?P<url>[^"]+)"',
+            r'<u>(?P<title>[^<]+)',
+            r'href="([^"]+)"[^>]*>([^<]+)',
+        ])
+
+    def __assert_same(self, regex):
+        self.assertEqual(Regexer.do_regex(regex, self.data), list(Regexer.iter_regex(regex, self.data)))
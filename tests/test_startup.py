@@ -0,0 +1,32 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import sys
+import unittest
+
+from tests.importprofiler import profile_imports, RUN_ADDON_MODULES, ACTION_MODULES
+
+
+@unittest.skipIf(sys.version_info < (3, 7), "`python -X importtime` needs Python 3.7 or higher")
+class TestStartup(unittest.TestCase):
+    """ Checks the start-up imports of the add-on. Every click in Kodi starts a new run of
+    `run_addon`, which imports the add-on modules before it knows which action to perform.
+
+    None of the `ExpensiveModules` should be imported. They are only imported once they are
+    actually used (for instance, `requests` once the first http request is made). The import
+    times themselves are reported (and checked against a budget) by `bench_startup`.
+
+    """
+
+    ExpensiveModules = ("requests", "urllib3", "http.cookiejar", "xml.dom.minidom")
+
+    def test_run_addon_imports(self):
+        self.__assert_no_expensive_imports("run_addon", RUN_ADDON_MODULES)
+
+    def test_action_imports(self):
+        for name, modules in ACTION_MODULES.items():
+            self.__assert_no_expensive_imports(name, RUN_ADDON_MODULES + modules)
+
+    def __assert_no_expensive_imports(self, name, modules):
+        profile = profile_imports(modules)
+        for module in self.ExpensiveModules:
+            self.assertNotIn(module, profile, "'{}' imports '{}'".format(name, module))
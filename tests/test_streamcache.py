@@ -0,0 +1,164 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from resources.lib.connectivity.streamcache import StreamCache
+from resources.lib.logger import Logger
+
+
+class TestStreamCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        Logger.create_logger(None, str(cls), min_log_level=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        Logger.instance().close_log()
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="retro_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_set_and_get(self):
+        cache = StreamCache(self.cache_dir)
+        self.assertFalse(cache.has_cache_key("key"))
+
+        with cache.set("key") as fp:
+            fp.write(b"lorem ipsum")
+
+        self.assertTrue(cache.has_cache_key("key"))
+        self.assertEqual(11, cache.size)
+        self.assertEqual(b"lorem ipsum", cache.read("key"))
+        with cache.get("key") as fp:
+            self.assertEqual(b"lorem", fp.read(5))
+
+    def test_set_replaces_on_close(self):
+        cache = StreamCache(self.cache_dir)
+        with cache.set("key") as fp:
+            fp.write(b"lorem ipsum")
+
+        with cache.set("key") as fp:
+            fp.write(b"dolor")
+            # readers keep seeing the old content until the new one is complete
+            self.assertEqual(b"lorem ipsum", cache.read("key"))
+        self.assertEqual(b"dolor", cache.read("key"))
+        self.assertEqual(5, cache.size)
+        self.assertEqual(["key"], os.listdir(cache.cachePath))
+
+    def test_set_discarded_on_error(self):
+        cache = StreamCache(self.cache_dir)
+        with cache.set("key") as fp:
+            fp.write(b"lorem ipsum")
+
+        with self.assertRaises(IOError):
+            with cache.set("key") as fp:
+                fp.write(b"dolor")
+                raise IOError("Connection lost")
+
+        self.assertEqual(b"lorem ipsum", cache.read("key"))
+        self.assertEqual(11, cache.size)
+        self.assertEqual(["key"], os.listdir(cache.cachePath))
+
+    def test_index_persisted(self):
+        cache = StreamCache(self.cache_dir)
+        with cache.set("key") as fp:
+            fp.write(b"lorem ipsum")
+        cache.flush()
+
+        cache = StreamCache(self.cache_dir)
+        self.assertTrue(cache.has_cache_key("key"))
+        self.assertEqual(11, cache.size)
+        self.assertFalse(cache.is_expired("key", 3600))
+
+    def test_lru_eviction(self):
+        cache = StreamCache(self.cache_dir, max_size=100)
+        for key in ("a", "b", "c"):
+            with cache.set(key) as fp:
+                fp.write(b"0" * 30)
+        self.assertEqual(90, cache.size)
+
+        # using 'a' makes 'b' the least recently used one
+        cache.read("a")
+        with cache.set("d") as fp:
+            fp.write(b"0" * 30)
+
+        self.assertEqual(90, cache.size)
+        self.assertFalse(cache.has_cache_key("b"))
+        self.assertFalse(os.path.isfile(os.path.join(cache.cachePath, "b")))
+        self.assertTrue(cache.has_cache_key("a"))
+        self.assertTrue(cache.has_cache_key("c"))
+        self.assertTrue(cache.has_cache_key("d"))
+
+    def test_expired(self):
+        cache = StreamCache(self.cache_dir)
+        with cache.set("key") as fp:
+            fp.write(b"lorem ipsum")
+
+        self.assertFalse(cache.is_expired("key", 3600))
+        self.assertFalse(cache.is_expired("missing", 0))
+        time.sleep(0.01)
+        self.assertTrue(cache.is_expired("key", 0))
+
+    def test_purge(self):
+        cache = StreamCache(self.cache_dir)
+        with cache.set("key") as fp:
+            fp.write(b"lorem ipsum")
+
+        cache.purge(3600)
+        self.assertTrue(cache.has_cache_key("key"))
+        time.sleep(0.01)
+        cache.purge(0)
+        self.assertFalse(cache.has_cache_key("key"))
+        self.assertEqual(0, cache.size)
+
+    def test_rebuild_index_from_files(self):
+        cache = StreamCache(self.cache_dir)
+        with open(os.path.join(cache.cachePath, "orphan"), "wb") as fp:
+            fp.write(b"lorem ipsum")
+
+        # a new store without index should pick up the file
+        cache = StreamCache(self.cache_dir)
+        self.assertTrue(cache.has_cache_key("orphan"))
+        self.assertEqual(11, cache.size)
+
+    def test_missing_file(self):
+        cache = StreamCache(self.cache_dir)
+        with cache.set("key") as fp:
+            fp.write(b"lorem ipsum")
+        os.remove(os.path.join(cache.cachePath, "key"))
+
+        self.assertRaises(IOError, cache.get, "key")
+        self.assertFalse(cache.has_cache_key("key"))
+
+    def test_merge_index(self):
+        cache_1 = StreamCache(self.cache_dir)
+        cache_2 = StreamCache(self.cache_dir)
+        with cache_1.set("key1") as fp:
+            fp.write(b"lorem ipsum")
+        cache_1.flush()
+
+        # make sure the modification time of the index differs
+        time.sleep(0.01)
+        os.utime(os.path.join(cache_1.cachePath, "index.json"), (1, 1))
+        with cache_2.set("key2") as fp:
+            fp.write(b"lorem ipsum")
+        cache_2.flush()
+
+        cache = StreamCache(self.cache_dir)
+        self.assertTrue(cache.has_cache_key("key1"))
+        self.assertTrue(cache.has_cache_key("key2"))
+
+    def test_clear(self):
+        cache = StreamCache(self.cache_dir)
+        with cache.set("key") as fp:
+            fp.write(b"lorem ipsum")
+        cache.clear()
+
+        self.assertFalse(cache.has_cache_key("key"))
+        self.assertEqual(["index.json"], os.listdir(cache.cachePath))
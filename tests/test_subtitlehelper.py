@@ -9,6 +9,7 @@ from resources.lib.helpers.subtitlehelper import SubtitleHelper
 from resources.lib.logger import Logger
 from resources.lib.retroconfig import Config
 from resources.lib.urihandler import UriHandler
+from tests.localhttpserver import LocalHttpServer
 
 
 class TestSubtitleHelper(unittest.TestCase):
@@ -48,5 +49,28 @@ class TestSubtitleHelper(unittest.TestCase):
             raw = fp.read()
 
         # noinspection PyUnresolvedReferences
-        srt = SubtitleHelper._SubtitleHelper__convert_web_vtt_to_srt(raw)
+        srt = "".join(SubtitleHelper._SubtitleHelper__convert_web_vtt_to_srt(raw))
         self.assertIsNot("", srt)
+        self.assertTrue(srt.startswith("\n\n1\n00:00:02,720 --> 00:00:04,840 align:middle\nDet är mycket bra."))
+
+    def test_m3u8_segments(self):
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/subs/0.vtt", "WEBVTT\n\n00:01.000 --> 00:02.000\nFirst\n")
+            # the cue spanning both segments is in both of them
+            server.add_route("/subs/1.vtt", "WEBVTT\nX-TIMESTAMP-MAP=MPEGTS:0,LOCAL:00:00:00.000\n\n"
+                                            "00:09.000 --> 00:11.000\nSecond &amp; third\n")
+            server.add_route("/subs/2.vtt", "WEBVTT\n\n00:09.000 --> 00:11.000\nSecond &amp; third\n\n"
+                                            "00:12.000 --> 00:13.000\nLast\n")
+            playlist = "#EXTM3U\n#EXTINF:10,\n0.vtt\n#EXTINF:10,\n1.vtt\n#EXTINF:10,\n{0}\n#EXT-X-ENDLIST\n"\
+                .format(server.url("/subs/2.vtt"))
+
+            # noinspection PyUnresolvedReferences
+            srt = "".join(SubtitleHelper._SubtitleHelper__convert_m3u8_srt_to_subtitle_to_srt(
+                playlist, server.url("/subs/index.m3u8"), None))
+        finally:
+            server.stop()
+
+        self.assertEqual("\n\n1\n00:00:01,000 --> 00:00:02,000\nFirst"
+                         "\n\n2\n00:00:09,000 --> 00:00:11,000\nSecond & third"
+                         "\n\n3\n00:00:12,000 --> 00:00:13,000\nLast", srt)
@@ -0,0 +1,71 @@
+# SPDX-License-Identifier: CC-BY-NC-SA-4.0
+
+import threading
+import time
+import unittest
+
+from resources.lib.helpers.threadhelper import ThreadHelper
+from resources.lib.logger import Logger
+
+
+class TestThreadHelper(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        Logger.create_logger(None, str(cls), min_log_level=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        Logger.instance().close_log()
+
+    def test_map_in_order(self):
+        def work(i):
+            # make the first ones the slowest
+            time.sleep((10 - i) / 1000.0)
+            return i * 2
+
+        results = ThreadHelper.map(work, (i for i in range(10)), max_workers=4)
+        self.assertEqual([i * 2 for i in range(10)], results)
+
+    def test_map_bounded(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def work(i):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return i
+
+        ThreadHelper.map(work, range(12), max_workers=3)
+        self.assertLessEqual(running[1], 3)
+
+    def test_map_error(self):
+        def work(i):
+            if i == 3:
+                raise ValueError(i)
+            return i
+
+        self.assertRaises(ValueError, ThreadHelper.map, work, range(6))
+
+    def test_map_empty(self):
+        self.assertEqual([], ThreadHelper.map(lambda i: i, []))
+
+    def test_imap_unordered(self):
+        results = ThreadHelper.imap_unordered(lambda i: i * 2, range(10), max_workers=3)
+        self.assertEqual(sorted((i, i * 2) for i in range(10)),
+                         sorted((item, result) for item, result, error in results))
+
+    def test_imap_unordered_stop(self):
+        started = []
+
+        def work(i):
+            started.append(i)
+            time.sleep(0.01)
+            return i
+
+        for _ in ThreadHelper.imap_unordered(work, range(100), max_workers=2):
+            break
+        self.assertLess(len(started), 100)
@@ -10,6 +10,7 @@ import json
 import tempfile
 import shutil
 import time
+import threading
 
 if PY2:
     # noinspection PyUnresolvedReferences
@@ -18,9 +19,13 @@ else:
     # noinspection PyUnresolvedReferences,PyCompatibility
     from urllib.parse import quote
 
+from email.utils import formatdate
+
 from resources.lib.backtothefuture import basestring
+from resources.lib.connectivity.cachehttpadapter import CacheHTTPAdapter
 from resources.lib.urihandler import UriHandler
 from resources.lib.logger import Logger
+from tests.localhttpserver import LocalHttpServer
 
 
 class TestUriHandler(unittest.TestCase):
@@ -450,6 +455,50 @@ class TestUriHandler(unittest.TestCase):
         cookie = UriHandler.get_cookie(cookie_name, cookie_domain)
         self.assertIsNotNone(cookie, msg="Cookie was not persisted on disk")
 
+    def test_cookie_deferred_save(self):
+        cookie_jar = os.path.join(self.output_folder, "cookies.txt")
+        server = LocalHttpServer().start()
+        try:
+            # every response sets the same persistent cookie
+            cookie = "session_id=12345; Path=/; Expires=Wed, 01 Jan 2098 00:00:00 GMT"
+            for i in range(10):
+                server.add_route("/page/{0}".format(i), "page {0}".format(i),
+                                 headers={"Set-Cookie": cookie})
+
+            UriHandler.create_uri_handler(cookie_jar=cookie_jar)
+            writes = []
+            jar = UriHandler.instance().cookieJar
+            original_save = jar.save
+
+            def counting_save(*args, **kwargs):
+                writes.append(args)
+                return original_save(*args, **kwargs)
+            jar.save = counting_save
+
+            for i in range(10):
+                UriHandler.open(server.url("/page/{0}".format(i)))
+            UriHandler.header(server.url("/page/0"))
+            self.assertEqual(0, len(writes))
+            self.assertTrue(jar.dirty)
+
+            UriHandler.flush()
+            UriHandler.flush()
+            self.assertEqual(1, len(writes))
+            self.assertFalse(os.path.isfile("{0}.tmp".format(cookie_jar)))
+
+            # unchanged cookies should not cause a write
+            UriHandler.open(server.url("/page/1"))
+            UriHandler.flush()
+            self.assertEqual(1, len(writes))
+        finally:
+            server.stop()
+
+        # Create a new UriHandler and verify it was stored
+        UriHandler._UriHandler__handler = None
+        UriHandler.create_uri_handler(cookie_jar=cookie_jar)
+        self.assertIsNotNone(UriHandler.get_cookie("session_id", "127.0.0.1"))
+        self.assertFalse(UriHandler.instance().cookieJar.dirty)
+
     def test_clear_cookies(self):
         UriHandler.create_uri_handler()
         UriHandler.set_cookie(name="ipsum", domain="domain.com")
@@ -518,6 +567,326 @@ class TestUriHandler(unittest.TestCase):
         self.assertEqual(200, UriHandler.instance().status.code)
         self.assertEqual("", download_path)
 
+    def test_download_cancel_local(self):
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/large.dat", b"0" * 1024 * 1024)
+            server.add_route("/small.dat", "small")
+            UriHandler.create_uri_handler()
+
+            self.cancel_download = True
+            download_path = UriHandler.download(server.url("/large.dat"), "large.dat",
+                                                self.output_folder, self.__download_callback)
+            self.assertEqual("", download_path)
+            self.assertFalse(os.path.isfile(os.path.join(self.output_folder, "large.dat")))
+
+            # the cancelled download does not block the next request
+            self.assertEqual("small", UriHandler.open(server.url("/small.dat")))
+        finally:
+            server.stop()
+
+    def test_connection_reuse(self):
+        server = LocalHttpServer().start()
+        try:
+            for i in range(5):
+                server.add_route("/page/{0}".format(i), "page {0}".format(i))
+
+            UriHandler.create_uri_handler()
+            for i in range(5):
+                data = UriHandler.open(server.url("/page/{0}".format(i)))
+                self.assertEqual("page {0}".format(i), data)
+            UriHandler.header(server.url("/page/0"))
+            UriHandler.instance().log_connection_statistics()
+        finally:
+            server.stop()
+
+        self.assertEqual(1, UriHandler.instance().newConnections)
+        self.assertEqual(5, UriHandler.instance().reusedConnections)
+
+    def test_status_per_thread(self):
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/ok", "ok")
+            UriHandler.create_uri_handler()
+            UriHandler.open(server.url("/ok"))
+
+            thread = threading.Thread(target=UriHandler.open, args=(server.url("/missing"), ))
+            thread.start()
+            thread.join()
+        finally:
+            server.stop()
+
+        self.assertEqual(200, UriHandler.instance().status.code)
+        self.assertFalse(UriHandler.instance().status.error)
+        self.assertEqual(server.requests[-1][1], "/missing")
+
+    def test_connection_reuse_with_cache(self):
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/cached", "cached", headers={"Cache-Control": "max-age=30"})
+            server.add_route("/not-cached", "not-cached")
+
+            UriHandler.create_uri_handler(cache_dir=self.output_folder)
+            UriHandler.open(server.url("/cached"))
+            UriHandler.open(server.url("/cached"))
+            UriHandler.open(server.url("/not-cached"), no_cache=True)
+            UriHandler.open(server.url("/not-cached"), no_cache=True)
+            UriHandler.instance().log_connection_statistics()
+        finally:
+            server.stop()
+
+        self.assertEqual(1, UriHandler.instance().cacheStore.cacheHits)
+        # one pool for the cached and one for the non-cached session
+        self.assertEqual(2, UriHandler.instance().newConnections)
+        self.assertEqual(1, UriHandler.instance().reusedConnections)
+
+    def test_cache_key_headers(self):
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/api", lambda h: (200, {"Cache-Control": "max-age=30"},
+                                                h.headers.get("Authorization", "anonymous")))
+
+            UriHandler.create_uri_handler(cache_dir=self.output_folder)
+            url = server.url("/api")
+            self.assertEqual("anonymous", UriHandler.open(url))
+            self.assertEqual("token1", UriHandler.open(url, additional_headers={"Authorization": "token1"}))
+            self.assertEqual("token2", UriHandler.open(url, additional_headers={"Authorization": "token2"}))
+            self.assertEqual(0, UriHandler.instance().cacheStore.cacheHits)
+
+            self.assertEqual("token1", UriHandler.open(url, additional_headers={"Authorization": "token1"}))
+            self.assertEqual("anonymous", UriHandler.open(url))
+            self.assertEqual(2, UriHandler.instance().cacheStore.cacheHits)
+            self.assertEqual(3, len(server.requests))
+        finally:
+            server.stop()
+
+    def test_cache_channel_key_headers(self):
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/profile", lambda h: (200, {"Cache-Control": "max-age=30"},
+                                                    h.headers.get("X-Profile", "none")))
+
+            UriHandler.create_uri_handler(cache_dir=self.output_folder)
+            url = server.url("/profile")
+            # without the channel's key headers, the profile header is not part of the cache key
+            self.assertEqual("kids", UriHandler.open(url, additional_headers={"X-Profile": "kids"}))
+            self.assertEqual("kids", UriHandler.open(url, additional_headers={"X-Profile": "adult"}))
+            self.assertEqual(1, UriHandler.instance().cacheStore.cacheHits)
+            self.assertEqual(1, len(server.requests))
+
+            # a channel that has it as key header gets a response per profile
+            key_headers = ["X-Profile"]
+            self.assertEqual("kids", UriHandler.open(url, additional_headers={"X-Profile": "kids"},
+                                                     cache_key_headers=key_headers))
+            self.assertEqual("adult", UriHandler.open(url, additional_headers={"X-Profile": "adult"},
+                                                      cache_key_headers=key_headers))
+            self.assertEqual("kids", UriHandler.open(url, additional_headers={"X-Profile": "kids"},
+                                                     cache_key_headers=key_headers))
+            self.assertEqual(2, UriHandler.instance().cacheStore.cacheHits)
+            self.assertEqual(3, len(server.requests))
+        finally:
+            server.stop()
+
+    def test_cache_vary(self):
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/vary", lambda h: (200, {"Cache-Control": "max-age=30", "Vary": "Accept-Language"},
+                                                 h.headers.get("Accept-Language", "none")))
+            server.add_route("/vary-all", lambda h: (200, {"Cache-Control": "max-age=30", "Vary": "*"}, "all"))
+
+            UriHandler.create_uri_handler(cache_dir=self.output_folder)
+            url = server.url("/vary")
+            self.assertEqual("nl", UriHandler.open(url, additional_headers={"Accept-Language": "nl"}))
+            self.assertEqual("sv", UriHandler.open(url, additional_headers={"Accept-Language": "sv"}))
+            self.assertEqual("nl", UriHandler.open(url, additional_headers={"Accept-Language": "nl"}))
+            self.assertEqual("sv", UriHandler.open(url, additional_headers={"Accept-Language": "sv"}))
+            self.assertEqual(2, UriHandler.instance().cacheStore.cacheHits)
+
+            url = server.url("/vary-all")
+            UriHandler.open(url)
+            UriHandler.open(url)
+            self.assertEqual(2, UriHandler.instance().cacheStore.cacheHits)
+            self.assertEqual(4, len(server.requests))
+        finally:
+            server.stop()
+
+    def test_cache_expires(self):
+        server = LocalHttpServer().start()
+        try:
+            now = time.time()
+            server.add_route("/future", "future", headers={
+                "Date": formatdate(now, usegmt=True),
+                "Expires": formatdate(now + 3600, usegmt=True)})
+            server.add_route("/past", "past", headers={
+                "Date": formatdate(now, usegmt=True),
+                "Expires": formatdate(now - 3600, usegmt=True)})
+            server.add_route("/invalid", "invalid", headers={"Expires": "0"})
+
+            UriHandler.create_uri_handler(cache_dir=self.output_folder)
+            for path in ("/future", "/past", "/invalid"):
+                UriHandler.open(server.url(path))
+                UriHandler.open(server.url(path))
+            self.assertEqual(1, UriHandler.instance().cacheStore.cacheHits)
+            self.assertEqual(5, len(server.requests))
+        finally:
+            server.stop()
+
+    def test_cache_ignores_s_maxage(self):
+        server = LocalHttpServer().start()
+        try:
+            # s-maxage only applies to shared caches, the expired Expires header wins
+            now = time.time()
+            server.add_route("/shared", "shared", headers={
+                "Cache-Control": "s-maxage=3600",
+                "Date": formatdate(now, usegmt=True),
+                "Expires": formatdate(now - 3600, usegmt=True)})
+
+            UriHandler.create_uri_handler(cache_dir=self.output_folder)
+            UriHandler.open(server.url("/shared"))
+            UriHandler.open(server.url("/shared"))
+            self.assertEqual(0, UriHandler.instance().cacheStore.cacheHits)
+            self.assertEqual(2, len(server.requests))
+        finally:
+            server.stop()
+
+    def test_cache_last_modified(self):
+        last_modified = formatdate(time.time() - 3600, usegmt=True)
+
+        def respond(handler):
+            if handler.headers.get("If-Modified-Since") == last_modified:
+                return 304, {"Cache-Control": "max-age=0"}, ""
+            return 200, {"Cache-Control": "max-age=0", "Last-Modified": last_modified}, "modified"
+
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/modified", respond)
+            UriHandler.create_uri_handler(cache_dir=self.output_folder)
+            self.assertEqual("modified", UriHandler.open(server.url("/modified")))
+            self.assertEqual("modified", UriHandler.open(server.url("/modified")))
+            self.assertEqual(200, UriHandler.instance().status.code)
+            self.assertEqual(1, UriHandler.instance().cacheStore.cacheHits)
+            self.assertEqual(2, len(server.requests))
+            self.assertEqual(last_modified, server.requests[1][2].get("If-Modified-Since"))
+        finally:
+            server.stop()
+
+    def test_cache_stale_while_revalidate(self):
+        versions = []
+
+        def respond(handler):
+            versions.append(len(versions) + 1)
+            return 200, {"Cache-Control": "max-age=0, stale-while-revalidate=30"}, "v{0}".format(len(versions))
+
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/swr", respond)
+            UriHandler.create_uri_handler(cache_dir=self.output_folder)
+            url = server.url("/swr")
+
+            self.assertEqual("v1", UriHandler.open(url))
+            # the stale one is returned and refreshed in the background
+            self.assertEqual("v1", UriHandler.open(url))
+            UriHandler.flush()
+            self.assertEqual(2, len(server.requests))
+            self.assertEqual("v2", UriHandler.open(url))
+            UriHandler.flush()
+            self.assertEqual(2, UriHandler.instance().cacheStore.cacheHits)
+            self.assertEqual(3, len(server.requests))
+        finally:
+            server.stop()
+
+    def test_cache_revalidate_cookies(self):
+        versions = []
+
+        def respond(handler):
+            versions.append(len(versions) + 1)
+            return 200, {"Cache-Control": "max-age=0, stale-while-revalidate=30",
+                         "Set-Cookie": "session=v{0}; Path=/".format(len(versions))}, "ok"
+
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/swr-cookie", respond)
+            UriHandler.create_uri_handler(cache_dir=self.output_folder)
+            url = server.url("/swr-cookie")
+
+            UriHandler.open(url)
+            UriHandler.open(url)
+            UriHandler.flush()
+            self.assertEqual(2, len(server.requests))
+
+            # the cookie of the background revalidation ends up in the session's cookie jar
+            cookies = [c.value for c in UriHandler.instance().cookieJar if c.name == "session"]
+            self.assertEqual(["v2"], cookies)
+        finally:
+            server.stop()
+
+    def test_cache_allow_stale(self):
+        versions = []
+
+        def respond(handler):
+            versions.append(len(versions) + 1)
+            return 200, {"Cache-Control": "max-age=0"}, "v{0}".format(len(versions))
+
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/stale", respond)
+            UriHandler.create_uri_handler(cache_dir=self.output_folder)
+            url = server.url("/stale")
+
+            self.assertEqual("v1", UriHandler.open(url))
+            self.assertEqual("v2", UriHandler.open(url))
+            self.assertEqual("v2", UriHandler.open(url, stale_while_revalidate=True))
+            UriHandler.flush()
+            self.assertEqual(3, len(server.requests))
+            self.assertNotIn(CacheHTTPAdapter.StaleWhileRevalidateHeader, server.requests[2][2])
+            self.assertEqual("v3", UriHandler.open(url, stale_while_revalidate=True))
+            UriHandler.flush()
+        finally:
+            server.stop()
+
+    def test_fixtures_record_replay(self):
+        from requests.exceptions import ConnectionError
+        from resources.lib.connectivity.fixturearchive import FixtureArchive
+
+        versions = []
+
+        def respond(handler):
+            versions.append(len(versions) + 1)
+            return 200, {"Content-Type": "text/plain; charset=utf-8"}, "v{0}".format(len(versions))
+
+        path = os.path.join(self.output_folder, "fixtures", "test.zip")
+        server = LocalHttpServer().start()
+        try:
+            server.add_route("/versions", respond)
+            server.add_route("/post", respond)
+
+            # the cache is not used while recording
+            UriHandler.create_uri_handler(cache_dir=self.output_folder,
+                                          fixtures=FixtureArchive(path, FixtureArchive.Record))
+            url = server.url("/versions")
+            self.assertEqual("v1", UriHandler.open(url))
+            self.assertEqual("v2", UriHandler.open(url))
+            self.assertEqual("v3", UriHandler.open(server.url("/post"), data="a=1"))
+            self.assertEqual("v4", UriHandler.open(server.url("/post"), data="a=2"))
+            UriHandler.flush()
+        finally:
+            server.stop()
+        self.assertEqual(4, len(server.requests))
+
+        # replaying does not need the server and replays in the recorded order
+        archive = FixtureArchive(path, FixtureArchive.Replay)
+        UriHandler.create_uri_handler(fixtures=archive)
+        self.assertEqual("v1", UriHandler.open(url))
+        self.assertEqual("v2", UriHandler.open(url))
+        self.assertEqual("v2", UriHandler.open(url))
+        self.assertEqual("v4", UriHandler.open(server.url("/post"), data="a=2"))
+        self.assertEqual("v3", UriHandler.open(server.url("/post"), data="a=1"))
+        self.assertEqual(200, UriHandler.instance().status.code)
+        self.assertRaises(ConnectionError, UriHandler.open, server.url("/missing"))
+        self.assertEqual(5, archive.requests)
+        self.assertEqual(1, archive.misses)
+        archive.close()
+
     # noinspection PyUnusedLocal
     def __download_callback(self, retrieved_size, total_size, perc, completed, status):
         print(status)
@@ -10,6 +10,7 @@ from resources.lib.retroconfig import Config
 from resources.lib.logger import Logger
 from resources.lib.textures.cached import Cached
 from resources.lib.urihandler import UriHandler
+from tests.localhttpserver import LocalHttpServer
 
 
 class TestCachedTextures(unittest.TestCase):
@@ -83,6 +84,42 @@ class TestCachedTextures(unittest.TestCase):
         self.assertTrue(os.path.isfile(os_url))
         self.assertEqual(local_path, os_url)
 
+    def test_cached_texture_fetch_concurrent(self):
+        attempts = []
+
+        def flaky_texture(handler):
+            attempts.append(handler.path)
+            if handler.path.endswith("0.png") and attempts.count(handler.path) == 1:
+                return 500, {}, b"error"
+            return 200, {"Content-Type": "image/png"}, b"png"
+
+        server = LocalHttpServer()
+        for i in range(10):
+            server.add_route("/channel.nos.nos2010/remote{0}.png".format(i), flaky_texture)
+            texture_path = os.path.join(
+                Config.profileDir, "textures", "channel.nos.nos2010", "remote{0}.png".format(i))
+            if os.path.isfile(texture_path):
+                os.remove(texture_path)
+        server.start()
+        try:
+            texture = Cached(server.base_url, Config.profileDir, Config.profileUri,
+                             Logger.instance(), UriHandler.instance())
+            urls = [texture._get_texture_uri(self.channel_path, "remote{0}.png".format(i))
+                    for i in range(10)]
+
+            progress = []
+            bytes_transfered = texture.fetch_textures(
+                lambda *args: progress.append(args) and False, max_workers=4, retries=1)
+        finally:
+            server.stop()
+
+        self.assertEqual(30, bytes_transfered)
+        self.assertEqual(11, len(attempts))
+        self.assertEqual(list(range(1, 11)), [p[0] for p in progress])
+        self.assertEqual(0, texture.number_of_missing_textures())
+        for url in urls:
+            self.assertTrue(os.path.isfile(xbmcvfs.translatePath(url)))
+
     def test_cached_texture_file_special(self):
         texture = self._get_texture_handler()
         texture_path = "{}/textures/{}".format(Config.profileUri, "3large.png")